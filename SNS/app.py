@@ -1,10 +1,14 @@
 # app.py
 import streamlit as st
+from utils.tracing import traced
 # --- Streamlit 버전 확인 코드 (디버깅용) ---
 # st.write(f"현재 스크립트에서 사용되는 Streamlit 버전: {st.__version__}") # 앱 실행 시 브라우저에 버전 표시
 # --------------------------------------------
 
+import os
+import re
 import pandas as pd
+from datetime import datetime
 from collections import Counter
 # 사용자 정의 모듈 import
 import SNS.config as config # 상수 및 설정
@@ -12,10 +16,21 @@ import SNS.kote_module as kote_module
 import SNS.youtube_api_module as youtube_api_module
 import SNS.text_analysis_module as text_analysis_module
 import SNS.ui_helpers as ui_helpers# UI 헬퍼 모듈 (선택적)
+import SNS.result_store as result_store # 세션 간 공유 분석 결과 저장소
+import SNS.snapshot as snapshot # 분석 스냅샷 저장/불러오기
 
+# 분석 결과 탭에서 사용하는 (압축 형식) 댓글 컬럼 - 스냅샷에서 복원한 결과는 이 컬럼만 읽음
+ANALYSIS_TAB_COLUMNS = [
+    "comment_id", "video_id", "video_title", "text", "published_at", "comment_hour", "like_count",
+    "disaster_bits", "sentiment_bits",
+]
+
+@traced()
 def run_sns():
     # KOTE 모델 로드 (앱 시작 시 한 번)
     kote_model = kote_module.load_trained_kote_model() # show_message=True는 기본값
+    # 분석 결과는 공유 저장소에 한 번만 저장하고, 세션에는 handle(키)만 보관합니다.
+    store = result_store.get_result_store()
 
     # YouTube API 키 확인
     if not youtube_api_module.YOUTUBE_API_KEY_VALUE:
@@ -34,8 +49,10 @@ def run_sns():
         st.session_state.search_results = []
     if 'selected_video_ids_titles' not in st.session_state:
         st.session_state.selected_video_ids_titles = {}
-    if 'all_comments_df' not in st.session_state:
-        st.session_state.all_comments_df = pd.DataFrame()
+    if 'analysis_handle' not in st.session_state:
+        st.session_state.analysis_handle = None
+    if 'analysis_params' not in st.session_state:
+        st.session_state.analysis_params = {}
     if 'main_search_button_clicked' not in st.session_state:
         st.session_state.main_search_button_clicked = False
     if 'main_analyze_button_clicked' not in st.session_state:
@@ -114,7 +131,7 @@ def run_sns():
                     st.warning("검색 결과가 없습니다. 다른 검색어를 시도해보세요.")
                 else:
                     st.session_state.selected_video_ids_titles = {}
-                    st.session_state.all_comments_df = pd.DataFrame()
+                    st.session_state.analysis_handle = None
                     st.info(f"{len(st.session_state.search_results)}개의 영상을 찾았습니다. 아래에서 분석할 영상을 선택하세요.")
 
         if st.session_state.search_results:
@@ -184,61 +201,148 @@ def run_sns():
             if not kote_model:
                 st.error("KOTE 감성 분석 모델이 로드되지 않아 분석을 시작할 수 없습니다.")
             elif st.session_state.selected_video_ids_titles:
-                all_comments_list_for_df = []
-                total_videos_to_analyze = len(st.session_state.selected_video_ids_titles)
-                analysis_progress_bar = st.progress(0, text="분석 준비 중...")
-                analysis_status_text = st.empty()
-
-                with st.spinner("선택된 영상의 댓글을 수집하고 분석 중입니다. 잠시만 기다려주세요..."):
-                    for i, (video_id, video_title) in enumerate(st.session_state.selected_video_ids_titles.items()):
-                        progress_value_collect = int(((i + 0.5) / total_videos_to_analyze) * 80)
-                        analysis_status_text.info(f"'{video_title}' 영상 댓글 수집 중... ({i+1}/{total_videos_to_analyze})")
-                        analysis_progress_bar.progress(progress_value_collect, text=f"댓글 수집: {video_title} ({i+1}/{total_videos_to_analyze})")
-
-                        comments = youtube_api_module.get_video_comments(video_id, total_max_comments=max_comments_per_video)
-                        for comment_data in comments:
-                            comment_data['video_title'] = video_title
-                        all_comments_list_for_df.extend(comments)
-
-                    if not all_comments_list_for_df:
-                        st.warning("수집된 댓글이 없습니다. 영상 선택 또는 댓글 수집 설정을 확인해주세요.")
-                        st.session_state.all_comments_df = pd.DataFrame()
-                        if analysis_progress_bar is not None: analysis_progress_bar.empty()
-                        if analysis_status_text is not None: analysis_status_text.empty()
-                    else:
-                        analysis_status_text.info("댓글 텍스트 전처리 및 감정/재난 라벨링 중...")
-                        analysis_progress_bar.progress(80, text="텍스트 분석 중...")
+                analysis_key = result_store.make_result_key(
+                    st.session_state.selected_video_ids_titles.keys(), max_comments_per_video, emotion_threshold
+                )
+                # 결과 키에 들어간 옵션 (스냅샷 저장 시 함께 기록)
+                analysis_params = {
+                    "max_comments_per_video": max_comments_per_video,
+                    "emotion_threshold": emotion_threshold,
+                }
+                if analysis_key in store:
+                    # 같은 영상 집합을 같은 옵션으로 분석한 결과가 이미 있으면 재사용합니다.
+                    st.session_state.analysis_handle = analysis_key
+                    st.session_state.analysis_params = analysis_params
+                    st.success("이전에 분석된 결과를 불러왔습니다.")
+                else:
+                    all_comments_list_for_df = []
+                    total_videos_to_analyze = len(st.session_state.selected_video_ids_titles)
+                    analysis_progress_bar = st.progress(0, text="분석 준비 중...")
+                    analysis_status_text = st.empty()
+
+                    with st.spinner("선택된 영상의 댓글을 수집하고 분석 중입니다. 잠시만 기다려주세요..."):
+                        for i, (video_id, video_title) in enumerate(st.session_state.selected_video_ids_titles.items()):
+                            progress_value_collect = int(((i + 0.5) / total_videos_to_analyze) * 80)
+                            analysis_status_text.info(f"'{video_title}' 영상 댓글 수집 중... ({i+1}/{total_videos_to_analyze})")
+                            analysis_progress_bar.progress(progress_value_collect, text=f"댓글 수집: {video_title} ({i+1}/{total_videos_to_analyze})")
+
+                            comments = youtube_api_module.get_video_comments(video_id, total_max_comments=max_comments_per_video)
+                            # 캐시된 댓글 목록은 공유되므로 복사본에 영상 제목을 붙임
+                            all_comments_list_for_df.extend({**comment_data, 'video_title': video_title} for comment_data in comments)
+
+                        if not all_comments_list_for_df:
+                            st.warning("수집된 댓글이 없습니다. 영상 선택 또는 댓글 수집 설정을 확인해주세요.")
+                            st.session_state.analysis_handle = None
+                            if analysis_progress_bar is not None: analysis_progress_bar.empty()
+                            if analysis_status_text is not None: analysis_status_text.empty()
+                        else:
+                            analysis_status_text.info("댓글 텍스트 전처리 및 감정/재난 라벨링 중...")
+                            analysis_progress_bar.progress(80, text="텍스트 분석 중...")
 
-                        df_raw_comments = pd.DataFrame(all_comments_list_for_df)
+                            df_raw_comments = pd.DataFrame(all_comments_list_for_df)
 
-                        if 'text' in df_raw_comments.columns and not df_raw_comments['text'].isnull().all():
-                            df_raw_comments['text'] = df_raw_comments['text'].astype(str)
-                            comment_texts_list = df_raw_comments["text"].tolist()
+                            if 'text' in df_raw_comments.columns and not df_raw_comments['text'].isnull().all():
+                                df_raw_comments['text'] = df_raw_comments['text'].astype(str)
+                                comment_texts_list = df_raw_comments["text"].tolist()
 
-                            df_raw_comments["disaster_labels"] = df_raw_comments["text"].apply(text_analysis_module.label_disaster)
-                            df_raw_comments["sentiment_labels"] = kote_module.analyze_sentiment_kote_batch(
-                                comment_texts_list, kote_model, emotion_threshold
-                            )
+                                df_raw_comments["disaster_labels"] = df_raw_comments["text"].apply(text_analysis_module.label_disaster)
+                                # 확률 행렬은 스냅샷 저장을 위해 함께 보관합니다.
+                                emotion_probabilities = kote_module.predict_emotion_probabilities(comment_texts_list, kote_model)
+                                df_raw_comments["sentiment_labels"] = kote_module.probabilities_to_labels(
+                                    emotion_probabilities, emotion_threshold
+                                )
+                                df_probabilities = pd.DataFrame(emotion_probabilities, columns=config.LABELS)
+                                df_probabilities.insert(0, "comment_id", df_raw_comments["comment_id"].astype(str).values)
+                                store.put_table(result_store.probabilities_key(analysis_key), df_probabilities)
 
-                            df_raw_comments["published_at"] = pd.to_datetime(df_raw_comments["published_at"], errors='coerce')
-                            df_raw_comments["comment_hour"] = df_raw_comments["published_at"].dt.hour
+                                df_raw_comments["published_at"] = pd.to_datetime(df_raw_comments["published_at"], errors='coerce')
+                                df_raw_comments["comment_hour"] = df_raw_comments["published_at"].dt.hour
     
-                            st.session_state.all_comments_df = df_raw_comments
-                            analysis_progress_bar.progress(100, text="분석 완료!")
-                            st.success(f"총 {len(df_raw_comments)}개의 댓글에 대한 분석이 완료되었습니다!")
-                        else:
-                            st.warning("댓글 데이터에 유효한 'text' 내용이 없어 분석을 진행할 수 없습니다.")
-                            st.session_state.all_comments_df = pd.DataFrame()
-                        if analysis_status_text is not None: analysis_status_text.empty()
+                                st.session_state.analysis_handle = store.put(analysis_key, df_raw_comments)
+                                st.session_state.analysis_params = analysis_params
+                                analysis_progress_bar.progress(100, text="분석 완료!")
+                                st.success(f"총 {len(df_raw_comments)}개의 댓글에 대한 분석이 완료되었습니다!")
+                            else:
+                                st.warning("댓글 데이터에 유효한 'text' 내용이 없어 분석을 진행할 수 없습니다.")
+                                st.session_state.analysis_handle = None
+                            if analysis_status_text is not None: analysis_status_text.empty()
             else:
                 st.error("분석할 영상을 먼저 선택해주세요.")
 
+    # --- 분석 스냅샷 저장 / 불러오기 ---
+    with st.expander("💾 분석 스냅샷 저장 / 불러오기"):
+        col_snapshot_save, col_snapshot_load = st.columns(2)
+        with col_snapshot_save:
+            snapshot_name = st.text_input(
+                "스냅샷 이름:", value=datetime.now().strftime("%Y%m%d_%H%M"), key="snapshot_name_input"
+            )
+            if st.button("현재 분석 결과 저장", disabled=not st.session_state.analysis_handle, key="snapshot_save_button"):
+                handle = st.session_state.analysis_handle
+                comments_to_save = store.get(handle)
+                if comments_to_save is None:
+                    st.error("저장할 분석 결과를 찾을 수 없습니다. 댓글 분석을 다시 실행해주세요.")
+                else:
+                    keyword_index = store.get_table(result_store.keywords_key(handle))
+                    if keyword_index is None:
+                        # 키워드 색인을 함께 저장해 두면 불러올 때 형태소 분석이 필요 없습니다.
+                        with st.spinner("댓글별 키워드 색인 생성 중..."):
+                            keyword_index = text_analysis_module.build_keyword_index(
+                                comments_to_save["comment_id"].astype(str), comments_to_save["text"].astype(str)
+                            )
+                        store.put_table(result_store.keywords_key(handle), keyword_index)
+                    saved_video_ids = set(comments_to_save["video_id"].astype(str))
+                    videos_meta = [v for v in (st.session_state.search_results or []) if v['id'] in saved_video_ids]
+                    if not videos_meta:
+                        videos_meta = (
+                            comments_to_save[["video_id", "video_title"]].drop_duplicates()
+                            .rename(columns={"video_id": "id", "video_title": "title"}).to_dict("records")
+                        )
+                    safe_snapshot_name = re.sub(r"[^\w\-]", "_", snapshot_name.strip()) or datetime.now().strftime("%Y%m%d_%H%M")
+                    saved_path = snapshot.save_snapshot(
+                        safe_snapshot_name, handle, comments_to_save,
+                        store.get_table(result_store.probabilities_key(handle)), keyword_index, videos_meta,
+                        params=st.session_state.analysis_params
+                    )
+                    st.success(f"스냅샷을 저장했습니다: {saved_path}")
+        with col_snapshot_load:
+            saved_snapshots = snapshot.list_snapshots()
+            snapshot_options = {
+                f"{m['name']} ({m['created_at']}, 댓글 {m['row_count']:,}개)": m['name'] for m in saved_snapshots
+            }
+            selected_snapshot = st.selectbox(
+                "저장된 스냅샷:", list(snapshot_options.keys()), key="snapshot_select"
+            )
+            if st.button("스냅샷 불러오기", disabled=not snapshot_options, key="snapshot_load_button"):
+                try:
+                    loaded_snapshot = snapshot.Snapshot(os.path.join(config.SNAPSHOT_DIR, snapshot_options[selected_snapshot]))
+                    st.session_state.analysis_handle = snapshot.restore_snapshot(loaded_snapshot, store)
+                    st.session_state.analysis_params = loaded_snapshot.manifest.get("params", {})
+                    st.session_state.main_analyze_button_clicked = True
+                    st.success(f"'{loaded_snapshot.manifest['name']}' 스냅샷을 불러왔습니다.")
+                except (OSError, ValueError) as e:
+                    st.error(f"스냅샷을 불러오지 못했습니다: {e}")
+
     st.markdown("---")
 
     # --- 3. 분석 결과 탭 섹션 ---
-    if not st.session_state.all_comments_df.empty:
+    # handle로 공유 저장소에서 탭에 필요한 컬럼만 복원합니다. (세션마다 DataFrame을 보관하지 않음)
+    analysis_handle = st.session_state.analysis_handle
+    analysis_df = None
+    if analysis_handle:
+        analysis_df = store.get(analysis_handle, columns=ANALYSIS_TAB_COLUMNS)
+    if analysis_df is None:
+        analysis_df = pd.DataFrame()
+
+    def top_keywords(comments_df, combined_text, num_keywords):
+        # 키워드 색인이 있으면(스냅샷 복원 등) 형태소 분석 없이 색인에서 키워드를 집계합니다. (키워드 탭이 처음 조회할 때 읽음)
+        keyword_index = store.get_table(result_store.keywords_key(analysis_handle)) if analysis_handle else None
+        if keyword_index is not None and 'comment_id' in comments_df.columns:
+            return text_analysis_module.keywords_from_index(keyword_index, comments_df['comment_id'].astype(str), num_keywords)
+        return text_analysis_module.extract_keywords(combined_text, num_keywords=num_keywords)
+
+    if not analysis_df.empty:
         st.header("댓글 분석 결과")
-        df_analysis_results = st.session_state.all_comments_df.copy()
+        df_analysis_results = analysis_df
 
         valid_sentiments_global = df_analysis_results["sentiment_labels"].dropna().apply(
             lambda x: [s for s in x if s != '없음'] if isinstance(x, list) and x else None
@@ -257,7 +361,10 @@ def run_sns():
         (tab_summary, tab_sentiment_distribution, tab_sentiment_over_time, tab_all_keywords,
         tab_keywords_by_emotion, tab_analysis_by_disaster, tab_comparative_analysis) = st.tabs(tab_titles_list)
 
-        with tab_summary:
+        # 탭 안의 위젯(체크박스, 라디오, 선택 상자 등)은 fragment로 분리해, 값이 바뀌면 해당 탭만 다시 그립니다.
+        # (fragment는 마지막 전체 실행 때의 분석 결과를 그대로 사용하므로 저장소 조회, 전체 집계를 반복하지 않음)
+        @st.fragment
+        def render_summary_tab():
             st.subheader("종합 요약 및 데이터 미리보기")
             total_comments = len(df_analysis_results)
             num_videos = df_analysis_results['video_id'].nunique()
@@ -272,8 +379,11 @@ def run_sns():
                 display_cols = ['video_title', 'text', 'sentiment_labels', 'disaster_labels', 'published_at', 'like_count']
                 existing_display_cols = [col for col in display_cols if col in df_analysis_results.columns]
                 st.dataframe(df_analysis_results[existing_display_cols].head())
+        with tab_summary:
+            render_summary_tab()
 
-        with tab_sentiment_distribution:
+        @st.fragment
+        def render_sentiment_distribution_tab():
             st.subheader("전체 댓글의 감정 분포 (KOTE Multi-label)")
             if sentiment_counts_global:
                 df_sentiment_dist = pd.DataFrame(
@@ -293,6 +403,8 @@ def run_sns():
                     ui_helpers.display_dataframe_with_title(df_sentiment_dist, "전체 감정 빈도", "_all_sent_data_v4") # 키 변경
             else:
                 st.info("감정 분석 결과가 없거나 '없음' 감정만 존재합니다.")
+        with tab_sentiment_distribution:
+            render_sentiment_distribution_tab()
         
         df_analysis_results['comment_date'] = df_analysis_results['published_at'].dt.date
 
@@ -383,7 +495,8 @@ def run_sns():
         # ----------------------------------------------------------------------
         # 2. Streamlit UI 렌더링 (호출 부분)
         # ----------------------------------------------------------------------
-        with tab_sentiment_over_time:
+        @st.fragment
+        def render_sentiment_over_time_tab():
             
             # ==================================================================
             # 1. 시간대별 감정 변화 분석 (날짜 선택 기능 추가)
@@ -457,6 +570,8 @@ def run_sns():
                 sentiment_counts_global, 
                 time_unit='year'
             )
+        with tab_sentiment_over_time:
+            render_sentiment_over_time_tab()
         with tab_all_keywords:
             st.subheader("주요 키워드 (전체 댓글에서 추출)")
             all_comments_text_combined = ""
@@ -469,7 +584,7 @@ def run_sns():
 
             if all_comments_text_combined.strip():
                 # extract_keywords가 리스트 [('단어', 빈도), ...]를 반환합니다.
-                top_keywords_list = text_analysis_module.extract_keywords(all_comments_text_combined, num_keywords=50)
+                top_keywords_list = top_keywords(df_analysis_results, all_comments_text_combined, 50)
                 
                 if top_keywords_list:
                     # 💡 [해결] 리스트를 딕셔너리로 변환합니다.
@@ -485,7 +600,8 @@ def run_sns():
             else:
                 st.info("키워드 분석을 위한 유효한 텍스트 데이터가 없습니다.")
 
-        with tab_keywords_by_emotion:
+        @st.fragment
+        def render_keywords_by_emotion_tab():
             st.subheader("특정 감정 관련 주요 키워드 분석")
             available_emotions_for_kw_analysis = sorted(list(sentiment_counts_global.keys()))
 
@@ -517,7 +633,7 @@ def run_sns():
                             emotion_specific_text_combined = " ".join(filtered_text_series_emotion)
 
                         if emotion_specific_text_combined.strip():
-                            emotion_keywords = text_analysis_module.extract_keywords(emotion_specific_text_combined, num_keywords=15)
+                            emotion_keywords = top_keywords(emotion_specific_comments_df, emotion_specific_text_combined, 15)
                             if emotion_keywords:
                                 df_emotion_kws = pd.DataFrame(emotion_keywords, columns=["keyword", "count"])
                                 ui_helpers.create_bar_chart(
@@ -531,8 +647,11 @@ def run_sns():
                                 st.info(f"'{selected_emotion_for_kw}' 감정 관련 댓글에서 주요 키워드를 추출할 수 없었습니다.")
                         else:
                             st.info(f"'{selected_emotion_for_kw}' 감정 관련 댓글에 분석할 유효한 텍스트가 없습니다.")
+        with tab_keywords_by_emotion:
+            render_keywords_by_emotion_tab()
 
-        with tab_analysis_by_disaster:
+        @st.fragment
+        def render_analysis_by_disaster_tab():
             st.subheader("재난 유형별 심층 분석")
             if not disaster_label_counts_global:
                 st.info("댓글에서 식별된 재난 유형이 없습니다.")
@@ -575,7 +694,7 @@ def run_sns():
                                 dis_text = " ".join(filtered_text_series_dis_single)
 
                             if dis_text.strip():
-                                dis_kws = text_analysis_module.extract_keywords(dis_text, num_keywords=10)
+                                dis_kws = top_keywords(disaster_specific_df, dis_text, 10)
                                 if dis_kws:
                                     df_dis_kws = pd.DataFrame(dis_kws, columns=["keyword", "count"])
                                     ui_helpers.create_bar_chart(
@@ -626,7 +745,7 @@ def run_sns():
                                     tab_text = " ".join(filtered_text_series_dis_tab)
 
                                 if tab_text.strip():
-                                    tab_kws = text_analysis_module.extract_keywords(tab_text, num_keywords=10)
+                                    tab_kws = top_keywords(disaster_df_for_tab, tab_text, 10)
                                     if tab_kws:
                                         df_tab_kws = pd.DataFrame(tab_kws, columns=["keyword", "count"])
                                         ui_helpers.create_bar_chart(
@@ -639,6 +758,8 @@ def run_sns():
 
                             if st.checkbox(f"'{disaster_type_in_tab}' 관련 댓글 보기 ({len(disaster_df_for_tab)}개)", key=f"show_tab_comments_v4_{disaster_type_in_tab.replace(' ', '_')}"): # 키에 공백 제거
                                 st.dataframe(disaster_df_for_tab[['video_title', 'text', 'sentiment_labels', 'published_at']].head(20))
+        with tab_analysis_by_disaster:
+            render_analysis_by_disaster_tab()
 
         # app.py (tab_comparative_analysis 전체 코드)
 
@@ -646,7 +767,8 @@ def run_sns():
     # df_analysis_results, st.session_state.selected_video_ids_titles, disaster_label_counts_global 등이 사용 가능해야 함
 
         # --- 탭 7: 항목 간 비교 분석 ---
-        with tab_comparative_analysis:
+        @st.fragment
+        def render_comparative_analysis_tab():
             st.subheader("항목 간 데이터 비교 분석")
 
             comparison_target_type = st.radio(
@@ -753,7 +875,7 @@ def run_sns():
                                 item_comp_text_combined = " ".join(filtered_text_series_item_comp)
 
                             if item_comp_text_combined.strip():
-                                item_comp_kws = text_analysis_module.extract_keywords(item_comp_text_combined, num_keywords=5)
+                                item_comp_kws = top_keywords(item_df_comp, item_comp_text_combined, 5)
                                 if item_comp_kws:
                                     keyword_display = "\n".join([f"- {kw} ({count_val})" for kw, count_val in item_comp_kws])
                                     st.markdown(keyword_display)
@@ -833,7 +955,7 @@ def run_sns():
                                 item_comp_text_combined = " ".join(filtered_text_series_item_comp)
                             
                             if item_comp_text_combined.strip():
-                                item_comp_kws = text_analysis_module.extract_keywords(item_comp_text_combined, num_keywords=5)
+                                item_comp_kws = top_keywords(item_df_comp, item_comp_text_combined, 5)
                                 if item_comp_kws:
                                     keyword_display = "\n".join([f"- {kw} ({count_val})" for kw, count_val in item_comp_kws])
                                     st.markdown(keyword_display)
@@ -842,8 +964,10 @@ def run_sns():
                             else: 
                                 st.write("키워드 분석을 위한 유효한 텍스트 데이터 없음")
                             st.markdown("---") # 각 아이템 비교 컬럼 구분
+        with tab_comparative_analysis:
+            render_comparative_analysis_tab()
 
-    elif st.session_state.get('main_analyze_button_clicked') and st.session_state.all_comments_df.empty :
+    elif st.session_state.get('main_analyze_button_clicked') and analysis_df.empty :
         st.warning("댓글 수집/분석 결과가 없습니다. 상단 설정을 확인하고 '선택된 영상 댓글 분석 시작' 버튼을 다시 눌러주세요.")
     elif not st.session_state.get('main_search_button_clicked') and not st.session_state.get('main_analyze_button_clicked'):
         st.info("페이지 상단에서 검색어를 입력하고 영상을 검색한 후, 분석할 영상을 선택하고 댓글 분석을 시작해주세요.")
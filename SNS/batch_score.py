@@ -0,0 +1,201 @@
+# batch_score.py
+"""
+대량의 댓글 덤프(JSONL/CSV/Parquet)를 KOTE 모델로 일괄 감정 분석하는 명령행 도구입니다.
+
+사용 예:
+    python -m SNS.batch_score comments.jsonl --out output/kote_scores --threads 8
+    python -m SNS.batch_score comments.csv --out output/kote_scores --update-emotion-table
+
+- 입력은 샤드 크기 단위로 스트리밍하여 읽으므로 메모리 사용량이 입력 크기와 무관합니다.
+- 결과는 shard-00000.parquet 형식의 확률 샤드로 하나씩 기록됩니다.
+- 중단 후 같은 명령을 다시 실행하면 마지막으로 완료된 샤드 다음부터 이어서 처리합니다.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from SNS.config import LABELS, BATCH_SHARD_SIZE, EMOTION_TABLE_DIR
+
+# 확률 샤드에 함께 보존할 입력 컬럼 (일별 지역 감정 집계에 사용)
+DEFAULT_KEEP_COLUMNS = ["video_id", "video_title", "published_at", "text"]
+SHARD_PATTERN = "shard-{:05d}.parquet"
+PROGRESS_FILE = "_progress.json"
+
+
+def detect_format(path):
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if ext == ".csv":
+        return "csv"
+    if ext in (".parquet", ".pq"):
+        return "parquet"
+    raise ValueError(f"입력 형식을 알 수 없습니다: {path} (--format 옵션으로 지정하세요)")
+
+
+def iter_input_chunks(path, input_format, chunk_rows, columns=None, encoding=None):
+    """
+    입력 파일을 최대 chunk_rows 행의 DataFrame 단위로 스트리밍합니다.
+    columns를 주면 CSV/Parquet은 그 컬럼만 읽습니다. encoding은 CSV/JSONL에 적용됩니다. (기본 UTF-8)
+    """
+    if input_format == "csv":
+        yield from pd.read_csv(path, chunksize=chunk_rows, usecols=columns, encoding=encoding)
+    elif input_format == "jsonl":
+        records = []
+        with open(path, encoding=encoding or "utf-8") as f:
+            for line in f:
+                if line.strip():
+                    records.append(json.loads(line))
+                if len(records) >= chunk_rows:
+                    yield pd.DataFrame.from_records(records)
+                    records = []
+        if records:
+            yield pd.DataFrame.from_records(records)
+    elif input_format == "parquet":
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows, columns=columns):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"지원하지 않는 입력 형식입니다: {input_format}")
+
+
+def iter_shards(chunks, shard_size):
+    """ 크기가 제각각인 입력 묶음을 정확히 shard_size 행의 샤드로 다시 나눕니다. (마지막 샤드 제외) """
+    pending = []
+    pending_rows = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_rows += len(chunk)
+        while pending_rows >= shard_size:
+            merged = pd.concat(pending, ignore_index=True)
+            yield merged.iloc[:shard_size]
+            rest = merged.iloc[shard_size:]
+            pending = [rest] if len(rest) else []
+            pending_rows = len(rest)
+    if pending_rows:
+        yield pd.concat(pending, ignore_index=True)
+
+
+def completed_shard_count(out_dir):
+    """ 연속으로 완료된 샤드 수를 반환합니다. (임시 파일은 완료로 보지 않음) """
+    count = 0
+    while os.path.exists(os.path.join(out_dir, SHARD_PATTERN.format(count))):
+        count += 1
+    return count
+
+
+def score_shard(model, texts, batch_size):
+    """ 샤드 하나의 텍스트에 대해 KOTE 확률 행렬을 계산합니다. """
+    from SNS.kote_module import predict_chunk_into
+    probabilities = np.zeros((len(texts), len(LABELS)), dtype=np.float32)
+    for offset in range(0, len(texts), batch_size):
+        predict_chunk_into(model, texts[offset:offset + batch_size], probabilities[offset:offset + batch_size])
+    return probabilities
+
+
+def write_shard(out_dir, shard_index, shard_df, probabilities, id_col, keep_columns):
+    """ 확률 샤드를 임시 파일에 쓴 뒤 이름을 바꿔 원자적으로 기록합니다. """
+    result = pd.DataFrame(probabilities, columns=LABELS)
+    if id_col in shard_df.columns:
+        result.insert(0, "comment_id", shard_df[id_col].astype(str).values)
+    for col in reversed(keep_columns):
+        if col in shard_df.columns and col != id_col:
+            result.insert(0, col, shard_df[col].values)
+    path = os.path.join(out_dir, SHARD_PATTERN.format(shard_index))
+    tmp_path = f"{path}.tmp"
+    result.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
+
+
+def run(args):
+    import torch
+    from SNS.kote_module import load_trained_kote_model
+
+    input_format = args.format or detect_format(args.input)
+    os.makedirs(args.out, exist_ok=True)
+    if args.threads:
+        torch.set_num_threads(args.threads)
+
+    done_shards = completed_shard_count(args.out)
+    progress_path = os.path.join(args.out, PROGRESS_FILE)
+    if done_shards and os.path.exists(progress_path):
+        with open(progress_path, encoding="utf-8") as f:
+            previous_shard_size = json.load(f).get("shard_size")
+        if previous_shard_size != args.shard_size:
+            print(f"이전 실행의 샤드 크기({previous_shard_size})와 다릅니다. 같은 --shard-size로 이어서 실행하세요.",
+                  file=sys.stderr)
+            return 1
+    skip_rows = done_shards * args.shard_size
+    if done_shards:
+        print(f"{done_shards}개 샤드가 이미 완료되어 있습니다. {skip_rows:,}번째 댓글부터 이어서 처리합니다.")
+
+    model = load_trained_kote_model(show_message=False)
+    if model is None:
+        print("KOTE 모델을 로드할 수 없습니다. 모델 파일 경로를 확인하세요.", file=sys.stderr)
+        return 1
+
+    shard_index = 0
+    scored_total = 0
+    started = time.perf_counter()
+    for shard_df in iter_shards(iter_input_chunks(args.input, input_format, args.shard_size), args.shard_size):
+        if shard_index < done_shards:
+            # 이미 완료된 샤드는 추론 없이 건너뜁니다.
+            shard_index += 1
+            continue
+        if args.text_col not in shard_df.columns:
+            print(f"입력에 텍스트 컬럼('{args.text_col}')이 없습니다.", file=sys.stderr)
+            return 1
+
+        shard_started = time.perf_counter()
+        texts = shard_df[args.text_col].tolist()
+        probabilities = score_shard(model, texts, args.batch_size)
+        write_shard(args.out, shard_index, shard_df, probabilities, args.id_col, args.keep_columns)
+
+        scored_total += len(shard_df)
+        shard_rate = len(shard_df) / max(time.perf_counter() - shard_started, 1e-9)
+        total_rate = scored_total / max(time.perf_counter() - started, 1e-9)
+        print(f"[shard {shard_index:05d}] {len(shard_df):,}개 완료 - {shard_rate:,.1f} comments/sec "
+              f"(누적 {scored_total:,}개, 평균 {total_rate:,.1f} comments/sec)")
+        with open(os.path.join(args.out, PROGRESS_FILE), "w", encoding="utf-8") as f:
+            json.dump({"input": os.path.abspath(args.input), "completed_shards": shard_index + 1,
+                       "shard_size": args.shard_size}, f, ensure_ascii=False)
+        shard_index += 1
+
+    elapsed = time.perf_counter() - started
+    print(f"완료: 이번 실행에서 {scored_total:,}개 댓글 처리 ({elapsed:,.1f}초, "
+          f"{scored_total / max(elapsed, 1e-9):,.1f} comments/sec)")
+
+    if args.update_emotion_table:
+        from SNS.emotion_series import update_emotion_table
+        update_emotion_table(args.out, args.emotion_table_dir)
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="KOTE 모델로 대량의 댓글을 일괄 감정 분석합니다.")
+    parser.add_argument("input", help="입력 파일 경로 (.jsonl / .csv / .parquet)")
+    parser.add_argument("--out", required=True, help="확률 샤드를 저장할 디렉터리")
+    parser.add_argument("--format", choices=["jsonl", "csv", "parquet"], help="입력 형식 (기본: 확장자로 판단)")
+    parser.add_argument("--text-col", default="text", help="댓글 텍스트 컬럼 이름")
+    parser.add_argument("--id-col", default="comment_id", help="댓글 ID 컬럼 이름")
+    parser.add_argument("--keep-columns", nargs="*", default=DEFAULT_KEEP_COLUMNS,
+                        help="확률 샤드에 함께 저장할 입력 컬럼")
+    parser.add_argument("--batch-size", type=int, default=32, help="한 번에 추론할 댓글 수")
+    parser.add_argument("--shard-size", type=int, default=BATCH_SHARD_SIZE, help="샤드 하나에 담을 댓글 수")
+    parser.add_argument("--threads", type=int, default=0, help="PyTorch CPU 스레드 수 (0: 기본값)")
+    parser.add_argument("--update-emotion-table", action="store_true",
+                        help="완료 후 일별 지역 감정 테이블에 새 샤드를 반영")
+    parser.add_argument("--emotion-table-dir", default=EMOTION_TABLE_DIR, help="일별 지역 감정 테이블 디렉터리")
+    return parser
+
+
+def main(argv=None):
+    return run(build_parser().parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -154,6 +154,38 @@ EMOTION_COLOR_MAP = {
     '없음': '#f5f5f5',         # Very Light Gray
     '기타': '#424242'          # Dark Gray
 }
+# KOTE 감정 레이블의 긍정/중립/부정 분류 (일별 지역 감정 지표 집계에 사용)
+EMOTION_POLARITY_GROUPS = {
+    "positive": ['기쁨', '행복', '즐거움/신남', '감동/감탄', '환영/호의', '고마움', '존경', '기대감',
+                 '뿌듯함', '편안/쾌적', '아껴주는', '흐뭇함(귀여움/예쁨)', '안심/신뢰', '깨달음'],
+    "negative": ['화남/분노', '슬픔', '불평/불만', '짜증', '지긋지긋', '안타까움/실망', '절망', '패배/자기혐오',
+                 '공포/무서움', '역겨움/징그러움', '증오/혐오', '죄책감', '힘듦/지침', '불쌍함/연민',
+                 '부담/안_내킴', '서러움', '불안/걱정'],
+    "neutral": ['놀람', '신기함/관심', '우쭐댐/무시함', '비장함', '의심/불신', '한심함', '어이없음',
+                '당황/난처', '경악', '부끄러움', '귀찮음', '재미없음', '없음'],
+}
+
+# 댓글 텍스트/영상 제목에서 지역을 식별하기 위한 키워드 (지역명은 weather.csv 기준)
+REGION_KEYWORDS = {
+    "서울특별시": ["서울"],
+    "부산광역시": ["부산"],
+    "대구광역시": ["대구"],
+    "인천광역시": ["인천"],
+    "광주광역시": ["광주"],
+    "대전광역시": ["대전"],
+    "울산광역시": ["울산"],
+    "세종특별자치시": ["세종시", "세종특별자치시"],
+    "경기도": ["경기도", "수원", "성남", "고양", "용인", "부천", "파주", "평택", "안산"],
+    "강원도": ["강원", "강릉", "춘천", "원주", "속초", "동해시", "삼척"],
+    "충청북도": ["충북", "충청북도", "청주", "충주", "제천"],
+    "충청남도": ["충남", "충청남도", "천안", "아산", "공주", "서산", "논산"],
+    "전라북도": ["전북", "전라북도", "전주", "군산", "익산"],
+    "전라남도": ["전남", "전라남도", "목포", "여수", "순천"],
+    "경상북도": ["경북", "경상북도", "포항", "경주", "안동", "구미", "울진"],
+    "경상남도": ["경남", "경상남도", "창원", "진주", "김해", "통영", "거제"],
+    "제주특별자치도": ["제주"],
+}
+
 # API 관련
 YOUTUBE_API_SERVICE_NAME = "youtube"
 YOUTUBE_API_VERSION = "v3"
@@ -161,4 +193,13 @@ YOUTUBE_API_VERSION = "v3"
 # 분석 옵션 기본값
 DEFAULT_MAX_SEARCH_RESULTS = 5
 DEFAULT_MAX_COMMENTS_PER_VIDEO = 50
-DEFAULT_EMOTION_THRESHOLD = 0.4
\ No newline at end of file
+DEFAULT_EMOTION_THRESHOLD = 0.4
+
+# 분석 결과 저장소 (세션 간 공유)
+RESULT_STORE_MEMORY_BUDGET_MB = 256 # 메모리에 유지할 분석 결과의 최대 크기
+RESULT_STORE_SPILL_DIR = "SNS/.result_store" # 메모리 초과 시 결과를 내려쓸 디렉터리
+SNAPSHOT_DIR = "SNS/snapshots" # 분석 스냅샷(Parquet) 저장 디렉터리
+
+# 오프라인 일괄 감정 분석 / 일별 지역 감정 지표
+BATCH_SHARD_SIZE = 10000 # 확률 샤드 하나에 담을 댓글 수
+EMOTION_TABLE_DIR = "data/emotion_daily" # 일별 지역 감정 집계 테이블 (Parquet 파트 파일)
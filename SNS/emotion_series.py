@@ -0,0 +1,226 @@
+# emotion_series.py
+"""
+KOTE 확률 샤드(batch_score 결과)를 일별·지역별 긍정/중립/부정 감정 지표로 집계합니다.
+
+집계 테이블은 (date, region)별 합계(comment_count, *_sum)를 Parquet 파트 파일로 추가하는 방식이라,
+새 샤드가 생기면 그 샤드만 집계해 파트 하나를 덧붙이면 됩니다. (전체 기록 재계산 없음)
+내용이 바뀐 샤드는 그 샤드의 파트만 새로 집계해 교체합니다. 단, 압축된 파트에 합쳐진 샤드는
+교체할 수 없으므로 --rebuild로 다시 만들어야 합니다.
+
+사용 예:
+    python -m SNS.emotion_series output/kote_scores
+    python -m SNS.emotion_series output/kote_scores --rebuild
+"""
+import os
+import sys
+import json
+import argparse
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from SNS.config import LABELS, EMOTION_POLARITY_GROUPS, REGION_KEYWORDS, EMOTION_TABLE_DIR
+from utils.cache import budgeted_cache
+
+POLARITIES = ["negative", "neutral", "positive"]
+STATE_FILE = "_state.json"
+PART_PATTERN = "part-{}.parquet"
+COMPACT_THRESHOLD = 32 # 파트 파일이 이 수를 넘으면 하나로 합칩니다.
+
+# (len(LABELS), 3) 행렬: 확률 행렬에 곱하면 극성별 확률 합이 됩니다.
+_POLARITY_MATRIX = np.zeros((len(LABELS), len(POLARITIES)), dtype=np.float32)
+for _col, _polarity in enumerate(POLARITIES):
+    for _label in EMOTION_POLARITY_GROUPS[_polarity]:
+        _POLARITY_MATRIX[LABELS.index(_label), _col] = 1.0
+
+
+def polarity_scores(probabilities):
+    """ 감정 확률 행렬을 댓글별 부정/중립/긍정 점수(합이 1)로 변환합니다. """
+    mass = np.asarray(probabilities, dtype=np.float32) @ _POLARITY_MATRIX
+    total = mass.sum(axis=1, keepdims=True)
+    return np.divide(mass, total, out=np.zeros_like(mass), where=total > 0)
+
+
+def attribute_regions(texts, titles=None):
+    """
+    댓글 텍스트(없으면 영상 제목)에 언급된 지역을 찾아 (행 번호, 지역) 쌍의 DataFrame을 반환합니다.
+    여러 지역이 언급된 댓글은 각 지역에 모두 반영되고, 지역을 찾지 못한 댓글은 제외됩니다.
+    """
+    texts = pd.Series(texts, dtype=object).fillna("").astype(str).reset_index(drop=True)
+    titles = (pd.Series(titles, dtype=object).fillna("").astype(str).reset_index(drop=True)
+              if titles is not None else pd.Series([""] * len(texts)))
+    pieces = []
+    for region, keywords in REGION_KEYWORDS.items():
+        pattern = "|".join(keywords)
+        in_text = texts.str.contains(pattern, regex=True)
+        in_title = titles.str.contains(pattern, regex=True)
+        pieces.append(pd.DataFrame({"row": np.flatnonzero(in_text.to_numpy()), "region": region, "source": 0}))
+        pieces.append(pd.DataFrame({"row": np.flatnonzero(in_title.to_numpy()), "region": region, "source": 1}))
+    matches = pd.concat(pieces, ignore_index=True)
+    if matches.empty:
+        return pd.DataFrame(columns=["row", "region"])
+    # 텍스트에서 지역이 하나라도 발견된 댓글은 제목의 지역을 쓰지 않습니다.
+    best_source = matches.groupby("row")["source"].transform("min")
+    return matches[matches["source"] == best_source][["row", "region"]].drop_duplicates().reset_index(drop=True)
+
+
+def aggregate_shard(shard_df):
+    """ 확률 샤드 하나를 (date, region)별 합계 테이블로 집계합니다. """
+    columns = ["date", "region", "comment_count"] + [f"{p}_sum" for p in POLARITIES]
+    if "published_at" not in shard_df.columns or shard_df.empty:
+        return pd.DataFrame(columns=columns)
+
+    scores = polarity_scores(shard_df[LABELS].to_numpy())
+    # YouTube 게시 시각은 UTC이므로 한국 시간 기준 날짜로 변환합니다.
+    dates = (
+        pd.to_datetime(shard_df["published_at"], errors="coerce", utc=True)
+        .dt.tz_convert("Asia/Seoul").dt.tz_localize(None).dt.normalize().to_numpy()
+    )
+    regions = attribute_regions(
+        shard_df["text"] if "text" in shard_df.columns else [""] * len(shard_df),
+        shard_df["video_title"] if "video_title" in shard_df.columns else None
+    )
+    if regions.empty:
+        return pd.DataFrame(columns=columns)
+
+    rows = regions["row"].to_numpy()
+    long_df = pd.DataFrame({
+        "date": dates[rows],
+        "region": regions["region"].to_numpy(),
+        "comment_count": 1,
+        **{f"{p}_sum": scores[rows, i] for i, p in enumerate(POLARITIES)},
+    }).dropna(subset=["date"])
+    return long_df.groupby(["date", "region"], as_index=False).sum()[columns]
+
+
+def _load_state(table_dir):
+    """ {"shards": {경로: {"signature", "part", "compacted"?}}, "parts": [파트 파일]} """
+    path = os.path.join(table_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {"shards": {}, "parts": []}
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    if "processed_shards" in state:
+        # 이전 형식: 여러 샤드를 한 파트에 합쳐 기록했으므로 샤드별로 교체할 수 없음 (압축된 것으로 취급)
+        state["shards"] = {
+            shard: {"signature": signature, "part": None, "compacted": True}
+            for shard, signature in state.pop("processed_shards").items()
+        }
+    return state
+
+
+def _save_state(table_dir, state):
+    path = os.path.join(table_dir, STATE_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _write_part(table_dir, part_df):
+    name = PART_PATTERN.format(datetime.now().strftime("%Y%m%d%H%M%S%f"))
+    tmp_path = os.path.join(table_dir, f"{name}.tmp")
+    part_df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, os.path.join(table_dir, name))
+    return name
+
+
+def _read_sums(table_dir, parts):
+    frames = [pd.read_parquet(os.path.join(table_dir, part)) for part in parts]
+    if not frames:
+        return pd.DataFrame(columns=["date", "region", "comment_count"] + [f"{p}_sum" for p in POLARITIES])
+    return pd.concat(frames, ignore_index=True).groupby(["date", "region"], as_index=False).sum()
+
+
+def update_emotion_table(shard_dir, table_dir=EMOTION_TABLE_DIR):
+    """
+    shard_dir의 확률 샤드 중 아직 반영하지 않았거나 내용이 바뀐 샤드만 집계하여 감정 테이블에 반영합니다.
+    샤드마다 파트 하나를 쓰며, 바뀐 샤드는 이전 파트를 새 파트로 교체합니다. (이전 집계가 중복되지 않음)
+    반영한 샤드 수를 반환합니다.
+    """
+    os.makedirs(table_dir, exist_ok=True)
+    state = _load_state(table_dir)
+    updated = 0
+    for name in sorted(os.listdir(shard_dir)):
+        if not name.endswith(".parquet"):
+            continue
+        path = os.path.abspath(os.path.join(shard_dir, name))
+        signature = f"{os.path.getsize(path)}:{os.path.getmtime(path)}"
+        entry = state["shards"].get(path)
+        if entry is not None and entry["signature"] == signature:
+            continue
+        if entry is not None and entry.get("compacted"):
+            print(f"건너뜀: {path} (이미 압축된 파트에 합쳐져 있어 다시 반영할 수 없습니다. --rebuild로 다시 만드세요)")
+            continue
+
+        sums = aggregate_shard(pd.read_parquet(path))
+        old_part = entry["part"] if entry is not None else None
+        new_part = _write_part(table_dir, sums) if not sums.empty else None
+        state["shards"][path] = {"signature": signature, "part": new_part}
+        if new_part:
+            state["parts"].append(new_part)
+        if old_part:
+            state["parts"].remove(old_part)
+        _save_state(table_dir, state)
+        if old_part:
+            os.remove(os.path.join(table_dir, old_part))
+        updated += 1
+
+    # 파트가 많아지면 합계만 다시 묶어 하나의 파트로 압축합니다. (원본 샤드는 다시 읽지 않음)
+    if len(state["parts"]) > COMPACT_THRESHOLD:
+        old_parts = state["parts"]
+        merged = _write_part(table_dir, _read_sums(table_dir, old_parts))
+        state["parts"] = [merged]
+        for entry in state["shards"].values():
+            if entry["part"]:
+                entry["part"] = merged
+                entry["compacted"] = True
+        _save_state(table_dir, state)
+        for part in old_parts:
+            os.remove(os.path.join(table_dir, part))
+    else:
+        _save_state(table_dir, state)
+
+    print(f"감정 테이블 갱신: 샤드 {updated}개 반영 (파트 {len(state['parts'])}개)")
+    return updated
+
+
+def emotion_table_version(table_dir=EMOTION_TABLE_DIR):
+    """ 감정 테이블의 버전(상태 파일 수정 시각)을 반환합니다. 테이블이 없으면 None을 반환합니다. """
+    path = os.path.join(table_dir, STATE_FILE)
+    if not os.path.exists(path) or not _load_state(table_dir)["parts"]:
+        return None
+    return os.stat(path).st_mtime_ns
+
+
+@budgeted_cache(max_entries=2)
+def load_emotion_table(table_dir=EMOTION_TABLE_DIR, version=None):
+    """
+    일별 지역 감정 테이블을 emotion_sample.csv와 같은 형태로 읽습니다.
+    (date, region, negative_emotion, neutral_emotion, positive_emotion, comment_count)
+    version은 캐시 무효화용 키로, emotion_table_version()의 값을 전달합니다.
+    """
+    sums = _read_sums(table_dir, _load_state(table_dir)["parts"])
+    emotion = sums[["date", "region", "comment_count"]].copy()
+    for polarity in POLARITIES:
+        emotion[f"{polarity}_emotion"] = (sums[f"{polarity}_sum"] / sums["comment_count"]).round(4)
+    emotion["date"] = pd.to_datetime(emotion["date"])
+    return emotion.sort_values(["date", "region"]).reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="KOTE 확률 샤드를 일별 지역 감정 테이블에 반영합니다.")
+    parser.add_argument("shard_dir", help="batch_score가 만든 확률 샤드 디렉터리")
+    parser.add_argument("--table-dir", default=EMOTION_TABLE_DIR, help="일별 지역 감정 테이블 디렉터리")
+    parser.add_argument("--rebuild", action="store_true", help="기존 테이블을 지우고 처음부터 다시 집계")
+    args = parser.parse_args(argv)
+
+    if args.rebuild and os.path.isdir(args.table_dir):
+        for name in os.listdir(args.table_dir):
+            if name == STATE_FILE or name.endswith(".parquet"):
+                os.remove(os.path.join(args.table_dir, name))
+    update_emotion_table(args.shard_dir, args.table_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,13 @@
 # kote_module.py
+import hashlib
+import numpy as np
 import torch
 import torch.nn as nn
 import pytorch_lightning as pl
 from transformers import ElectraModel, AutoTokenizer
 import streamlit as st
+from utils.tracing import traced
+from utils.cache import budgeted_cache
 from SNS.config import LABELS, KOTE_MODEL_PATH # config.py에서 상수 가져오기
 
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
@@ -39,6 +43,32 @@ class KOTEtagger(pl.LightningModule):
             torch.cuda.empty_cache() # GPU 메모리 정리
         return output
 
+    def predict_batch(self, texts):
+        """
+        여러 텍스트를 한 번에 추론하여 (len(texts), len(LABELS)) 확률 텐서를 반환합니다.
+        배치 안에서 가장 긴 문장 길이에 맞춰 패딩하므로 max_length 패딩보다 빠릅니다.
+        """
+        encoding = self.tokenizer(
+            list(texts),
+            add_special_tokens=True,
+            max_length=512,
+            return_token_type_ids=False,
+            padding=True,
+            truncation=True,
+            return_attention_mask=True,
+            return_tensors='pt',
+        ).to(device)
+
+        with torch.no_grad():
+            output = self.electra(encoding["input_ids"], attention_mask=encoding["attention_mask"])
+            output = output.last_hidden_state[:, 0, :]
+            output = self.classifier(output)
+            output = torch.sigmoid(output)
+
+        if device.type == 'cuda':
+            torch.cuda.empty_cache()
+        return output
+
 @st.cache_resource # 리소스 캐싱으로 모델 재로드 방지
 def load_trained_kote_model(show_message=True):
     """
@@ -69,31 +99,63 @@ def chunks(lst, n):
     for i in range(0, len(lst), n):
         yield lst[i:i + n]
 
-@st.cache_data(show_spinner="텍스트 감성 분석 중... (KOTE)") # 데이터 캐싱 및 스피너 메시지
-def analyze_sentiment_kote_batch(texts, _model_instance, threshold=0.4): # <--- 여기를 수정했습니다.
+def _texts_digest(texts, _model_instance=None):
+    """ 텍스트 목록의 캐시 키 (목록 전체를 해시하는 대신 한 번의 sha1) """
+    hasher = hashlib.sha1()
+    for text_item in texts:
+        hasher.update(str(text_item).encode("utf-8"))
+        hasher.update(b"\x00")
+    return len(texts), hasher.hexdigest()
+
+@traced()
+@budgeted_cache(key=_texts_digest, max_entries=32, show_spinner="텍스트 감성 분석 중... (KOTE)") # 데이터 캐싱 및 스피너 메시지
+def predict_emotion_probabilities(texts, _model_instance):
     """
-    여러 텍스트에 대해 KOTE 모델을 사용하여 감성 분석을 일괄 수행합니다.
-    _model_instance: Streamlit 캐싱에서 해시되지 않도록 밑줄로 시작하는 이름으로 변경
+    여러 텍스트에 대해 KOTE 모델의 감정별 확률 행렬(len(texts) x len(LABELS))을 계산합니다.
+    비어 있거나 분석에 실패한 텍스트의 행은 0으로 채워집니다.
+    _model_instance: 캐시 키에 포함되지 않도록 밑줄로 시작하는 이름으로 변경
     """
-    if not _model_instance or not texts: # <--- 여기를 수정했습니다.
-        return [[] for _ in texts] # 빈 입력에 대한 처리
+    probabilities = np.zeros((len(texts), len(LABELS)), dtype=np.float32)
+    if not _model_instance or not texts:
+        return probabilities
 
-    all_emotions = []
     # 텍스트를 작은 배치로 나누어 처리 (메모리 관리 및 안정성)
-    for text_chunk in chunks(texts, 32): # 배치 크기는 시스템 환경에 따라 조절
-        chunk_emotions = []
-        for text_item in text_chunk:
-            if isinstance(text_item, str) and text_item.strip(): # 유효한 문자열인지 확인
-                try:
-                    preds = _model_instance(text_item)[0] # 모델 예측  # <--- 여기를 수정했습니다.
-                    # 임계값(threshold)보다 높은 확률을 가진 감성 레이블만 선택
-                    emotions = [LABELS[i] for i, p_val in enumerate(preds) if p_val > threshold]
-                    chunk_emotions.append(emotions if emotions else []) # 감정이 없으면 빈 리스트
-                except Exception as e:
-                    # 개별 텍스트 분석 오류 시 로그를 남기거나 빈 결과 반환
-                    # print(f"Warning: Error analyzing sentiment for text: '{text_item[:50]}...' - {e}")
-                    chunk_emotions.append([])
-            else:
-                chunk_emotions.append([]) # 비어 있거나 유효하지 않은 텍스트
-        all_emotions.extend(chunk_emotions)
-    return all_emotions
\ No newline at end of file
+    for offset in range(0, len(texts), 32): # 배치 크기는 시스템 환경에 따라 조절
+        predict_chunk_into(_model_instance, texts[offset:offset + 32], probabilities[offset:offset + 32])
+    return probabilities
+
+def predict_chunk_into(model_instance, text_chunk, out):
+    """
+    텍스트 묶음을 한 번의 배치 추론으로 계산해 out 행렬(len(text_chunk) x len(LABELS))에 채웁니다.
+    유효하지 않은 텍스트의 행은 그대로 두며, 배치 추론이 실패하면 한 문장씩 다시 시도합니다.
+    """
+    valid_rows = [i for i, text_item in enumerate(text_chunk) if isinstance(text_item, str) and text_item.strip()]
+    if not valid_rows:
+        return out
+    try:
+        out[valid_rows] = model_instance.predict_batch([text_chunk[i] for i in valid_rows]).cpu().numpy()
+    except Exception:
+        for i in valid_rows:
+            try:
+                out[i] = model_instance(text_chunk[i])[0].cpu().numpy() # 모델 예측
+            except Exception as e:
+                # 개별 텍스트 분석 오류 시 해당 행은 0으로 유지
+                # print(f"Warning: Error analyzing sentiment for text: '{text_chunk[i][:50]}...' - {e}")
+                pass
+    return out
+
+def probabilities_to_labels(probabilities, threshold=0.4):
+    """ 확률 행렬에서 임계값(threshold)보다 높은 확률을 가진 감성 레이블 리스트를 만듭니다. """
+    labels = np.asarray(LABELS, dtype=object)
+    return [labels[row > threshold].tolist() for row in np.asarray(probabilities)]
+
+@traced()
+def analyze_sentiment_kote_batch(texts, _model_instance, threshold=0.4):
+    """
+    여러 텍스트에 대해 KOTE 모델을 사용하여 감성 분석을 일괄 수행합니다.
+    확률 행렬은 캐시되므로 임계값만 바꾸는 경우 모델을 다시 실행하지 않습니다.
+    """
+    if not _model_instance or not texts:
+        return [[] for _ in texts] # 빈 입력에 대한 처리
+    probabilities = predict_emotion_probabilities(texts, _model_instance)
+    return probabilities_to_labels(probabilities, threshold)
@@ -0,0 +1,252 @@
+# result_store.py
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+from SNS.config import (
+    LABELS, DISASTER_SYNONYMS,
+    RESULT_STORE_MEMORY_BUDGET_MB, RESULT_STORE_SPILL_DIR
+)
+
+# 라벨 비트셋의 비트 순서 (순서를 바꾸면 저장된 결과와 호환되지 않음)
+DISASTER_CATEGORIES = list(DISASTER_SYNONYMS.keys())
+
+# 컬럼별 압축 저장 형식
+_ARROW_STRING_COLUMNS = ["comment_id", "text", "author"]
+_CATEGORICAL_COLUMNS = ["video_id", "video_title"]
+_BITSET_COLUMNS = {
+    # 리스트 컬럼 이름: (비트셋 컬럼 이름, 라벨 목록, dtype)
+    "disaster_labels": ("disaster_bits", DISASTER_CATEGORIES, np.uint32),
+    "sentiment_labels": ("sentiment_bits", LABELS, np.uint64),
+}
+
+
+def probabilities_key(result_key):
+    """ 분석 결과에 딸린 KOTE 확률 테이블의 키 """
+    return f"{result_key}.probabilities"
+
+
+def keywords_key(result_key):
+    """ 분석 결과에 딸린 댓글별 키워드 색인 테이블의 키 """
+    return f"{result_key}.keywords"
+
+
+def make_result_key(video_ids, max_comments_per_video, emotion_threshold):
+    """
+    분석 대상 영상 집합과 분석 옵션으로 결과 키(콘텐츠 주소)를 만듭니다.
+    영상 선택 순서와 무관하게 같은 영상 집합이면 같은 키가 됩니다.
+    """
+    hasher = hashlib.sha1()
+    for video_id in sorted(video_ids):
+        hasher.update(video_id.encode("utf-8") + b"\n")
+    hasher.update(f"max_comments={int(max_comments_per_video)}\n".encode("utf-8"))
+    hasher.update(f"threshold={float(emotion_threshold):.4f}\n".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+def encode_label_bits(label_lists, vocabulary, dtype=np.uint64):
+    """ 라벨 리스트 컬럼을 정수 비트셋 배열로 변환합니다. (vocabulary의 i번째 라벨 -> i번째 비트) """
+    index = {label: i for i, label in enumerate(vocabulary)}
+    bits = np.zeros(len(label_lists), dtype=dtype)
+    for row, labels in enumerate(label_lists):
+        if not isinstance(labels, (list, tuple, set)):
+            continue
+        value = 0
+        for label in labels:
+            position = index.get(label)
+            if position is not None:
+                value |= 1 << position
+        bits[row] = value
+    return bits
+
+
+def decode_label_bits(bits, vocabulary):
+    """ 정수 비트셋 배열을 라벨 리스트로 되돌립니다. (vocabulary 순서 유지) """
+    bits = np.asarray(bits, dtype=np.uint64)
+    positions = np.arange(len(vocabulary), dtype=np.uint64)
+    matrix = ((bits[:, None] >> positions) & np.uint64(1)).astype(bool)
+    vocabulary = np.asarray(vocabulary, dtype=object)
+    return [vocabulary[row].tolist() for row in matrix]
+
+
+def encode_comments(df):
+    """ 분석 결과 DataFrame을 Arrow 문자열, 범주형, 비트셋 컬럼으로 압축합니다. """
+    encoded = pd.DataFrame(index=pd.RangeIndex(len(df)))
+    for col in df.columns:
+        values = df[col].reset_index(drop=True)
+        if col in _BITSET_COLUMNS:
+            bits_col, vocabulary, dtype = _BITSET_COLUMNS[col]
+            encoded[bits_col] = encode_label_bits(values.tolist(), vocabulary, dtype)
+        elif col in _ARROW_STRING_COLUMNS:
+            encoded[col] = values.astype("string[pyarrow]")
+        elif col in _CATEGORICAL_COLUMNS:
+            encoded[col] = values.astype("category")
+        elif col == "like_count":
+            encoded[col] = pd.to_numeric(values, errors="coerce").fillna(0).astype(np.int32)
+        elif col == "comment_hour":
+            encoded[col] = values.astype("Int8")
+        else:
+            encoded[col] = values
+    return encoded
+
+
+def decode_comments(encoded):
+    """ 압축된 결과를 분석 탭에서 사용하는 형태(라벨 리스트 컬럼)로 복원합니다. """
+    df = encoded.copy()
+    for list_col, (bits_col, vocabulary, _) in _BITSET_COLUMNS.items():
+        if bits_col in df.columns:
+            df[list_col] = decode_label_bits(df.pop(bits_col).to_numpy(), vocabulary)
+    return df
+
+
+def _select_columns(table, columns):
+    if table is None or columns is None:
+        return table
+    return table[[col for col in columns if col in table.columns]]
+
+
+class AnalysisResultStore:
+    """
+    여러 세션이 공유하는 분석 결과 저장소입니다.
+    - 결과는 make_result_key로 만든 키 하나에 한 번만 저장되고, 세션은 키(handle)만 보관합니다.
+    - 메모리 사용량이 예산을 넘으면 가장 오래 사용하지 않은 결과부터 디스크(Parquet)로 내려씁니다.
+    - put_source로 등록한 테이블(스냅샷 등)은 미리 읽지 않고, get_table에서 요청된 컬럼만 읽어 메모리에 붙입니다.
+    """
+
+    def __init__(self, memory_budget_bytes, spill_dir):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.spill_dir = spill_dir
+        self._entries = OrderedDict() # key -> (encoded_df, nbytes), 최근 사용 순서 유지
+        self._memory_bytes = 0
+        self._sources = {} # key -> read_columns(columns) 함수 (디스크에 이미 있는 테이블)
+        self._complete_sources = set() # 전체 컬럼을 이미 읽은 source 키
+        self._lock = threading.RLock()
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.parquet")
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._entries or key in self._sources or os.path.exists(self._spill_path(key))
+
+    @property
+    def memory_bytes(self):
+        return self._memory_bytes
+
+    def put(self, key, df):
+        """ 분석 결과를 압축하여 저장하고 handle(키)을 반환합니다. """
+        return self.put_table(key, encode_comments(df))
+
+    def get(self, key, columns=None):
+        """
+        handle에 해당하는 분석 결과를 복원하여 반환합니다. 없으면 None을 반환합니다.
+        columns: 읽을 압축 형식 컬럼 목록 (None이면 전체, 라벨 컬럼은 disaster_bits/sentiment_bits로 지정)
+        """
+        encoded = self.get_table(key, columns)
+        if encoded is None:
+            return None
+        return decode_comments(encoded)
+
+    def put_table(self, key, table):
+        """ 부가 테이블(확률 행렬, 키워드 색인 등)을 변환 없이 저장합니다. """
+        with self._lock:
+            self._insert(key, table)
+            self._evict()
+        return key
+
+    def put_source(self, key, read_columns):
+        """
+        디스크에 이미 있는 테이블을 읽지 않고 등록합니다. (스냅샷 복원 등)
+        read_columns(columns)는 요청된 컬럼만 읽은 DataFrame을 반환해야 합니다. (columns가 None이면 전체)
+        """
+        with self._lock:
+            self._sources[key] = read_columns
+            self._complete_sources.discard(key)
+            if key in self._entries:
+                self._memory_bytes -= self._entries.pop(key)[1]
+        return key
+
+    def get_table(self, key, columns=None):
+        """
+        저장된 테이블을 반환합니다. columns를 지정하면 해당 컬럼만 반환합니다. (없는 컬럼은 무시)
+        디스크로 내려간 테이블은 다시 메모리로 올리고, source 테이블은 아직 읽지 않은 컬럼만 읽어 붙입니다.
+        """
+        with self._lock:
+            if key in self._sources:
+                return _select_columns(self._read_source(key, columns), columns)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return _select_columns(self._entries[key][0], columns)
+            path = self._spill_path(key)
+            if not os.path.exists(path):
+                return None
+            encoded = pd.read_parquet(path)
+            for col in _ARROW_STRING_COLUMNS:
+                if col in encoded.columns:
+                    encoded[col] = encoded[col].astype("string[pyarrow]")
+            self._insert(key, encoded)
+            self._evict(keep=key)
+            return _select_columns(encoded, columns)
+
+    def _read_source(self, key, columns):
+        cached = self._entries[key][0] if key in self._entries else None
+        if cached is not None:
+            self._entries.move_to_end(key)
+            if key in self._complete_sources:
+                return cached
+        if columns is None:
+            table = self._sources[key](None)
+            self._complete_sources.add(key)
+        else:
+            missing = [col for col in columns if cached is None or col not in cached.columns]
+            if not missing:
+                return cached
+            part = self._sources[key](missing)
+            if cached is None:
+                table = part
+            else:
+                # 같은 파일을 같은 순서로 읽으므로 행 순서가 같음 (이미 있는 컬럼은 다시 붙이지 않음)
+                part = part[[col for col in part.columns if col not in cached.columns]]
+                table = pd.concat([cached, part.set_index(cached.index)], axis=1)
+        self._insert(key, table)
+        self._evict(keep=key)
+        return table
+
+    def _insert(self, key, encoded):
+        if key in self._entries:
+            self._memory_bytes -= self._entries.pop(key)[1]
+        nbytes = int(encoded.memory_usage(deep=True).sum())
+        self._entries[key] = (encoded, nbytes)
+        self._memory_bytes += nbytes
+
+    def _evict(self, keep=None):
+        """ 메모리 예산을 넘는 동안 LRU 순서로 결과를 디스크에 내려씁니다. """
+        while self._memory_bytes > self.memory_budget_bytes and len(self._entries) > 1:
+            key = next(iter(self._entries))
+            if key == keep:
+                self._entries.move_to_end(key)
+                key = next(iter(self._entries))
+            encoded, nbytes = self._entries.pop(key)
+            self._memory_bytes -= nbytes
+            if key in self._sources:
+                # 원본이 디스크에 있으므로 내려쓰지 않고 버림 (다음 조회 때 필요한 컬럼만 다시 읽음)
+                self._complete_sources.discard(key)
+                continue
+            path = self._spill_path(key)
+            if not os.path.exists(path):
+                os.makedirs(self.spill_dir, exist_ok=True)
+                tmp_path = f"{path}.tmp"
+                encoded.to_parquet(tmp_path, index=False)
+                os.replace(tmp_path, path)
+
+
+@st.cache_resource
+def get_result_store():
+    """ 프로세스 전체에서 공유하는 분석 결과 저장소를 반환합니다. (캐시됨) """
+    return AnalysisResultStore(
+        memory_budget_bytes=RESULT_STORE_MEMORY_BUDGET_MB * 1024 * 1024,
+        spill_dir=RESULT_STORE_SPILL_DIR
+    )
@@ -0,0 +1,162 @@
+# snapshot.py
+import os
+import json
+import shutil
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.dataset as ds
+from SNS.config import LABELS, SNAPSHOT_DIR
+import SNS.result_store as result_store
+
+SNAPSHOT_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+
+# 스냅샷 구성 파일 (manifest의 "files" 항목과 동일)
+COMMENTS_DIR = "comments"                   # 댓글 + 라벨 비트셋, video_id로 파티션
+PROBABILITIES_FILE = "probabilities.parquet" # KOTE 확률 행렬 (comment_id + 감정별 컬럼)
+KEYWORDS_FILE = "keywords.parquet"           # 댓글별 키워드 색인
+VIDEOS_FILE = "videos.parquet"               # 영상 메타데이터
+
+
+def list_snapshots(snapshot_dir=SNAPSHOT_DIR):
+    """ 저장된 스냅샷의 manifest 목록을 최신순으로 반환합니다. """
+    if not os.path.isdir(snapshot_dir):
+        return []
+    manifests = []
+    for name in os.listdir(snapshot_dir):
+        manifest_path = os.path.join(snapshot_dir, name, MANIFEST_FILE)
+        if os.path.exists(manifest_path):
+            with open(manifest_path, encoding="utf-8") as f:
+                manifests.append(json.load(f))
+    return sorted(manifests, key=lambda m: m.get("created_at", ""), reverse=True)
+
+
+def save_snapshot(name, result_key, comments_df, probabilities_df, keyword_index_df, videos,
+                  params=None, snapshot_dir=SNAPSHOT_DIR):
+    """
+    분석 결과 전체를 Parquet 스냅샷으로 저장하고 스냅샷 경로를 반환합니다.
+    - comments_df: 분석 탭에서 사용하는 형태의 댓글 DataFrame (라벨 리스트 컬럼 포함)
+    - probabilities_df: comment_id와 감정(LABELS)별 확률 컬럼
+    - keyword_index_df: text_analysis_module.build_keyword_index의 결과
+    - videos: 영상 메타데이터 dict 목록 (id, title, thumbnail, published_at)
+    같은 이름의 스냅샷이 있으면 덮어씁니다. (임시 디렉터리에 쓴 뒤 교체)
+    """
+    final_path = os.path.join(snapshot_dir, name)
+    tmp_path = f"{final_path}.tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+    os.makedirs(tmp_path)
+
+    encoded = result_store.encode_comments(comments_df)
+    encoded["video_id"] = encoded["video_id"].astype(str) # 파티션 컬럼은 문자열로 저장
+    pq.write_to_dataset(
+        pa.Table.from_pandas(encoded, preserve_index=False),
+        root_path=os.path.join(tmp_path, COMMENTS_DIR),
+        partition_cols=["video_id"]
+    )
+    if probabilities_df is not None:
+        probabilities_df.to_parquet(os.path.join(tmp_path, PROBABILITIES_FILE), index=False)
+    if keyword_index_df is not None:
+        keyword_index_df.to_parquet(os.path.join(tmp_path, KEYWORDS_FILE), index=False)
+    pd.DataFrame(videos, columns=["id", "title", "thumbnail", "published_at"]).to_parquet(
+        os.path.join(tmp_path, VIDEOS_FILE), index=False
+    )
+
+    manifest = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "name": name,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "result_key": result_key,
+        "params": params or {},
+        "row_count": int(len(comments_df)),
+        "video_count": int(comments_df["video_id"].nunique()) if "video_id" in comments_df.columns else 0,
+        "labels": list(LABELS),
+        "disaster_categories": list(result_store.DISASTER_CATEGORIES),
+        "files": {
+            "comments": COMMENTS_DIR,
+            "probabilities": PROBABILITIES_FILE if probabilities_df is not None else None,
+            "keywords": KEYWORDS_FILE if keyword_index_df is not None else None,
+            "videos": VIDEOS_FILE,
+        },
+    }
+    with open(os.path.join(tmp_path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    shutil.rmtree(final_path, ignore_errors=True)
+    os.replace(tmp_path, final_path)
+    return final_path
+
+
+class Snapshot:
+    """
+    저장된 스냅샷에 대한 지연 로딩 뷰입니다.
+    manifest만 먼저 읽고, 각 테이블은 요청된 컬럼만 필요할 때 읽습니다.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 스냅샷 형식입니다: {self.manifest.get('format_version')}")
+        if self.manifest.get("labels") != list(LABELS):
+            raise ValueError("스냅샷의 감정 레이블 목록이 현재 KOTE 레이블과 다릅니다.")
+
+    @property
+    def result_key(self):
+        return self.manifest["result_key"]
+
+    def _file(self, name):
+        file_name = self.manifest["files"].get(name)
+        return os.path.join(self.path, file_name) if file_name else None
+
+    def comments(self, columns=None, video_ids=None):
+        """ 압축된(비트셋) 형태의 댓글 테이블을 읽습니다. 필요한 컬럼/영상만 읽을 수 있습니다. """
+        dataset = ds.dataset(self._file("comments"), format="parquet", partitioning="hive")
+        if columns is not None:
+            columns = [col for col in columns if col in dataset.schema.names]
+        row_filter = ds.field("video_id").isin(list(video_ids)) if video_ids else None
+        table = dataset.to_table(columns=columns, filter=row_filter)
+        df = table.to_pandas()
+        if "video_id" in df.columns:
+            df["video_id"] = df["video_id"].astype(str).astype("category")
+        for col in ["comment_id", "text", "author"]:
+            if col in df.columns:
+                df[col] = df[col].astype("string[pyarrow]")
+        return df
+
+    def probabilities(self, labels=None):
+        """ KOTE 확률 행렬을 읽습니다. labels를 지정하면 해당 감정 컬럼만 읽습니다. """
+        path = self._file("probabilities")
+        if path is None:
+            return None
+        columns = None if labels is None else ["comment_id"] + list(labels)
+        return pd.read_parquet(path, columns=columns)
+
+    def keyword_index(self, columns=None):
+        path = self._file("keywords")
+        return pd.read_parquet(path, columns=columns) if path else None
+
+    def videos(self):
+        return pd.read_parquet(self._file("videos"))
+
+
+def restore_snapshot(snapshot, store):
+    """
+    스냅샷을 공유 결과 저장소에 등록하고 결과 handle을 반환합니다.
+    네트워크나 모델 호출 없이 분석 결과 탭을 그대로 복원할 수 있습니다.
+    복원 시점에는 manifest만 읽고, 각 테이블은 탭이 조회할 때 필요한 컬럼만 읽습니다. (store.put_source)
+    """
+    key = snapshot.result_key
+    if key not in store:
+        store.put_source(key, lambda columns: snapshot.comments(columns=columns))
+    probabilities_key = result_store.probabilities_key(key)
+    if snapshot.manifest["files"].get("probabilities") and probabilities_key not in store:
+        store.put_source(probabilities_key, lambda columns: snapshot.probabilities(
+            None if columns is None else [col for col in columns if col in LABELS]
+        ))
+    keywords_key = result_store.keywords_key(key)
+    if snapshot.manifest["files"].get("keywords") and keywords_key not in store:
+        store.put_source(keywords_key, snapshot.keyword_index)
+    return key
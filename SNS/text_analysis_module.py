@@ -1,7 +1,9 @@
 # text_analysis_module.py
 import re
+import pandas as pd
 from collections import Counter
 import streamlit as st # Okt 로드 시 캐시 사용 및 get_okt_instance 데코레이터에 필요
+from utils.tracing import traced
 from konlpy.tag import Okt
 from SNS.config import DISASTER_SYNONYMS, DEFAULT_STOPWORDS # config.py에서 상수 가져오기
 
@@ -51,9 +53,9 @@ def label_disaster(comment_text):
                 # break
     return list(labels)
 
-def extract_keywords(text, num_keywords=10, custom_stopwords=None):
+def extract_nouns(text, custom_stopwords=None):
     """
-    주어진 텍스트에서 명사를 추출하고, 불용어를 제거한 후 상위 키워드를 반환합니다.
+    주어진 텍스트에서 명사를 추출하고, 불용어와 한 글자 단어를 제거한 목록을 반환합니다.
     Okt 형태소 분석기를 사용합니다.
     """
     if not isinstance(text, str) or not text.strip():
@@ -74,15 +76,45 @@ def extract_keywords(text, num_keywords=10, custom_stopwords=None):
     # 3. 불용어 처리 및 단어 길이 필터링
     # 사용할 불용어 목록을 구성합니다. (기본 불용어 + 사용자 정의 불용어)
     stopwords_to_use = DEFAULT_STOPWORDS + (custom_stopwords if custom_stopwords is not None else [])
-    meaningful_nouns = [
+    return [
         noun for noun in nouns
         if len(noun) > 1 and noun not in stopwords_to_use # 한 글자 단어 및 불용어 목록에 없는 단어만 선택
     ]
 
+@traced()
+def extract_keywords(text, num_keywords=10, custom_stopwords=None):
+    """
+    주어진 텍스트에서 명사를 추출하고, 불용어를 제거한 후 상위 키워드를 반환합니다.
+    Okt 형태소 분석기를 사용합니다.
+    """
+    meaningful_nouns = extract_nouns(text, custom_stopwords)
+
     if not meaningful_nouns:
         return [] # 의미 있는 명사가 없으면 빈 리스트 반환
 
     # 4. 빈도수 계산 및 상위 키워드 반환
     # Counter 객체는 (요소, 빈도수) 튜플의 리스트를 반환합니다.
     count = Counter(meaningful_nouns)
-    return count.most_common(num_keywords)
\ No newline at end of file
+    return count.most_common(num_keywords)
+
+@traced()
+def build_keyword_index(comment_ids, texts):
+    """
+    댓글별 키워드 색인(comment_id, keyword, count)을 만듭니다.
+    한 번 만들어 두면 댓글 부분집합의 상위 키워드를 형태소 분석 없이 집계할 수 있습니다.
+    """
+    rows = []
+    for comment_id, text in zip(comment_ids, texts):
+        for keyword, count in Counter(extract_nouns(text)).items():
+            rows.append((comment_id, keyword, count))
+    return pd.DataFrame(rows, columns=["comment_id", "keyword", "count"])
+
+def keywords_from_index(keyword_index, comment_ids, num_keywords=10):
+    """ 키워드 색인에서 주어진 댓글들의 상위 키워드를 [('단어', 빈도), ...] 형태로 반환합니다. """
+    if keyword_index is None or keyword_index.empty:
+        return []
+    subset = keyword_index[keyword_index["comment_id"].isin(list(comment_ids))]
+    if subset.empty:
+        return []
+    totals = subset.groupby("keyword", sort=False)["count"].sum().sort_values(ascending=False, kind="stable")
+    return [(keyword, int(count)) for keyword, count in totals.head(num_keywords).items()]
@@ -1,15 +1,18 @@
 # ui_helpers.py
 import streamlit as st
+from utils.tracing import traced
+from utils.cache import budgeted_cache
 import pandas as pd
 import plotly.express as px
 from wordcloud import WordCloud
-import matplotlib.pyplot as plt
 import numpy as np 
 import os
+import hashlib
 # 💡 [핵심] config 모듈을 임포트하여 색상 맵을 사용합니다.
 import SNS.config as config
 from io import BytesIO
 
+@traced(rows=None)
 def create_donut_chart(df, names_col, values_col, title, key_suffix=""):
     """ Plotly Express를 사용하여 도넛 차트를 생성하고 표시합니다. """
     if df.empty or not all(col in df.columns for col in [names_col, values_col]):
@@ -47,6 +50,7 @@ def display_dataframe_with_title(df, title, key_suffix=""):
     else:
         st.info(f"'{title}'에 대한 데이터가 없습니다.")
 
+@traced(rows=None)
 def create_bar_chart(df, x_col, y_col, title, color_col=None, orientation='v', top_n=None, key_suffix=""):
     """ 
     Plotly Express를 사용하여 막대 차트를 생성하고,
@@ -94,6 +98,7 @@ def create_bar_chart(df, x_col, y_col, title, color_col=None, orientation='v', t
 
     st.plotly_chart(fig, use_container_width=True, key=f"bar_chart_{key_suffix}")
 
+@traced(rows=None)
 def create_line_chart(df, x_col, y_col, color_col, title, x_label, y_label, color_label, markers=True, x_tickvals=None, xaxis_range=None):
     """ 
     Plotly Express를 사용하여 라인 차트를 생성하고 표시합니다.
@@ -134,40 +139,70 @@ def create_line_chart(df, x_col, y_col, color_col, title, x_label, y_label, colo
         
     st.plotly_chart(fig, use_container_width=True)
 
-def create_wordcloud(word_counts_dict, title=None):
-    """ Matplotlib과 WordCloud를 사용하여 원형 워드 클라우드를 생성하고, 크기를 줄여 가운데 정렬하여 표시합니다. """
-    if not word_counts_dict:
-        st.info("워드 클라우드를 생성할 키워드가 없습니다.")
-        return
+# 워드 클라우드 렌더링 설정
+WORDCLOUD_SIZE = 800
+WORDCLOUD_FONT_PATH = os.path.join(os.path.dirname(__file__), "malgun.ttf")
+WORDCLOUD_CACHE_MAX_ENTRIES = 64 # 캐시에 보관할 최대 이미지 수 (메모리 상한)
+
+
+def _build_circle_mask(size):
+    """ 지정한 크기의 원형 마스크를 생성합니다. (원 바깥 영역이 255) """
+    radius = size // 2
+    x, y = np.ogrid[:size, :size]
+    mask_shape = (x - radius) ** 2 + (y - radius) ** 2 > radius ** 2
+    return (255 * mask_shape).astype(np.uint8)
 
-    # 1. 원형 마스크 생성 (기존과 동일)
-    x, y = np.ogrid[:800, :800]
-    mask_shape = (x - 400) ** 2 + (y - 400) ** 2 > 400 ** 2
-    mask = 255 * mask_shape.astype(int)
+# 원형 마스크는 모듈 로드 시 한 번만 생성합니다.
+_CIRCLE_MASK = _build_circle_mask(WORDCLOUD_SIZE)
 
-    # 2. 워드 클라우드 생성 (기존과 동일)
-    font_path = os.path.join(os.path.dirname(__file__), "malgun.ttf")
+
+def _word_counts_digest(word_counts_dict):
+    """ 빈도 딕셔너리의 내용으로 캐시 키로 사용할 해시값을 만듭니다. (순서 무관) """
+    hasher = hashlib.sha1()
+    for word, count in sorted(word_counts_dict.items()):
+        hasher.update(f"{word}\t{count}\n".encode("utf-8"))
+    return hasher.hexdigest()
+
+
+@budgeted_cache(max_entries=WORDCLOUD_CACHE_MAX_ENTRIES)
+def render_wordcloud_image(digest, _word_counts_dict, font_path=WORDCLOUD_FONT_PATH, size=WORDCLOUD_SIZE, image_format="PNG"):
+    """
+    워드 클라우드를 이미지 bytes(PNG/WebP)로 렌더링합니다.
+    캐시 키는 (빈도 해시, 폰트, 크기, 포맷)이며, 빈도 딕셔너리 자체는 해시하지 않습니다.
+    반환값: (image_bytes, font_error) - 폰트 로드 실패 시 font_error에 오류 메시지가 담깁니다.
+    """
+    mask = _CIRCLE_MASK if size == WORDCLOUD_SIZE else _build_circle_mask(size)
+    font_error = None
     try:
         wc = WordCloud(
             font_path=font_path,
-            width=800, height=800,
+            width=size, height=size,
             background_color='white', colormap='viridis', mask=mask
-        ).generate_from_frequencies(word_counts_dict)
+        ).generate_from_frequencies(_word_counts_dict)
     except Exception as e:
-        st.warning(f"한글 폰트 파일을 찾을 수 없습니다. (오류: {e}).")
-        wc = WordCloud(width=800, height=800, background_color='white', colormap='Set2', mask=mask).generate_from_frequencies(word_counts_dict)
+        font_error = str(e)
+        wc = WordCloud(width=size, height=size, background_color='white', colormap='Set2', mask=mask).generate_from_frequencies(_word_counts_dict)
 
-    # 3. Figure를 이미지 Bytes로 변환 (기존과 동일)
-    fig, ax = plt.subplots(figsize=(10, 10))
-    ax.imshow(wc, interpolation='bilinear')
-    ax.axis("off")
+    # Matplotlib Figure를 거치지 않고 WordCloud 결과를 바로 이미지로 저장합니다.
     buf = BytesIO()
-    fig.savefig(buf, format="png", bbox_inches='tight', pad_inches=0)
-    image_bytes = buf.getvalue()
+    wc.to_image().save(buf, format=image_format)
+    return buf.getvalue(), font_error
 
-    # ------------------ [핵심 수정 부분 시작] ------------------
 
-    # 4. st.columns를 사용하여 가운데 정렬 및 크기 조절
+@traced(rows=None)
+def create_wordcloud(word_counts_dict, title=None, image_format="PNG"):
+    """ 원형 워드 클라우드를 생성하고, 크기를 줄여 가운데 정렬하여 표시합니다. (렌더링 결과는 캐시됨) """
+    if not word_counts_dict:
+        st.info("워드 클라우드를 생성할 키워드가 없습니다.")
+        return
+
+    image_bytes, font_error = render_wordcloud_image(
+        _word_counts_digest(word_counts_dict), word_counts_dict,
+        font_path=WORDCLOUD_FONT_PATH, size=WORDCLOUD_SIZE, image_format=image_format
+    )
+    if font_error:
+        st.warning(f"한글 폰트 파일을 찾을 수 없습니다. (오류: {font_error}).")
+
     if title:
         st.markdown(f"{title}")
 
@@ -178,4 +213,3 @@ def create_wordcloud(word_counts_dict, title=None):
     # 가운데 컬럼(image_column)에만 이미지를 표시합니다.
     with image_column:
         st.image(image_bytes, use_container_width=True)
-    
\ No newline at end of file
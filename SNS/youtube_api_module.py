@@ -1,5 +1,7 @@
 # youtube_api_module.py
 import streamlit as st
+from utils.tracing import traced
+from utils.cache import budgeted_cache
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from datetime import datetime
@@ -14,7 +16,8 @@ except KeyError:
     # app.py에서 API 키 존재 여부를 확인하므로 여기서는 오류를 발생시키지 않을 수 있음
     # 또는 여기서 st.error를 호출하고 None을 반환하여 app.py에서 처리
 
-@st.cache_data(ttl=3600, show_spinner="YouTube에서 영상 검색 중...") # 1시간 캐시, 스피너
+@traced()
+@budgeted_cache(ttl=3600, max_entries=64, show_spinner="YouTube에서 영상 검색 중...") # 1시간 캐시, 스피너
 def search_youtube_videos(query, order="relevance", max_results=25, region_code="KR", lang="ko"):
     """
     YouTube API를 사용하여 특정 쿼리로 비디오를 검색합니다.
@@ -54,7 +57,8 @@ def search_youtube_videos(query, order="relevance", max_results=25, region_code=
         st.error(f"영상 검색 중 예상치 못한 오류 발생: {e}")
     return videos
 
-@st.cache_data(ttl=3600, show_spinner=False) # 댓글 수집은 개별 영상마다 호출되므로 스피너는 app.py에서 관리
+@traced()
+@budgeted_cache(ttl=3600, max_entries=256, max_bytes=128 * 1024 * 1024) # 댓글 수집은 개별 영상마다 호출되므로 스피너는 app.py에서 관리
 def get_video_comments(video_id, max_results_per_call=100, total_max_comments=100):
     """
     특정 비디오 ID에 대한 댓글을 수집합니다.
@@ -2,7 +2,11 @@
 import streamlit as st
 import pandas as pd
 from streamlit_option_menu import option_menu
-from util import load_data
+from util import LazyTables
+from utils.tracing import trace_rerun, render_trace_panel
+from utils.profiling import profile_rerun, render_profile_panel
+from utils.warmup import render_warmup_status
+from utils.cache import render_cache_panel
 ## 호출
 from home import run_home
 from message.message_home import run_message
@@ -10,6 +14,7 @@ from relationship.relationship_home import run_relationship
 from SNS.app import run_sns
 from hitmap.hitmap_home import run_hitmap
 from move.main import run_move
+from query.query_home import run_query
 
 st.set_page_config(page_title="빅데이터 분석 프로젝트 3조", layout="wide")
 
@@ -28,30 +33,43 @@ download_model_from_huggingface(MODEL_URL, LOCAL_PATH)
 
 
 def main():
-    
+
+    # 서버 프로세스당 한 번 백그라운드 캐시 워밍업 시작 (진행 중이면 사이드바에 진행률 표시)
+    render_warmup_status()
+
     with st.sidebar:
         sidebar_selected = option_menu(
-            "재난 문자/경보 데이터 분석 - 기후 위기 체감 분석", ["Home", "재난문자 추이 분석", "기상현상과 발송 관계 분석", "SNS 감정 변화 분석", "지역별 재난 발생 유형 분석", "시간 흐름 분석"],
-                                              icons = ["house", "bar_chart", "chart_with_upwards_trend", "left_speech_bubble", "world_map", "stopwatch"],
+            "재난 문자/경보 데이터 분석 - 기후 위기 체감 분석", ["Home", "재난문자 추이 분석", "기상현상과 발송 관계 분석", "SNS 감정 변화 분석", "지역별 재난 발생 유형 분석", "시간 흐름 분석", "SQL 질의"],
+                                              icons = ["house", "bar_chart", "chart_with_upwards_trend", "left_speech_bubble", "world_map", "stopwatch", "database"],
                                               menu_icon = "cast", default_index = 0
         )
 
-    total_df = load_data()
-    
-    if sidebar_selected == "Home":
-        run_home()
-    elif sidebar_selected == "재난문자 추이 분석":
-        run_message(total_df)
-    elif sidebar_selected == "기상현상과 발송 관계 분석":
-        run_relationship(total_df)
-    elif sidebar_selected == "SNS 감정 변화 분석":
-        run_sns()
-    elif sidebar_selected == "지역별 재난 발생 유형 분석":
-        run_hitmap(total_df)
-    elif sidebar_selected == "시간 흐름 분석":
-        run_move(total_df)
-    else:
-        print("error")
+    # 페이지 rerun 단위로 구간별 소요 시간을 기록 (logs/traces.jsonl, 사이드바 성능 패널)
+    # 프로파일링이 요청된 rerun이면 cProfile/tracemalloc 결과도 저장 (logs/profiles)
+    with profile_rerun(sidebar_selected), trace_rerun(sidebar_selected):
+        # 페이지가 테이블에 처음 접근할 때 load_data()로 읽음 (파티션 저장소만 쓰면 읽지 않음)
+        total_df = LazyTables()
+
+        if sidebar_selected == "Home":
+            run_home()
+        elif sidebar_selected == "재난문자 추이 분석":
+            run_message(total_df)
+        elif sidebar_selected == "기상현상과 발송 관계 분석":
+            run_relationship(total_df)
+        elif sidebar_selected == "SNS 감정 변화 분석":
+            run_sns()
+        elif sidebar_selected == "지역별 재난 발생 유형 분석":
+            run_hitmap(total_df)
+        elif sidebar_selected == "시간 흐름 분석":
+            run_move(total_df)
+        elif sidebar_selected == "SQL 질의":
+            run_query()
+        else:
+            print("error")
+
+    render_trace_panel(sidebar_selected)
+    render_profile_panel(sidebar_selected)
+    render_cache_panel()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
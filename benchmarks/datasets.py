@@ -0,0 +1,87 @@
+# benchmarks/datasets.py
+"""
+벤치마크/부하 테스트용 데이터 크기 조절입니다.
+data 폴더의 CSV를 날짜축으로 factor배 이어 붙이거나(tile) 합성 데이터를 만들어(synthetic)
+임시 작업 폴더의 data/에 둡니다.
+"""
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from SNS.config import LABELS, DISASTER_SYNONYMS
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATE_COLUMNS = {"alerts": "날짜", "weather": "날짜", "emotion_sample": "date"}
+DEFAULT_SOURCE = "tile"
+SYNTHETIC_SEED = 0
+LINKED_PATHS = ("geo", "SNS/kote_pytorch_lightning.bin") # 작업 폴더에서도 같은 상대 경로로 보이도록 연결
+
+
+def read_source(data_dir="data"):
+    """ 원본 CSV들을 읽습니다. (지역 등은 문자열 그대로) """
+    return {
+        os.path.splitext(name)[0]: pd.read_csv(os.path.join(data_dir, name))
+        for name in sorted(os.listdir(data_dir)) if name.endswith(".csv")
+    }
+
+
+def scale_frames(frames, factor):
+    """ 각 데이터의 날짜를 전체 기간만큼씩 밀어 factor번 이어 붙인 데이터를 반환합니다. """
+    if factor == 1:
+        return {name: df.copy() for name, df in frames.items()}
+    dates = pd.concat([pd.to_datetime(frames[name][col]) for name, col in DATE_COLUMNS.items() if name in frames])
+    span = (dates.max() - dates.min()).normalize() + pd.Timedelta(days=1)
+    scaled = {}
+    for name, df in frames.items():
+        col = DATE_COLUMNS.get(name)
+        if col is None:
+            scaled[name] = df.copy()
+            continue
+        base = pd.to_datetime(df[col])
+        pieces = []
+        for i in range(factor):
+            piece = df.copy()
+            piece[col] = (base + span * i).dt.strftime("%Y-%m-%d")
+            pieces.append(piece)
+        scaled[name] = pd.concat(pieces, ignore_index=True)
+    return scaled
+
+
+def write_frames(frames, data_dir):
+    os.makedirs(data_dir, exist_ok=True)
+    for name, df in frames.items():
+        df.to_csv(os.path.join(data_dir, f"{name}.csv"), index=False)
+
+
+def prepare_workspace(frames, scale, source=DEFAULT_SOURCE, profile=None):
+    """
+    임시 작업 폴더를 만들어 data/에 배율 scale의 CSV를 쓰고 경로를 반환합니다.
+    앱이 상대 경로로 읽는 모델 파일, 지도 폴더는 저장소의 것을 링크합니다.
+    """
+    workspace = tempfile.mkdtemp(prefix=f"bdap_{source}_x{scale}_")
+    if source == "synthetic":
+        from benchmarks.synthetic import generate_dataset
+        generate_dataset(os.path.join(workspace, "data"), scale, seed=SYNTHETIC_SEED, profile=profile)
+    else:
+        write_frames(scale_frames(frames, scale), os.path.join(workspace, "data"))
+    for rel_path in LINKED_PATHS:
+        target = os.path.join(REPO_ROOT, rel_path)
+        if os.path.exists(target):
+            link = os.path.join(workspace, rel_path)
+            os.makedirs(os.path.dirname(link) or workspace, exist_ok=True)
+            os.symlink(target, link)
+    return workspace
+
+
+def synthetic_comments(n, seed=0):
+    """ SNS 분석 단계용 댓글(분석 결과 컬럼 포함)과 KOTE 확률 행렬 """
+    from benchmarks.synthetic import generate_comments
+    rng = np.random.default_rng(seed)
+    comments = generate_comments(n, seed)
+    probabilities = rng.random((n, len(LABELS)), dtype=np.float32)
+    comments["sentiment_labels"] = [[LABELS[j] for j in np.flatnonzero(row > 0.9)] for row in probabilities]
+    comments["disaster_labels"] = [
+        [category for category, words in DISASTER_SYNONYMS.items() if any(w in text for w in words)]
+        for text in comments["text"]
+    ]
+    return comments, probabilities
@@ -0,0 +1,617 @@
+# benchmarks/loadtest.py
+"""
+동시 세션 부하 테스트입니다. 실제 Streamlit 서버(streamlit run app.py) 하나에 웹소켓 클라이언트 N개를 동시에 붙입니다.
+
+    python -m benchmarks.loadtest --sessions 8 --duration 120
+    python -m benchmarks.loadtest --sessions 32 --duration 300 --scale 10 --source synthetic --analyze-prob 0.3
+    python -m benchmarks.loadtest --sessions 4 --iterations 20 --pages "재난문자 추이 분석" "시간 흐름 분석"
+
+- 서버는 별도 프로세스 하나로 띄우고, 클라이언트는 브라우저와 같은 프로토콜(/_stcore/stream 웹소켓, BackMsg/ForwardMsg)로
+  접속합니다. 모든 세션이 한 서버의 캐시(st.cache_*, utils.cache)와 백그라운드 작업을 공유하므로
+  복제본 하나가 N명을 받을 때의 캐시 적중, 경합, 메모리를 그대로 측정합니다.
+- 세션마다 메뉴 페이지 이동(option_menu 컴포넌트 값) -> 페이지의 selectbox/radio 값 변경을 rerun_script 요청으로 반복합니다.
+- SNS 페이지에서는 analyze-prob 확률로 검색 -> 영상 선택 -> 분석 시작을 누릅니다.
+  서버 프로세스의 YouTube API는 benchmarks/replay.py의 fixture 재생으로 대체되며, KOTE 모델 파일이 있으면 실제 추론까지 실행됩니다.
+- rerun 지연(rerun_script 전송 ~ script_finished 수신, p50/p95/p99), 서버 프로세스(자식 프로세스 포함)의 RSS와 CPU 사용률을
+  기록해 OUT(기본 logs/loadtest/<시각>)에 report.json, report.md, reruns.csv, resources.csv로 저장합니다.
+  (이미지 등 미디어 파일은 받지 않으므로 정적 파일 전송 비용은 포함되지 않습니다.)
+"""
+import os
+import sys
+import time
+import json
+import shutil
+import signal
+import socket
+import random
+import asyncio
+import argparse
+import threading
+import subprocess
+import urllib.request
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+import pandas as pd
+from tornado.websocket import websocket_connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from benchmarks.datasets import DEFAULT_SOURCE, read_source, prepare_workspace
+from benchmarks.replay import install_replay, write_fixtures
+
+APP_PATH = os.path.join(REPO_ROOT, "app.py")
+SERVE_COMMAND = "_serve"     # 서버 프로세스로 실행할 때의 첫 인자 (내부용)
+SNS_PAGE = "SNS 감정 변화 분석"
+MENU_COMPONENT = "option_menu" # app.py의 페이지 메뉴 컴포넌트 이름 (component_name에 포함)
+HEALTH_PATH = "/_stcore/health"
+STREAM_PATH = "/_stcore/stream"
+SERVER_START_TIMEOUT = 180   # 서버가 준비되기를 기다리는 최대 시간 (초)
+SERVER_STOP_TIMEOUT = 30
+MAX_MESSAGE_SIZE = 200 * 1024 * 1024 # server.maxMessageSize 기본값과 같음
+WIDGET_TYPES = ("selectbox", "radio", "multiselect", "text_input", "button", "component_instance")
+RERUN_TIMEOUT = 300          # rerun 한 번의 최대 대기 시간 (초)
+RESOURCE_INTERVAL = 0.5      # RSS/CPU 샘플링 간격 (초)
+DEFAULT_SESSIONS = 8
+DEFAULT_DURATION = 60        # 초
+DEFAULT_THINK_TIME = 1.0     # 사용자 동작 사이 평균 대기 시간 (초, 지수 분포)
+DEFAULT_WIDGET_CHANGES = 2   # 페이지 이동 후 바꾸는 위젯 수
+DEFAULT_ANALYZE_PROB = 0.2   # SNS 페이지에서 검색/분석까지 진행할 확률
+DEFAULT_API_LATENCY = 0.2    # 재생 YouTube API 호출당 지연 (초)
+SNS_QUERIES = ["서울 폭우 피해", "포항 지진", "강릉 산불 현장", "부산 태풍 상황", "폭염 온열질환", "대설 교통 통제"]
+PERCENTILES = (50, 95, 99)
+
+
+# =====================================================================================
+# 서버 프로세스
+# =====================================================================================
+
+def _skip_model_download(model_url, save_path, *args, **kwargs):
+    """ 부하 테스트 중에는 모델을 받지 않습니다. (있으면 그대로 사용) """
+    return save_path if os.path.exists(save_path) else None
+
+
+def _disable_background():
+    import move.main
+    import hitmap.hitmap_home
+    move.main.FLOW_PRECOMPUTE = False
+    hitmap.hitmap_home.HITMAP_PRERENDER = False
+
+
+def serve_app(port, fixture_dir, api_latency, background, calls_path):
+    """
+    (서버 프로세스) 모델 다운로드와 YouTube API를 바꾼 뒤 같은 프로세스에서 streamlit run app.py를 실행합니다.
+    서버가 끝날 때 재생 API 호출 수를 calls_path(JSON)에 씁니다.
+    """
+    import atexit
+    import utils.download_model
+    from streamlit.web import cli as stcli
+    utils.download_model.download_model_from_huggingface = _skip_model_download
+    client = install_replay(fixture_dir, api_latency)
+    if not background:
+        _disable_background()
+
+    def write_calls():
+        with open(calls_path, "w", encoding="utf-8") as f:
+            json.dump(client.calls, f)
+
+    atexit.register(write_calls)
+    sys.argv = [
+        "streamlit", "run", APP_PATH, "--server.port", str(port), "--server.address", "127.0.0.1",
+        "--server.headless", "true", "--browser.gatherUsageStats", "false",
+        "--server.fileWatcherType", "none", "--server.runOnSave", "false",
+    ]
+    return stcli.main()
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(process, url, timeout=SERVER_START_TIMEOUT):
+    """ 헬스 체크가 200을 돌려줄 때까지 기다립니다. 서버가 먼저 종료되거나 시간이 지나면 False """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with urllib.request.urlopen(url + HEALTH_PATH, timeout=2) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            pass
+        time.sleep(0.2)
+    return False
+
+
+def start_server(workspace, fixture_dir, api_latency, background):
+    """ 작업 폴더에서 서버 프로세스를 띄우고 준비될 때까지 기다린 뒤 (process, url, calls_path)를 반환합니다. """
+    port = _free_port()
+    url = f"http://127.0.0.1:{port}"
+    calls_path = os.path.join(workspace, "youtube_calls.json")
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])))
+    if not background:
+        env["BDAP_WARMUP"] = "0"
+    log_path = os.path.join(workspace, "server.log")
+    command = [
+        sys.executable, "-m", "benchmarks.loadtest", SERVE_COMMAND, "--port", str(port), "--fixtures", fixture_dir,
+        "--api-latency", str(api_latency), "--calls-out", calls_path,
+    ] + ([] if background else ["--no-background"])
+    with open(log_path, "wb") as log:
+        process = subprocess.Popen(command, cwd=workspace, env=env, stdout=log, stderr=subprocess.STDOUT)
+    if not _wait_ready(process, url):
+        stop_server(process)
+        with open(log_path, encoding="utf-8", errors="replace") as f:
+            tail = "".join(f.readlines()[-20:])
+        raise RuntimeError(f"Streamlit 서버가 준비되지 않았습니다. (exit code {process.returncode})\n{tail}")
+    return process, url, calls_path
+
+
+def stop_server(process):
+    """ SIGTERM으로 서버를 정상 종료시키고, 끝나지 않으면 강제 종료합니다. """
+    if process.poll() is None:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=SERVER_STOP_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+
+
+# =====================================================================================
+# 자원 사용량
+# =====================================================================================
+
+class ResourceSampler(threading.Thread):
+    """
+    서버 프로세스(root_pid)와 그 자식 프로세스들의 RSS 합계(MiB)와 CPU 사용률 합계(%, 코어 1개 = 100)를 주기적으로 기록합니다.
+    psutil 없이 /proc를 읽으며, /proc가 없는 환경에서는 기록하지 않습니다. (보고서의 자원 항목이 None)
+    """
+
+    def __init__(self, root_pid, interval=RESOURCE_INTERVAL):
+        super().__init__(daemon=True, name="loadtest-resource-sampler")
+        self.root_pid = root_pid
+        self.interval = interval
+        self.samples = []
+        self._stop_event = threading.Event()
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._ticks = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+
+    @staticmethod
+    def _stat_fields(pid):
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split() # 프로세스 이름에 공백이 있어도 안전하게 분리
+
+    def _process_tree(self):
+        """ root_pid와 그 자손 프로세스 목록 (프로세스 풀 등) """
+        children = {}
+        for name in os.listdir("/proc"):
+            if not name.isdigit():
+                continue
+            try:
+                children.setdefault(int(self._stat_fields(name)[1]), []).append(int(name)) # ppid
+            except (OSError, ValueError, IndexError):
+                continue
+        tree, stack = [], [self.root_pid]
+        while stack:
+            pid = stack.pop()
+            tree.append(pid)
+            stack.extend(children.get(pid, []))
+        return tree
+
+    def _read(self, pid):
+        """ (RSS bytes, 누적 CPU 초). 이미 종료된 프로세스면 None """
+        try:
+            with open(f"/proc/{pid}/statm") as f:
+                rss = int(f.read().split()[1]) * self._page_size
+            fields = self._stat_fields(pid)
+            return rss, (int(fields[11]) + int(fields[12])) / self._ticks # utime, stime
+        except (OSError, ValueError, IndexError):
+            return None
+
+    def run(self):
+        if not os.path.isdir("/proc"):
+            return
+        started = last_wall = time.perf_counter()
+        last_cpu = {}
+        while not self._stop_event.wait(self.interval):
+            wall = time.perf_counter()
+            rss_total, cpu_delta, processes = 0, 0.0, 0
+            for pid in self._process_tree():
+                reading = self._read(pid)
+                if reading is None:
+                    continue
+                rss, cpu = reading
+                rss_total += rss
+                cpu_delta += cpu - last_cpu.get(pid, cpu)
+                last_cpu[pid] = cpu
+                processes += 1
+            self.samples.append({
+                "t": round(wall - started, 3), "rss_mib": round(rss_total / 1024 / 1024, 1),
+                "cpu_percent": round(cpu_delta / max(wall - last_wall, 1e-9) * 100, 1), "processes": processes,
+            })
+            last_wall = wall
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# =====================================================================================
+# 클라이언트 세션
+# =====================================================================================
+
+class Session:
+    """
+    사용자 한 명(웹소켓 연결 하나): 페이지 이동, 위젯 변경, (SNS) 검색/분석을 반복하며 rerun마다 소요 시간을 기록합니다.
+    브라우저처럼 마지막 실행에서 그려진 위젯의 값만 rerun_script 요청에 담아 보냅니다.
+    """
+
+    def __init__(self, index, url, pages, deadline, iterations, think_time, widget_changes, analyze_prob, seed, records):
+        self.index = index
+        self.url = url.replace("http://", "ws://", 1) + STREAM_PATH
+        self.pages = pages
+        self.deadline = deadline
+        self.iterations = iterations
+        self.think_time = think_time
+        self.widget_changes = widget_changes
+        self.analyze_prob = analyze_prob
+        self.rng = random.Random(seed * 100_003 + index)
+        self.records = records
+        self.conn = None
+        self.widgets = {} # 마지막 실행에서 그려진 위젯 {id: (종류, proto)}
+        self.states = {}  # 다음 rerun에 보낼 위젯 값 {id: WidgetState}
+
+    async def connect(self):
+        self.conn = await websocket_connect(self.url, subprotocols=["streamlit"], max_message_size=MAX_MESSAGE_SIZE)
+        self.widgets, self.states = {}, {}
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    async def run_script(self, triggers=()):
+        """
+        rerun_script를 보내고 script_finished까지 받은 메시지로 위젯 목록을 갱신합니다.
+        스크립트가 그린 예외가 있으면 첫 예외 메시지를, 없으면 None을 반환합니다.
+        """
+        msg = BackMsg()
+        msg.rerun_script.widget_states.widgets.extend([*self.states.values(), *triggers])
+        await self.conn.write_message(msg.SerializeToString(), binary=True)
+        widgets, error = {}, None
+        while True:
+            payload = await self.conn.read_message()
+            if payload is None:
+                raise ConnectionError("서버가 연결을 닫았습니다.")
+            forward = ForwardMsg()
+            forward.ParseFromString(payload)
+            kind = forward.WhichOneof("type")
+            if kind == "delta" and forward.delta.WhichOneof("type") == "new_element":
+                element = forward.delta.new_element
+                element_type = element.WhichOneof("type")
+                if element_type in WIDGET_TYPES:
+                    proto = getattr(element, element_type)
+                    widgets[proto.id] = (element_type, proto)
+                elif element_type == "exception" and error is None:
+                    error = f"{element.exception.type}: {element.exception.message}".splitlines()[0][:200]
+            elif kind == "script_finished":
+                if forward.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN: # st.rerun 등: 다음 실행을 기다림
+                    widgets, error = {}, None
+                    continue
+                if forward.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR and error is None:
+                    error = "스크립트 컴파일 오류"
+                break
+        self.widgets = widgets
+        self.states = {wid: state for wid, state in self.states.items() if wid in widgets}
+        return error
+
+    async def _rerun(self, page, action, triggers=()):
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            error = await asyncio.wait_for(self.run_script(triggers), RERUN_TIMEOUT)
+        except Exception as e: # 타임아웃, 연결 끊김 등: 기록하고 새 연결로 다음 동작을 진행
+            error = f"{type(e).__name__}: {e}"[:200]
+            self.close()
+            await self.connect()
+        self.records.append({
+            "session": self.index, "page": page, "action": action,
+            "started": started_at, "seconds": time.perf_counter() - started, "error": error,
+        })
+
+    def _find(self, element_type, key=None):
+        """ 마지막 실행에서 그려진 위젯 중 종류(와 사용자 key)가 맞는 첫 위젯의 proto. 없으면 None """
+        for wid, (kind, proto) in self.widgets.items():
+            if kind == element_type and (key is None or wid.endswith(f"-{key}")):
+                return proto
+        return None
+
+    def menu_options(self):
+        menu = next((proto for kind, proto in self.widgets.values()
+                     if kind == "component_instance" and MENU_COMPONENT in proto.component_name), None)
+        return (menu, json.loads(menu.json_args).get("options", [])) if menu is not None else (None, [])
+
+    def _navigate(self, page):
+        menu, _ = self.menu_options()
+        if menu is None:
+            raise RuntimeError("페이지 메뉴 컴포넌트가 그려지지 않았습니다.")
+        self.states[menu.id] = WidgetState(id=menu.id, json_value=json.dumps(page, ensure_ascii=False))
+
+    def _current_index(self, kind, proto):
+        state = self.states.get(proto.id)
+        if state is None:
+            return proto.default
+        if kind == "selectbox":
+            return list(proto.options).index(state.string_value) if state.string_value in proto.options else None
+        return state.int_value
+
+    async def _change_widgets(self, page):
+        for _ in range(self.widget_changes):
+            candidates = [
+                (kind, proto) for kind, proto in self.widgets.values()
+                if kind in ("selectbox", "radio") and len(proto.options) > 1 and not proto.disabled and not proto.form_id
+            ]
+            if not candidates:
+                return
+            kind, proto = self.rng.choice(candidates)
+            current = self._current_index(kind, proto)
+            index = self.rng.choice([i for i in range(len(proto.options)) if i != current])
+            state = WidgetState(id=proto.id)
+            if kind == "selectbox":
+                state.string_value = proto.options[index]
+            else:
+                state.int_value = index
+            self.states[proto.id] = state
+            await self._rerun(page, f"change_{kind}")
+
+    async def _analyze(self):
+        """ 검색 -> 영상 1~3개 선택 -> 분석 시작 (모델이 없으면 버튼이 비활성이라 선택까지만 진행) """
+        query = self._find("text_input", "main_search_query")
+        search = self._find("button", "main_search_button_trigger_v2")
+        if query is None or search is None:
+            return
+        self.states[query.id] = WidgetState(id=query.id, string_value=self.rng.choice(SNS_QUERIES))
+        await self._rerun(SNS_PAGE, "sns_search", [WidgetState(id=search.id, trigger_value=True)])
+        multiselect = self._find("multiselect", "main_video_multiselect_v2")
+        if multiselect is None or not multiselect.options:
+            return
+        picked = self.rng.sample(list(multiselect.options), k=min(len(multiselect.options), self.rng.randint(1, 3)))
+        state = WidgetState(id=multiselect.id)
+        state.string_array_value.data[:] = picked
+        self.states[multiselect.id] = state
+        await self._rerun(SNS_PAGE, "sns_select_videos")
+        button = self._find("button", "main_analyze_button_trigger_v2")
+        if button is not None and not button.disabled:
+            await self._rerun(SNS_PAGE, "sns_analyze", [WidgetState(id=button.id, trigger_value=True)])
+
+    async def run(self, home_page):
+        await self.connect()
+        await self._rerun(home_page, "open")
+        done = 0
+        while time.time() < self.deadline and (self.iterations is None or done < self.iterations):
+            page = self.rng.choice(self.pages)
+            try:
+                self._navigate(page)
+                await self._rerun(page, "navigate")
+                await self._change_widgets(page)
+                if page == SNS_PAGE and self.rng.random() < self.analyze_prob:
+                    await self._analyze()
+            except Exception as e: # 위젯 구성이 바뀌는 등 시나리오 자체의 실패는 기록만 함
+                self.records.append({"session": self.index, "page": page, "action": "scenario",
+                                     "started": time.time(), "seconds": 0.0,
+                                     "error": f"{type(e).__name__}: {e}"[:200]})
+            done += 1
+            await asyncio.sleep(self.rng.expovariate(1 / self.think_time) if self.think_time > 0 else 0)
+        self.close()
+
+
+async def discover_menu(url):
+    """ 세션 하나로 첫 화면을 열어 (app.py의 메뉴 페이지 목록, 첫 실행의 예외 메시지)를 얻습니다. """
+    session = Session(-1, url, [], 0, 0, 0, 0, 0, 0, [])
+    await session.connect()
+    try:
+        error = await asyncio.wait_for(session.run_script(), RERUN_TIMEOUT)
+        return session.menu_options()[1], error
+    finally:
+        session.close()
+
+
+async def _drive(url, sessions, ramp_up, home_page, session_args):
+    """ 세션 N개를 한 이벤트 루프에서 동시에 실행하고 모든 rerun 기록을 반환합니다. """
+    records = []
+
+    async def run_one(index):
+        if ramp_up:
+            await asyncio.sleep(ramp_up * index / sessions)
+        session = Session(index, url, *session_args, records)
+        try:
+            await session.run(home_page)
+        except Exception as e: # 연결 실패 등
+            records.append({"session": index, "page": home_page, "action": "session", "started": time.time(),
+                            "seconds": 0.0, "error": f"{type(e).__name__}: {e}"[:200]})
+            session.close()
+
+    await asyncio.gather(*(run_one(i) for i in range(sessions)))
+    return records
+
+
+# =====================================================================================
+# 보고서
+# =====================================================================================
+
+def _latency_stats(seconds):
+    values = np.asarray(seconds, dtype=float)
+    if not len(values):
+        return {"count": 0}
+    stats = {"count": int(len(values)), "mean": float(values.mean()), "max": float(values.max())}
+    stats.update({f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES})
+    return stats
+
+
+def summarize(records, samples, wall_seconds, config):
+    reruns = pd.DataFrame(records, columns=["session", "page", "action", "started", "seconds", "error"])
+    timed = reruns[~reruns["action"].isin(["scenario", "session"])]
+    ok = timed[timed["error"].isna()]
+    resources = pd.DataFrame(samples, columns=["t", "rss_mib", "cpu_percent", "processes"])
+    by_page = {
+        f"{page} / {action}": {**_latency_stats(group["seconds"]), "errors": int(group["error"].notna().sum())}
+        for (page, action), group in timed.groupby(["page", "action"], sort=True)
+    }
+    return {
+        "config": config,
+        "wall_seconds": round(wall_seconds, 2),
+        "reruns": len(timed),
+        "errors": int(reruns["error"].notna().sum()),
+        "throughput_reruns_per_s": round(len(timed) / wall_seconds, 3) if wall_seconds else None,
+        "latency": _latency_stats(ok["seconds"]),
+        "by_page_action": by_page,
+        "resources": {
+            "rss_mib_peak": float(resources["rss_mib"].max()) if len(resources) else None,
+            "rss_mib_mean": float(resources["rss_mib"].mean()) if len(resources) else None,
+            "cpu_percent_mean": float(resources["cpu_percent"].mean()) if len(resources) else None,
+            "cpu_percent_peak": float(resources["cpu_percent"].max()) if len(resources) else None,
+        },
+        "error_samples": reruns["error"].dropna().value_counts().head(10).to_dict(),
+    }, reruns, resources
+
+
+def _markdown(report):
+    lines = [
+        f"# 부하 테스트 결과 ({report['config']['started_at']})", "",
+        f"- 서버 1개에 세션 {report['config']['sessions']}개, 데이터 배율 {report['config']['scale']} "
+        f"({report['config']['source']}), 실행 {report['wall_seconds']}초",
+        f"- rerun {report['reruns']}회, 오류 {report['errors']}회, 처리량 {report['throughput_reruns_per_s']} rerun/s",
+        f"- 서버 RSS 최대 {report['resources']['rss_mib_peak']} MiB / 평균 {report['resources']['rss_mib_mean']} MiB, "
+        f"CPU 평균 {report['resources']['cpu_percent_mean']}% / 최대 {report['resources']['cpu_percent_peak']}%", "",
+        "| 페이지 / 동작 | 횟수 | p50 (s) | p95 (s) | p99 (s) | 최대 (s) | 오류 |",
+        "|---|---:|---:|---:|---:|---:|---:|",
+    ]
+    overall = report["latency"]
+    rows = [("전체", {**overall, "errors": report["errors"]})] + list(report["by_page_action"].items())
+    for name, stats in rows:
+        if not stats.get("count"):
+            lines.append(f"| {name} | 0 | - | - | - | - | {stats.get('errors', 0)} |")
+            continue
+        lines.append(f"| {name} | {stats['count']} | {stats['p50']:.3f} | {stats['p95']:.3f} | {stats['p99']:.3f} | "
+                     f"{stats['max']:.3f} | {stats.get('errors', 0)} |")
+    return "\n".join(lines) + "\n"
+
+
+def write_report(out_dir, report, reruns, resources):
+    os.makedirs(out_dir, exist_ok=True)
+    with open(os.path.join(out_dir, "report.json"), "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    with open(os.path.join(out_dir, "report.md"), "w", encoding="utf-8") as f:
+        f.write(_markdown(report))
+    reruns.to_csv(os.path.join(out_dir, "reruns.csv"), index=False)
+    resources.to_csv(os.path.join(out_dir, "resources.csv"), index=False)
+
+
+def run_loadtest(sessions=DEFAULT_SESSIONS, duration=DEFAULT_DURATION, iterations=None, pages=None,
+                 scale=1, source=DEFAULT_SOURCE, think_time=DEFAULT_THINK_TIME, widget_changes=DEFAULT_WIDGET_CHANGES,
+                 analyze_prob=DEFAULT_ANALYZE_PROB, api_latency=DEFAULT_API_LATENCY, fixture_dir=None,
+                 ramp_up=0.0, background=True, seed=0):
+    """ 부하 테스트를 실행하고 (report, reruns DataFrame, resources DataFrame)을 반환합니다. """
+    frames = read_source(os.path.join(REPO_ROOT, "data"))
+    workspace = prepare_workspace(frames, scale, source)
+    if fixture_dir is None:
+        fixture_dir = write_fixtures(os.path.join(workspace, "youtube_fixtures"), seed=seed)
+    fixture_dir = os.path.abspath(fixture_dir)
+    server = None
+    try:
+        server, url, calls_path = start_server(workspace, fixture_dir, api_latency, background)
+
+        # 세션을 시작하기 전에 메뉴 목록을 알아냄
+        menu, error = asyncio.run(discover_menu(url))
+        if not menu:
+            raise RuntimeError(f"app.py의 메뉴 목록을 얻지 못했습니다. (option_menu 컴포넌트를 찾지 못함, 오류: {error})")
+        selected_pages = pages or list(menu)
+        unknown = sorted(set(selected_pages) - set(menu))
+        if unknown:
+            raise ValueError(f"메뉴에 없는 페이지입니다: {unknown} (가능한 값: {menu})")
+
+        sampler = ResourceSampler(server.pid)
+        started_at = datetime.now().isoformat(timespec="seconds")
+        started = time.monotonic()
+        session_args = (selected_pages, time.time() + duration, iterations, think_time, widget_changes,
+                        analyze_prob, seed)
+        sampler.start()
+        records = asyncio.run(_drive(url, sessions, ramp_up, menu[0], session_args))
+        sampler.stop()
+        wall_seconds = time.monotonic() - started
+
+        stop_server(server)
+        youtube_calls = {}
+        if os.path.exists(calls_path):
+            with open(calls_path, encoding="utf-8") as f:
+                youtube_calls = json.load(f)
+
+        config = {
+            "started_at": started_at, "sessions": sessions, "duration": duration, "iterations": iterations,
+            "pages": selected_pages, "scale": scale, "source": source, "think_time": think_time,
+            "widget_changes": widget_changes, "analyze_prob": analyze_prob, "api_latency": api_latency,
+            "ramp_up": ramp_up, "background": background, "seed": seed,
+            "kote_model": os.path.exists(os.path.join(workspace, "SNS/kote_pytorch_lightning.bin")),
+            "youtube_calls": youtube_calls,
+        }
+        return summarize(records, sampler.samples, wall_seconds, config)
+    finally:
+        if server is not None:
+            stop_server(server)
+        shutil.rmtree(workspace, ignore_errors=True)
+
+
+def _serve_main(argv):
+    parser = argparse.ArgumentParser(description="(내부용) 부하 테스트용 Streamlit 서버")
+    parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--fixtures", required=True)
+    parser.add_argument("--api-latency", type=float, default=DEFAULT_API_LATENCY)
+    parser.add_argument("--calls-out", required=True)
+    parser.add_argument("--no-background", action="store_true")
+    args = parser.parse_args(argv)
+    return serve_app(args.port, args.fixtures, args.api_latency, not args.no_background, args.calls_out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Streamlit 동시 세션 부하 테스트")
+    parser.add_argument("--sessions", type=int, default=DEFAULT_SESSIONS, help="동시 세션 수")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION, help="최대 실행 시간 (초)")
+    parser.add_argument("--iterations", type=int, help="세션별 페이지 이동 횟수 (지정하면 duration 전에 끝날 수 있음)")
+    parser.add_argument("--pages", nargs="*", help="방문할 메뉴 페이지 (기본: 전체)")
+    parser.add_argument("--scale", type=int, default=1, help="데이터 배율")
+    parser.add_argument("--source", choices=["tile", "synthetic"], default=DEFAULT_SOURCE)
+    parser.add_argument("--think-time", type=float, default=DEFAULT_THINK_TIME, help="동작 사이 평균 대기 시간 (초)")
+    parser.add_argument("--widget-changes", type=int, default=DEFAULT_WIDGET_CHANGES)
+    parser.add_argument("--analyze-prob", type=float, default=DEFAULT_ANALYZE_PROB)
+    parser.add_argument("--api-latency", type=float, default=DEFAULT_API_LATENCY, help="재생 API 호출당 지연 (초)")
+    parser.add_argument("--fixtures", help="YouTube 응답 fixture 폴더 (없으면 합성 fixture 생성)")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="세션을 나눠 시작하는 데 쓰는 시간 (초)")
+    parser.add_argument("--no-background", action="store_true", help="백그라운드 워밍업/미리 계산/렌더링 끄기")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="결과 폴더 (기본: logs/loadtest/<시각>)")
+    args = parser.parse_args(argv)
+
+    report, reruns, resources = run_loadtest(
+        sessions=args.sessions, duration=args.duration, iterations=args.iterations, pages=args.pages,
+        scale=args.scale, source=args.source, think_time=args.think_time, widget_changes=args.widget_changes,
+        analyze_prob=args.analyze_prob, api_latency=args.api_latency, fixture_dir=args.fixtures,
+        ramp_up=args.ramp_up, background=not args.no_background, seed=args.seed,
+    )
+    out_dir = args.out or os.path.join(REPO_ROOT, "logs", "loadtest", datetime.now().strftime("%Y%m%d_%H%M%S"))
+    write_report(out_dir, report, reruns, resources)
+    print(_markdown(report))
+    print(f"결과 저장: {out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == [SERVE_COMMAND]:
+        sys.exit(_serve_main(sys.argv[2:]))
+    sys.exit(main())
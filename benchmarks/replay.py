@@ -0,0 +1,131 @@
+# benchmarks/replay.py
+"""
+YouTube Data API 응답 재생기입니다. (부하 테스트용, 네트워크/할당량 사용 없음)
+
+fixture 폴더 구성 (실제 API 응답 JSON과 같은 형식)
+- search.json: search().list 응답 하나. 검색어와 무관하게 maxResults개까지 잘라 돌려줍니다.
+- comments/<video_id>.json: commentThreads().list 응답 페이지 목록. pageToken으로 다음 페이지를 돌려줍니다.
+
+install_replay(fixture_dir)가 SNS.youtube_api_module.build를 재생 클라이언트로 바꾸므로
+앱 코드(search_youtube_videos, get_video_comments)는 그대로 실행됩니다.
+실제 응답을 같은 형식으로 저장해 두면 그대로 재생할 수 있고, 없으면 write_fixtures로 합성 응답을 만듭니다.
+"""
+import os
+import json
+import time
+import threading
+
+COMMENT_PAGE_SIZE = 100 # commentThreads 응답 한 페이지의 최대 댓글 수 (API 최대값)
+
+
+class _Request:
+    def __init__(self, respond, latency):
+        self._respond = respond
+        self._latency = latency
+
+    def execute(self):
+        if self._latency:
+            time.sleep(self._latency) # 네트워크 왕복 시간 흉내
+        return self._respond()
+
+
+class _Collection:
+    def __init__(self, list_handler, latency):
+        self._list_handler = list_handler
+        self._latency = latency
+
+    def list(self, **kwargs):
+        return _Request(lambda: self._list_handler(**kwargs), self._latency)
+
+
+class ReplayClient:
+    """ googleapiclient build(...)가 돌려주는 YouTube 클라이언트 중 앱이 쓰는 부분만 흉내냅니다. """
+
+    def __init__(self, fixture_dir, latency=0.0):
+        self.fixture_dir = fixture_dir
+        self.latency = latency
+        self.calls = {"search": 0, "commentThreads": 0}
+        self._lock = threading.Lock()
+        with open(os.path.join(fixture_dir, "search.json"), encoding="utf-8") as f:
+            self._search = json.load(f)
+        self._pages = {}
+
+    def _count(self, name):
+        with self._lock:
+            self.calls[name] += 1
+
+    def _comment_pages(self, video_id):
+        if video_id not in self._pages:
+            path = os.path.join(self.fixture_dir, "comments", f"{video_id}.json")
+            pages = []
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    pages = json.load(f)
+            self._pages[video_id] = pages
+        return self._pages[video_id]
+
+    def _search_list(self, maxResults=25, **kwargs):
+        self._count("search")
+        return {**self._search, "items": self._search.get("items", [])[:maxResults]}
+
+    def _comment_threads_list(self, videoId=None, maxResults=COMMENT_PAGE_SIZE, pageToken=None, **kwargs):
+        self._count("commentThreads")
+        pages = self._comment_pages(videoId)
+        index = int(pageToken) if pageToken else 0
+        if index >= len(pages):
+            return {"items": []}
+        page = dict(pages[index])
+        page["items"] = page.get("items", [])[:maxResults]
+        return page
+
+    def search(self):
+        return _Collection(self._search_list, self.latency)
+
+    def commentThreads(self):
+        return _Collection(self._comment_threads_list, self.latency)
+
+
+def install_replay(fixture_dir, latency=0.0):
+    """ SNS.youtube_api_module의 build를 재생 클라이언트로 바꾸고 클라이언트를 반환합니다. """
+    import SNS.youtube_api_module as youtube_api_module
+    client = ReplayClient(fixture_dir, latency)
+    youtube_api_module.build = lambda *args, **kwargs: client
+    return client
+
+
+def write_fixtures(fixture_dir, n_videos=25, comments_per_video=500, seed=0):
+    """ 합성 댓글(benchmarks.synthetic.generate_comments)로 API 응답 형식의 fixture를 만듭니다. """
+    from benchmarks.synthetic import generate_comments
+    comments = generate_comments(n_videos * comments_per_video, seed)
+    comments["published_at"] = comments["published_at"].dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+    os.makedirs(os.path.join(fixture_dir, "comments"), exist_ok=True)
+
+    videos = comments.groupby("video_id", sort=False).agg(
+        title=("video_title", "first"), published_at=("published_at", "min"), size=("comment_id", "size")
+    ).sort_values("size", ascending=False).head(n_videos)
+    search = {"kind": "youtube#searchListResponse", "items": [
+        {"id": {"kind": "youtube#video", "videoId": video_id},
+         "snippet": {"title": row.title, "publishedAt": row.published_at,
+                     "thumbnails": {"default": {"url": ""}}}}
+        for video_id, row in videos.iterrows()
+    ]}
+    with open(os.path.join(fixture_dir, "search.json"), "w", encoding="utf-8") as f:
+        json.dump(search, f, ensure_ascii=False)
+
+    for video_id, group in comments[comments["video_id"].isin(videos.index)].groupby("video_id"):
+        items = [
+            {"snippet": {"topLevelComment": {"id": row.comment_id, "snippet": {
+                "textDisplay": row.text, "authorDisplayName": row.author,
+                "publishedAt": row.published_at, "likeCount": int(row.like_count),
+            }}}}
+            for row in group.itertuples(index=False)
+        ]
+        pages = []
+        for start in range(0, len(items), COMMENT_PAGE_SIZE):
+            page = {"items": items[start:start + COMMENT_PAGE_SIZE]}
+            if start + COMMENT_PAGE_SIZE < len(items):
+                page["nextPageToken"] = str(len(pages) + 1)
+            pages.append(page)
+        with open(os.path.join(fixture_dir, "comments", f"{video_id}.json"), "w", encoding="utf-8") as f:
+            json.dump(pages, f, ensure_ascii=False)
+    return fixture_dir
@@ -0,0 +1,385 @@
+# benchmarks/run.py
+"""
+대시보드 각 페이지의 데이터/계산 경로를 브라우저 없이 실행하는 벤치마크입니다.
+
+    python -m benchmarks.run                                  # 배율 1, 4에서 전체 단계 측정
+    python -m benchmarks.run --scales 1 2 8 --repeat 5        # 배율/반복 횟수 지정
+    python -m benchmarks.run --stages page: panel. --save-baseline   # 이름이 접두어로 시작하는 단계만, 기준값 저장
+    python -m benchmarks.run --threshold 1.3 --output out.json
+    python -m benchmarks.run --source synthetic --scales 10 100 --repeat 1
+
+- 배율 N은 data 폴더의 CSV를 날짜축으로 N번 이어 붙인 데이터(--source tile, benchmarks/datasets.py)이거나
+  실제 분포를 따르는 합성 데이터(--source synthetic, benchmarks/synthetic.py)입니다.
+  배율마다 임시 작업 폴더에 data/를 만들고 그 폴더로 이동해 실행하므로 저장소의 data/, logs/ 등은 건드리지 않습니다.
+- page:* 단계는 run_message 등 페이지 함수를 Streamlit bare 모드(위젯은 기본값)로 그대로 호출하고,
+  나머지 단계는 페이지가 쓰는 계산 함수를 직접 호출합니다.
+- 반복마다 공용 캐시(utils.cache)와 st.cache_data / st.cache_resource를 비우므로 캐시 적중이 아닌 첫 실행 시간을 잽니다.
+  시간은 반복 중 최솟값, 메모리는 tracemalloc으로 잰 별도 1회 실행의 최대 사용량입니다.
+- 기준값 파일(--baseline)과 비교해 시간 또는 메모리가 threshold배를 넘은 단계가 있으면 종료 코드 1을 반환합니다.
+  오류가 난 단계나, 기준값이 있는데 시간을 재지 못한(건너뛴) 단계가 있어도 종료 코드 1입니다.
+  기준값은 같은 장비에서 --save-baseline으로 만들어 두고 사용합니다.
+- 모델 파일, 지도 GeoJSON, Okt(JVM)처럼 환경에 따라 없는 의존성이 필요한 단계는 건너뜁니다.
+"""
+import os
+import sys
+import gc
+import json
+import time
+import shutil
+import logging
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from benchmarks.datasets import DEFAULT_SOURCE, read_source, prepare_workspace, synthetic_comments
+from benchmarks.synthetic import fit_profile
+
+DEFAULT_SCALES = (1, 4)
+DEFAULT_REPEAT = 3
+DEFAULT_THRESHOLD = 1.25 # 기준값 대비 이 배율을 넘으면 회귀로 판정
+DEFAULT_BASELINE = os.path.join(REPO_ROOT, "benchmarks", "baselines.json")
+MIN_COMPARABLE_SECONDS = 0.005 # 이보다 짧은 단계는 측정 오차가 커서 시간 회귀 판정에서 제외
+COMMENTS_PER_SCALE = 2000      # SNS 단계에서 배율 1당 합성 댓글 수
+
+
+class SkipStage(Exception):
+    """ 이 환경에서 실행할 수 없는 단계 """
+
+
+class Stage:
+    """ 벤치마크 단계. setup(ctx)의 반환값을 인자로 run이 호출되며, setup 시간은 재지 않습니다. """
+
+    def __init__(self, name, run, setup=None, requires=()):
+        self.name = name
+        self.run = run
+        self.setup = setup or (lambda ctx: ())
+        self.requires = requires
+
+
+# ---------------------------------------------------------------------------------------------
+# 단계 정의
+# ---------------------------------------------------------------------------------------------
+def _fresh_data(ctx):
+    from util import load_data
+    return (load_data(),)
+
+
+def _panel(ctx):
+    from util import load_data
+    from utils.panel import build_panel, load_emotion_source
+    if "panel" not in ctx:
+        total_df = load_data()
+        ctx["panel"] = build_panel(total_df["weather"], total_df["alerts"], load_emotion_source(total_df))
+    return ctx["panel"]
+
+
+def _run_load_data():
+    from util import load_data
+    return load_data()
+
+
+def _run_build_panel(total_df):
+    from utils.panel import build_panel, load_emotion_source
+    return build_panel(total_df["weather"], total_df["alerts"], load_emotion_source(total_df))
+
+
+def _run_lag_correlations(panel):
+    from relationship.lag_correlation import compute_lag_correlations
+    return compute_lag_correlations("benchmark", panel)
+
+
+def _setup_anomalies(ctx):
+    state_dir = os.path.join(ctx["workspace"], "anomaly_state")
+    shutil.rmtree(state_dir, ignore_errors=True) # 증분 상태 없이 처음부터 계산
+    return _panel(ctx), state_dir
+
+
+def _run_anomalies(panel, state_dir):
+    from utils.anomaly import update_alert_anomalies
+    return update_alert_anomalies(panel, state_dir=state_dir)
+
+
+def _run_events(total_df):
+    from move.events import detect_events, link_events
+    from utils.panel import load_emotion_source
+    return link_events(detect_events(total_df["weather"]), total_df["alerts"], load_emotion_source(total_df))
+
+
+def _run_time_flows(panel):
+    from move.main import FLOW_YEARS, FLOW_DISASTER_TYPES, FLOW_REGIONS
+    from move.processor import analyze_time_flow
+    for year in FLOW_YEARS:
+        for disaster_type in FLOW_DISASTER_TYPES:
+            for region in FLOW_REGIONS:
+                analyze_time_flow(panel, year, disaster_type, None if region == "전체" else region)
+
+
+def _run_hitmap_counts(total_df):
+    from hitmap.hitmap_home import load, count_matrix
+    from utils.regions import REGIONS
+    return count_matrix(load("benchmark", total_df), REGIONS)
+
+
+def _setup_comments(ctx):
+    n = COMMENTS_PER_SCALE * ctx["scale"]
+    if ctx.get("comments_n") != n:
+        ctx["comments"], ctx["probabilities"] = synthetic_comments(n)
+        ctx["comments_n"] = n
+    return ctx["comments"], ctx["probabilities"]
+
+
+def _run_result_store(comments, probabilities):
+    from SNS.result_store import encode_comments, decode_comments
+    return decode_comments(encode_comments(comments))
+
+
+def _run_emotion_shard(comments, probabilities):
+    from SNS.config import LABELS
+    from SNS.emotion_series import aggregate_shard
+    shard = pd.DataFrame(probabilities, columns=LABELS)
+    shard["published_at"] = comments["published_at"].to_numpy()
+    shard["text"] = comments["text"].to_numpy()
+    shard["video_title"] = comments["video_title"].to_numpy()
+    return aggregate_shard(shard)
+
+
+def _run_keyword_index(comments, probabilities):
+    from SNS.text_analysis_module import build_keyword_index, get_okt_instance
+    try:
+        get_okt_instance()
+    except Exception as e:
+        raise SkipStage(f"Okt를 사용할 수 없습니다 (JVM/konlpy): {type(e).__name__}")
+    return build_keyword_index(comments["comment_id"], comments["text"])
+
+
+def _run_wordcloud(comments, probabilities):
+    from SNS.ui_helpers import render_wordcloud_image, _word_counts_digest
+    word_counts = comments["text"].str.split().explode().value_counts().to_dict()
+    return render_wordcloud_image(_word_counts_digest(word_counts), word_counts)
+
+
+def _setup_kote(ctx):
+    from SNS.kote_module import load_trained_kote_model
+    comments, _ = _setup_comments(ctx)
+    model = load_trained_kote_model(show_message=False)
+    if model is None:
+        raise SkipStage("KOTE 모델을 불러오지 못했습니다")
+    return comments["text"].tolist(), model
+
+
+def _run_kote(texts, model):
+    from SNS.kote_module import predict_emotion_probabilities
+    return predict_emotion_probabilities(texts, model)
+
+
+def _page(module, function):
+    def run(total_df):
+        page = __import__(module, fromlist=[function])
+        return getattr(page, function)(total_df)
+    return run
+
+
+STAGES = [
+    Stage("data.load_data", _run_load_data),
+    Stage("panel.build_panel", _run_build_panel, setup=_fresh_data),
+    Stage("relationship.lag_correlations", _run_lag_correlations, setup=lambda ctx: (_panel(ctx),)),
+    Stage("message.alert_anomalies", _run_anomalies, setup=_setup_anomalies),
+    Stage("move.events", _run_events, setup=_fresh_data),
+    Stage("move.time_flows", _run_time_flows, setup=lambda ctx: (_panel(ctx),)),
+    Stage("hitmap.count_matrix", _run_hitmap_counts, setup=_fresh_data),
+    Stage("sns.result_store", _run_result_store, setup=_setup_comments),
+    Stage("sns.emotion_shard", _run_emotion_shard, setup=_setup_comments),
+    Stage("sns.keyword_index", _run_keyword_index, setup=_setup_comments),
+    Stage("sns.wordcloud", _run_wordcloud, setup=_setup_comments),
+    Stage("sns.kote_inference", _run_kote, setup=_setup_kote, requires=("SNS/kote_pytorch_lightning.bin",)),
+    Stage("page:message", _page("message.message_home", "run_message"), setup=_fresh_data),
+    Stage("page:relationship", _page("relationship.relationship_home", "run_relationship"), setup=_fresh_data),
+    Stage("page:move", _page("move.main", "run_move"), setup=_fresh_data),
+    Stage("page:hitmap", _page("hitmap.hitmap_home", "run_hitmap"), setup=_fresh_data,
+          requires=("geo/korea_regions.geojson",)),
+]
+
+
+# ---------------------------------------------------------------------------------------------
+# 실행
+# ---------------------------------------------------------------------------------------------
+def _clear_caches():
+    from utils.cache import clear_caches
+    clear_caches()
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    gc.collect()
+
+
+def _quiet_streamlit():
+    """ bare 모드 경고(ScriptRunContext 없음 등)가 결과 출력을 덮지 않도록 합니다. """
+    logging.getLogger("streamlit").setLevel(logging.ERROR)
+    for name in list(logging.root.manager.loggerDict):
+        if name.startswith("streamlit"):
+            logging.getLogger(name).setLevel(logging.ERROR)
+
+
+def _disable_background_work():
+    """ 페이지가 띄우는 백그라운드 미리 계산이 측정에 섞이지 않도록 끕니다. """
+    import move.main
+    import hitmap.hitmap_home
+    move.main.FLOW_PRECOMPUTE = False
+    hitmap.hitmap_home.HITMAP_PRERENDER = False
+
+
+def measure(stage, ctx, repeat):
+    """ 단계를 repeat번 실행해 최소 시간을, 추가 1회 실행으로 최대 메모리를 잽니다. """
+    missing = [p for p in stage.requires if not os.path.exists(p)]
+    if missing:
+        raise SkipStage(f"파일 없음: {', '.join(missing)}")
+
+    timings = []
+    for _ in range(repeat):
+        _clear_caches()
+        args = stage.setup(ctx)
+        started = time.perf_counter()
+        stage.run(*args)
+        timings.append(time.perf_counter() - started)
+
+    _clear_caches()
+    args = stage.setup(ctx)
+    tracemalloc.start()
+    try:
+        stage.run(*args)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(timings), "median_seconds": float(np.median(timings)), "peak_mib": peak / 1024 / 1024}
+
+
+def run_benchmarks(scales=DEFAULT_SCALES, repeat=DEFAULT_REPEAT, stage_prefixes=None, source=DEFAULT_SOURCE):
+    """ 배율별로 작업 폴더를 만들어 모든 단계를 측정하고 {"단계@배율": 측정값}을 반환합니다. """
+    _quiet_streamlit()
+    frames = read_source(os.path.join(REPO_ROOT, "data"))
+    profile = fit_profile(frames) if source == "synthetic" else None
+    suffix = "" if source == DEFAULT_SOURCE else f":{source}"
+    stages = [s for s in STAGES if not stage_prefixes or s.name.startswith(tuple(stage_prefixes))]
+    results = {}
+    original_cwd = os.getcwd()
+    for scale in scales:
+        workspace = prepare_workspace(frames, scale, source, profile)
+        os.chdir(workspace)
+        try:
+            _disable_background_work()
+            ctx = {"scale": scale, "workspace": workspace}
+            for stage in stages:
+                key = f"{stage.name}@{scale}{suffix}"
+                try:
+                    results[key] = measure(stage, ctx, repeat)
+                    print(f"{key:<40} {results[key]['seconds']:9.3f}s {results[key]['peak_mib']:9.1f} MiB", flush=True)
+                except SkipStage as e:
+                    results[key] = {"skipped": str(e)}
+                    print(f"{key:<40} skipped ({e})", flush=True)
+                except Exception as e:
+                    results[key] = {"error": f"{type(e).__name__}: {e}"}
+                    print(f"{key:<40} error ({type(e).__name__}: {e})", flush=True)
+        finally:
+            os.chdir(original_cwd)
+            _clear_caches()
+            shutil.rmtree(workspace, ignore_errors=True)
+    return results
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """ 기준값 대비 시간/메모리 비율을 계산해 (단계, 지표, 기준값, 측정값, 비율, 회귀 여부) 목록을 반환합니다. """
+    rows = []
+    for key, measured in results.items():
+        reference = baseline.get(key)
+        if not reference or "seconds" not in measured or "seconds" not in reference:
+            continue
+        for metric in ("seconds", "peak_mib"):
+            if metric == "seconds" and reference[metric] < MIN_COMPARABLE_SECONDS:
+                continue
+            ratio = measured[metric] / reference[metric] if reference[metric] else float("inf")
+            rows.append((key, metric, reference[metric], measured[metric], ratio, ratio > threshold))
+    return rows
+
+
+def failures(results, baseline):
+    """
+    회귀 비교와 별개로 실패로 볼 단계 목록 [(단계, 이유)]:
+    실행 중 오류가 난 단계, 기준값이 있는데 이번 실행에서 시간을 재지 못한 단계 (건너뜀 포함)
+    """
+    rows = [(key, measured["error"]) for key, measured in results.items() if "error" in measured]
+    rows += [
+        (key, f"측정값 없음 ({results[key].get('skipped', '건너뜀')})")
+        for key in baseline
+        if key in results and "seconds" not in results[key] and "error" not in results[key]
+    ]
+    return rows
+
+
+def _load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f).get("results", {})
+
+
+def _save_json(path, results):
+    payload = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(), "machine": platform.machine(),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, indent=2)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="대시보드 데이터 경로 벤치마크")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES), help="데이터 배율 목록")
+    parser.add_argument("--source", choices=["tile", "synthetic"], default=DEFAULT_SOURCE,
+                        help="배율 데이터: 실제 CSV 반복(tile) 또는 합성 데이터(synthetic)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="단계별 반복 횟수")
+    parser.add_argument("--stages", nargs="*", help="이 접두어로 시작하는 단계만 실행 (예: page: sns.)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="기준값 JSON 파일")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="회귀 판정 배율")
+    parser.add_argument("--save-baseline", action="store_true", help="측정 결과를 기준값 파일에 저장")
+    parser.add_argument("--output", help="측정 결과를 저장할 JSON 파일")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.scales, args.repeat, args.stages, args.source)
+    if args.output:
+        _save_json(args.output, results)
+    baseline = _load_baseline(args.baseline)
+    failed = failures(results, baseline)
+    if failed:
+        print(f"\n{len(failed)}개 단계가 실패했습니다.")
+        for key, reason in failed:
+            print(f"{key:<40} {reason}")
+    if args.save_baseline:
+        merged = {**baseline, **{k: v for k, v in results.items() if "seconds" in v}}
+        _save_json(args.baseline, merged)
+        print(f"기준값 저장: {args.baseline}")
+        return 1 if failed else 0
+
+    if not baseline:
+        print(f"기준값 파일이 없습니다: {args.baseline} (--save-baseline으로 먼저 만드세요)")
+        return 1 if failed else 0
+    rows = compare(results, baseline, args.threshold)
+    regressions = [row for row in rows if row[5]]
+    print(f"\n기준값 비교 (threshold x{args.threshold})")
+    for key, metric, reference, measured, ratio, regressed in rows:
+        mark = "REGRESSION" if regressed else "ok"
+        print(f"{key:<40} {metric:<8} {reference:10.3f} -> {measured:10.3f}  x{ratio:5.2f}  {mark}")
+    if regressions:
+        print(f"\n{len(regressions)}개 지표가 기준값보다 {args.threshold}배 넘게 나빠졌습니다.")
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
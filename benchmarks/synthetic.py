@@ -0,0 +1,429 @@
+# benchmarks/synthetic.py
+"""
+시드 기반 합성 데이터 생성기입니다. (규모 테스트용)
+
+    python -m benchmarks.synthetic --scale 10 --out /tmp/bdap_x10/data
+    python -m benchmarks.synthetic --scale 1000 --seed 7 --out /tmp/bdap_x1000/data --comments 1000000
+
+- data 폴더의 실제 CSV에서 지역 x 월별 통계(기온 평년값/편차/자기상관, 강수 확률/강도, 재난문자 발송 확률/건수,
+  월별 재난 유형 분포, 감정 점수 분포, 지역명 표기 분포)를 추정하고, 그 분포에서 같은 스키마의
+  alerts.csv, weather.csv, emotion_sample.csv를 만듭니다. (한글 컬럼명, 리스트 문자열 재난유형_리스트, 지역 집합 유지)
+- 기상 이변(move.events.EVENT_RULES 기준)이 있는 날은 관련 유형의 재난문자가 높은 확률로 발송되도록 해
+  사건 연결 등 조인 결과도 실제와 비슷한 비율로 나옵니다.
+- 배율 N은 실제 기간의 N배 기간(실제 마지막 날짜에서 과거로 연장)입니다. pandas 날짜 범위를 넘는 배율은
+  기간을 EARLIEST_DATE까지만 늘리고, 나머지는 같은 (날짜, 지역)의 행 수(관측소/발송 묶음)로 채웁니다.
+- 같은 (seed, scale, 원본 데이터)이면 항상 같은 결과가 나오며, 블록 단위로 생성해 파일에 이어 쓰므로
+  큰 배율에서도 메모리 사용량이 일정합니다.
+- YouTube 댓글 형태의 말뭉치(get_video_comments 결과 + video_title)는 generate_comments로 만듭니다.
+"""
+import os
+import sys
+import math
+import argparse
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+from SNS.config import DISASTER_SYNONYMS, REGION_KEYWORDS, DEFAULT_MAX_COMMENTS_PER_VIDEO
+from utils.regions import REGIONS, encode_regions
+from utils.panel import WEATHER_METRICS, EMOTION_METRICS, parse_type_list
+from move.events import EVENT_RULES
+
+EARLIEST_DATE = pd.Timestamp("1700-01-01") # pandas Timestamp 하한(1677년)보다 여유를 둔 생성 시작 하한
+BLOCK_DAYS = 366              # 한 번에 생성해 파일에 쓰는 날짜 수
+REGION_CORRELATION = 0.7      # 지역 간 기온 편차의 공통 성분 비율 (추정 실패 시 기본값)
+TEMPERATURE_PERSISTENCE = 0.7 # 기온 편차의 하루 자기상관 (추정 실패 시 기본값)
+EVENT_ALERT_PROB = 0.8        # 기상 이변일에 관련 유형 재난문자가 발송될 확률
+STATION_NOISE_C = 0.5         # 같은 (날짜, 지역)의 추가 관측 행에 더하는 기온 잡음 (°C)
+
+_MONTH_MIDS = np.array([15.5, 45, 74.5, 105, 135.5, 166, 196.5, 227.5, 258, 288.5, 319, 349.5])
+_MONTH_XP = np.r_[_MONTH_MIDS[-1] - 365, _MONTH_MIDS, _MONTH_MIDS[0] + 365]
+
+_NEGATIVE_PHRASES = ["너무 무섭네요", "피해가 없었으면 좋겠어요", "걱정돼서 잠이 안 와요", "대처가 너무 늦어요",
+                     "또 이러네 지긋지긋하다", "정말 답답합니다", "다들 조심하세요 ㅠㅠ"]
+_NEUTRAL_PHRASES = ["지금 상황이 어떤가요", "뉴스 보고 왔습니다", "문자 받았어요", "오늘 출근길 참고하세요",
+                    "현장 영상이네요", "내일도 계속된다고 하네요"]
+_POSITIVE_PHRASES = ["구조대 분들 고생 많으십니다", "빠른 복구 기원합니다", "다들 무사해서 다행이에요",
+                     "소방관님들 감사합니다", "정보 감사합니다"]
+_TITLE_TEMPLATES = ["{region} {keyword} 현장 상황", "[속보] {region} {keyword} 피해 속출", "{region} {keyword} 실시간",
+                    "{keyword} 특보 발효… {region} 비상", "{region} 주민이 찍은 {keyword} 영상"]
+
+
+# ---------------------------------------------------------------------------------------------
+# 실제 데이터에서 분포 추정
+# ---------------------------------------------------------------------------------------------
+def _grid(series, fill=0.0):
+    """ (code, month) 인덱스 시리즈를 [지역, 12] 배열로 펼치고, 빈 칸은 같은 달 지역 평균 -> fill로 채웁니다. """
+    table = series.unstack("month").reindex(index=range(len(REGIONS)), columns=range(1, 13))
+    table = table.fillna(table.mean(axis=0))
+    return table.to_numpy(dtype=float, na_value=fill)
+
+
+def _label_table(values):
+    """ 지역 코드별 실제 표기(별칭 포함)와 비율: {code: (표기 목록, 확률 목록)} """
+    raw = pd.Series(values).astype(str)
+    codes = encode_regions(values).cat.codes.to_numpy()
+    table = {}
+    for code, names in raw.groupby(codes):
+        if code < 0:
+            continue
+        counts = names.value_counts()
+        table[int(code)] = (counts.index.tolist(), (counts / counts.sum()).tolist())
+    return table
+
+
+def fit_profile(frames):
+    """ 원본 CSV(read_source 결과)에서 생성에 필요한 통계를 추정합니다. """
+    weather = frames["weather"]
+    w = pd.DataFrame({
+        "date": pd.to_datetime(weather["날짜"], errors="coerce"),
+        "code": encode_regions(weather["지역"]).cat.codes,
+        **{col: pd.to_numeric(weather[col], errors="coerce") for col in WEATHER_METRICS},
+    }).dropna(subset=["date"])
+    w = w[w["code"] >= 0].sort_values(["code", "date"]).reset_index(drop=True)
+    w["month"] = w["date"].dt.month
+    groups = [w["code"], w["month"]]
+
+    tavg = w["평균기온"]
+    climate = tavg.groupby(groups).transform("mean")
+    anomaly = tavg - climate
+    persistence = anomaly.corr(anomaly.groupby(w["code"]).shift())
+    standardized = (anomaly / tavg.groupby(groups).transform("std")).to_frame("z")
+    wide = standardized.assign(date=w["date"], code=w["code"]).pivot_table(index="date", columns="code", values="z")
+    corr = wide.corr().to_numpy()
+    off_diagonal = corr[~np.eye(len(corr), dtype=bool)]
+    region_corr = np.nanmean(off_diagonal) if off_diagonal.size else np.nan
+
+    rain = w["강수량"]
+    wet = rain > 0
+    wet_rain = rain.where(wet)
+    rain_mean = _grid(wet_rain.groupby(groups).mean(), fill=5.0)
+    rain_var = _grid(wet_rain.groupby(groups).var(), fill=25.0)
+
+    alerts = frames["alerts"]
+    a = pd.DataFrame({
+        "date": pd.to_datetime(alerts["날짜"], errors="coerce"),
+        "code": encode_regions(alerts["지역"]).cat.codes,
+        "count": pd.to_numeric(alerts["재난문자_건수"], errors="coerce"),
+        "types": alerts["재난유형_리스트"].map(lambda v: [t for t in parse_type_list(v) if t != "nan"]),
+    }).dropna(subset=["date", "count"])
+    a = a[(a["code"] >= 0) & (a["count"] > 0)]
+    a["month"] = a["date"].dt.month
+    alert_days = pd.date_range(a["date"].min(), a["date"].max(), freq="D")
+    days_per_month = pd.Series(alert_days.month).value_counts().reindex(range(1, 13)).fillna(1).to_numpy()
+    alert_rows = _grid(a.groupby(["code", "month"]).size(), fill=0.0)
+    log_count = np.log(a["count"])
+
+    exploded = a[["month", "types"]].explode("types").dropna()
+    type_names = sorted(exploded["types"].unique())
+    type_counts = (exploded.groupby(["month", "types"]).size().unstack("types")
+                   .reindex(index=range(1, 13), columns=type_names).fillna(0).to_numpy())
+    type_probs = (type_counts + 0.5) / (type_counts + 0.5).sum(axis=1, keepdims=True)
+    n_types = a["types"].map(len)
+    n_types = n_types[n_types > 0].value_counts().reindex(range(1, n_types.max() + 1)).fillna(0).to_numpy()
+
+    emotion = frames.get("emotion_sample")
+    if emotion is not None and not emotion.empty:
+        scores = emotion[EMOTION_METRICS].apply(pd.to_numeric, errors="coerce").dropna().to_numpy()
+        emotion_mean = scores.mean(axis=0) / scores.mean(axis=0).sum()
+        m0, v0 = emotion_mean[0], scores[:, 0].var()
+        emotion_concentration = float(np.clip(m0 * (1 - m0) / v0 - 1, 2, 200)) if v0 > 0 else 10.0
+    else:
+        emotion_mean, emotion_concentration = np.full(3, 1 / 3), 10.0
+
+    all_dates = pd.concat([w["date"], a["date"]])
+    return {
+        "start_date": all_dates.min().normalize(),
+        "end_date": all_dates.max().normalize(),
+        "tavg_mean": _grid(tavg.groupby(groups).mean(), fill=12.0),
+        "tavg_std": _grid(tavg.groupby(groups).std(), fill=3.0),
+        "spread_high": _grid((w["최고기온"] - tavg).groupby(groups).mean(), fill=5.0),
+        "spread_low": _grid((tavg - w["최저기온"]).groupby(groups).mean(), fill=5.0),
+        "persistence": float(np.clip(persistence, 0, 0.95)) if np.isfinite(persistence) else TEMPERATURE_PERSISTENCE,
+        "region_corr": float(np.clip(region_corr, 0, 0.95)) if np.isfinite(region_corr) else REGION_CORRELATION,
+        "rain_prob": _grid(wet.groupby(groups).mean(), fill=0.3),
+        "rain_shape": np.clip(rain_mean ** 2 / np.maximum(rain_var, 1e-6), 0.2, 5.0),
+        "rain_scale": np.maximum(rain_var, 1e-6) / np.maximum(rain_mean, 1e-6),
+        "alert_prob": np.clip(alert_rows / days_per_month[None, :], 0, 0.95),
+        "alert_log_mean": _grid(log_count.groupby([a["code"], a["month"]]).mean(), fill=float(log_count.mean())),
+        "alert_log_std": _grid(log_count.groupby([a["code"], a["month"]]).std(), fill=float(log_count.std())),
+        "type_names": type_names,
+        "type_probs": type_probs,
+        "n_types_probs": n_types / n_types.sum(),
+        "emotion_mean": emotion_mean,
+        "emotion_concentration": emotion_concentration,
+        "weather_labels": _label_table(weather["지역"]),
+        "alert_labels": _label_table(alerts["지역"]),
+    }
+
+
+# ---------------------------------------------------------------------------------------------
+# 생성
+# ---------------------------------------------------------------------------------------------
+def plan_volume(profile, scale):
+    """ 배율을 (생성 일수, 같은 (날짜, 지역)의 행 수)로 나눕니다. """
+    base_days = (profile["end_date"] - profile["start_date"]).days + 1
+    max_days = (profile["end_date"] - EARLIEST_DATE).days + 1
+    days = max(1, int(round(base_days * scale)))
+    density = max(1, math.ceil(days / max_days))
+    return math.ceil(days / density), density
+
+
+def _daily(table, doy):
+    """ 월별 값 [지역, 12]를 월 중앙 기준 선형 보간해 일별 [날짜, 지역] 배열로 만듭니다. (연말-연초 순환) """
+    pos = np.interp(doy, _MONTH_XP, np.arange(len(_MONTH_XP)))
+    lo = np.floor(pos).astype(int)
+    hi = np.minimum(lo + 1, len(_MONTH_XP) - 1)
+    frac = pos - lo
+    fp = np.c_[table[:, -1], table, table[:, 0]]
+    return (fp[:, lo] * (1 - frac) + fp[:, hi] * frac).T
+
+
+def _sample_labels(label_table, codes, rng):
+    """ 지역 코드 배열을 실제 표기 분포에 따라 지역명 문자열로 바꿉니다. """
+    labels = np.asarray(REGIONS, dtype=object)[codes]
+    for code, (names, probs) in label_table.items():
+        if names == [REGIONS[code]]:
+            continue
+        idx = np.flatnonzero(codes == code)
+        if len(idx):
+            labels[idx] = rng.choice(np.asarray(names, dtype=object), size=len(idx), p=probs)
+    return labels
+
+
+def _weather_block(profile, dates, anomaly, rng):
+    """ 기온은 평년값 + 지역 간 상관된 AR(1) 편차, 강수량은 월별 확률 x 감마 분포로 만듭니다. """
+    doy = dates.dayofyear.to_numpy()
+    n_days, n_regions = len(dates), len(REGIONS)
+    phi, rho = profile["persistence"], profile["region_corr"]
+    shocks = (np.sqrt(rho) * rng.standard_normal(n_days)[:, None]
+              + np.sqrt(1 - rho) * rng.standard_normal((n_days, n_regions)))
+    anomalies = np.empty((n_days, n_regions))
+    for t in range(n_days):
+        anomaly = phi * anomaly + np.sqrt(1 - phi ** 2) * shocks[t]
+        anomalies[t] = anomaly
+
+    tavg = _daily(profile["tavg_mean"], doy) + _daily(profile["tavg_std"], doy) * anomalies
+    tmax = tavg + _daily(profile["spread_high"], doy) * rng.gamma(10, 0.1, (n_days, n_regions))
+    tmin = tavg - _daily(profile["spread_low"], doy) * rng.gamma(10, 0.1, (n_days, n_regions))
+    wet = rng.random((n_days, n_regions)) < _daily(profile["rain_prob"], doy)
+    amount = rng.gamma(_daily(profile["rain_shape"], doy), _daily(profile["rain_scale"], doy))
+    values = {"최고기온": tmax, "최저기온": tmin, "평균기온": tavg, "강수량": np.where(wet, np.maximum(amount, 0.1), 0.0)}
+    return values, anomaly
+
+
+def _weather_rows(profile, dates, values, density, rng):
+    n_days, n_regions = values["평균기온"].shape
+    codes = np.tile(np.arange(n_regions), n_days)
+    day_strings = np.repeat(dates.strftime("%Y-%m-%d").to_numpy(), n_regions)
+    frames = []
+    for station in range(density):
+        noise = rng.normal(0, STATION_NOISE_C, n_days * n_regions) if station else 0.0
+        rain_factor = rng.lognormal(0, 0.3, n_days * n_regions) if station else 1.0
+        frames.append(pd.DataFrame({
+            "날짜": day_strings,
+            "최고기온": np.round(values["최고기온"].ravel() + noise, 1),
+            "최저기온": np.round(values["최저기온"].ravel() + noise, 1),
+            "평균기온": np.round(values["평균기온"].ravel() + noise, 1),
+            "강수량": np.round(values["강수량"].ravel() * rain_factor, 1),
+            "지역": _sample_labels(profile["weather_labels"], codes, rng),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def _event_flags(values, rng):
+    """ EVENT_RULES 기준을 넘은 (날짜, 지역) 중 재난문자가 발송될 칸: {사건 유형: [날짜, 지역] bool} """
+    flags = {}
+    for event_type, rule in EVENT_RULES.items():
+        metric = values[rule["metric"]]
+        hit = metric >= rule["threshold"] if rule["op"] == ">=" else metric <= rule["threshold"]
+        flags[rule["alert_types"][0]] = hit & (rng.random(metric.shape) < EVENT_ALERT_PROB)
+    return flags
+
+
+def _alert_rows(profile, dates, values, density, rng):
+    """ 월별 발송 확률로 (날짜, 지역) 발송 여부를 정하고, 건수는 로그정규, 유형은 월별 분포에서 중복 없이 뽑습니다. """
+    month_idx = dates.month.to_numpy() - 1
+    prob = profile["alert_prob"][:, month_idx].T
+    log_mean = profile["alert_log_mean"][:, month_idx].T
+    log_std = profile["alert_log_std"][:, month_idx].T
+    type_names = np.asarray(profile["type_names"], dtype=object)
+    log_type_probs = np.log(profile["type_probs"])
+    day_strings = dates.strftime("%Y-%m-%d").to_numpy()
+
+    frames = []
+    for _ in range(density):
+        flags = _event_flags(values, rng)
+        issued = rng.random(prob.shape) < prob
+        for hit in flags.values():
+            issued |= hit
+        day_idx, region_idx = np.nonzero(issued)
+        n = len(day_idx)
+        if n == 0:
+            continue
+        counts = np.maximum(1, np.rint(np.exp(
+            log_mean[day_idx, region_idx] + log_std[day_idx, region_idx] * rng.standard_normal(n)
+        ))).astype(int)
+        n_types = rng.choice(len(profile["n_types_probs"]), size=n, p=profile["n_types_probs"]) + 1
+        # Gumbel top-k: 월별 유형 확률에 비례해 중복 없이 n_types개를 뽑는 것과 같음
+        keys = log_type_probs[month_idx[day_idx]] + rng.gumbel(size=(n, len(type_names)))
+        ranked = type_names[np.argsort(-keys, axis=1)]
+        forced = [(t, hit[day_idx, region_idx]) for t, hit in flags.items()]
+        type_lists = []
+        for i in range(n):
+            chosen = [t for t, hit in forced if hit[i]]
+            for t in ranked[i]:
+                if len(chosen) >= n_types[i]:
+                    break
+                if t not in chosen:
+                    chosen.append(t)
+            type_lists.append(str(chosen))
+        frames.append(pd.DataFrame({
+            "날짜": day_strings[day_idx],
+            "지역": _sample_labels(profile["alert_labels"], region_idx, rng),
+            "재난문자_건수": counts,
+            "재난유형_리스트": type_lists,
+        }))
+    if not frames:
+        return pd.DataFrame(columns=["날짜", "지역", "재난문자_건수", "재난유형_리스트"])
+    return pd.concat(frames, ignore_index=True).sort_values("날짜", kind="stable")
+
+
+def _emotion_rows(profile, alerts, rng):
+    """ emotion_sample은 재난문자 행마다 (부정, 중립, 긍정) 점수를 디리클레 분포에서 뽑습니다. """
+    alpha = profile["emotion_mean"] * profile["emotion_concentration"]
+    scores = np.round(rng.dirichlet(alpha, size=len(alerts)), 2)
+    return pd.DataFrame({
+        "date": alerts["날짜"].to_numpy(),
+        "region": alerts["지역"].to_numpy(),
+        "disaster_type": alerts["재난유형_리스트"].to_numpy(),
+        **{col: scores[:, i] for i, col in enumerate(EMOTION_METRICS)},
+    })
+
+
+def generate_dataset(out_dir, scale=1, seed=0, profile=None, block_days=BLOCK_DAYS):
+    """
+    out_dir에 alerts.csv, weather.csv, emotion_sample.csv를 만들고 생성 요약(dict)을 반환합니다.
+    profile이 없으면 저장소 data 폴더에서 추정합니다.
+    """
+    if profile is None:
+        from benchmarks.datasets import read_source
+        profile = fit_profile(read_source(os.path.join(REPO_ROOT, "data")))
+    days, density = plan_volume(profile, scale)
+    start = profile["end_date"] - pd.Timedelta(days=days - 1)
+    os.makedirs(out_dir, exist_ok=True)
+
+    summary = {"scale": scale, "seed": seed, "days": days, "rows_per_region_day": density,
+               "start_date": str(start.date()), "end_date": str(profile["end_date"].date()),
+               "weather_rows": 0, "alerts_rows": 0, "emotion_sample_rows": 0}
+    paths = {name: os.path.join(out_dir, f"{name}.csv") for name in ("weather", "alerts", "emotion_sample")}
+    files = {name: open(path, "w", encoding="utf-8", newline="") for name, path in paths.items()}
+    try:
+        anomaly = np.zeros(len(REGIONS))
+        for block, offset in enumerate(range(0, days, block_days)):
+            rng = np.random.default_rng([seed, block])
+            dates = pd.date_range(start + pd.Timedelta(days=offset), periods=min(block_days, days - offset), freq="D")
+            values, anomaly = _weather_block(profile, dates, anomaly, rng)
+            weather = _weather_rows(profile, dates, values, density, rng)
+            alerts = _alert_rows(profile, dates, values, density, rng)
+            emotion = _emotion_rows(profile, alerts, rng)
+            for name, frame in (("weather", weather), ("alerts", alerts), ("emotion_sample", emotion)):
+                frame.to_csv(files[name], header=(block == 0), index=False)
+                summary[f"{name}_rows"] += len(frame)
+    finally:
+        for f in files.values():
+            f.close()
+    return summary
+
+
+def generate_comments(n, seed=0, alerts=None, start="2024-07-01", end="2024-09-30"):
+    """
+    YouTube 댓글 형태의 말뭉치를 만듭니다. (get_video_comments 결과 컬럼 + video_title)
+    alerts(alerts.csv 형식)를 주면 재난문자가 많은 날, 많은 지역, 그 날의 재난 유형에 댓글이 몰리도록 만듭니다.
+    """
+    rng = np.random.default_rng([seed, 1_000_003])
+    n_videos = max(1, math.ceil(n / DEFAULT_MAX_COMMENTS_PER_VIDEO))
+    synonyms = DISASTER_SYNONYMS
+    disaster_keys = list(synonyms)
+
+    if alerts is not None and len(alerts):
+        weights = pd.to_numeric(alerts["재난문자_건수"], errors="coerce").fillna(0).to_numpy(dtype=float) + 1
+        picked = rng.choice(len(alerts), size=n_videos, p=weights / weights.sum())
+        video_days = pd.to_datetime(alerts["날짜"].to_numpy()[picked])
+        video_regions = encode_regions(alerts["지역"].to_numpy()[picked]).astype(str).to_numpy()
+        video_types = []
+        for value in alerts["재난유형_리스트"].to_numpy()[picked]:
+            matched = [k for k in disaster_keys if any(t in synonyms[k] for t in parse_type_list(value))]
+            video_types.append(matched[0] if matched else disaster_keys[rng.integers(len(disaster_keys))])
+    else:
+        span_days = (pd.Timestamp(end) - pd.Timestamp(start)).days + 1
+        video_days = pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, span_days, n_videos), unit="D")
+        video_regions = np.asarray(REGIONS, dtype=object)[rng.integers(0, len(REGIONS), n_videos)]
+        video_types = [disaster_keys[i] for i in rng.integers(0, len(disaster_keys), n_videos)]
+
+    titles = []
+    for region, disaster in zip(video_regions, video_types):
+        region_word = REGION_KEYWORDS.get(region, [region])[0]
+        template = _TITLE_TEMPLATES[rng.integers(len(_TITLE_TEMPLATES))]
+        titles.append(template.format(region=region_word, keyword=synonyms[disaster][0]))
+
+    # 영상별 댓글 수는 인기 편중(Zipf)을 따름
+    popularity = 1.0 / np.arange(1, n_videos + 1)
+    video_idx = rng.choice(n_videos, size=n, p=popularity / popularity.sum())
+    tone = rng.choice(3, size=n, p=[0.5, 0.3, 0.2])
+    phrases = [_NEGATIVE_PHRASES, _NEUTRAL_PHRASES, _POSITIVE_PHRASES]
+    mention_region = rng.random(n) < 0.6
+    mention_disaster = rng.random(n) < 0.8
+    texts = []
+    for i in range(n):
+        v = video_idx[i]
+        parts = []
+        if mention_region[i]:
+            keywords = REGION_KEYWORDS.get(video_regions[v], [video_regions[v]])
+            parts.append(keywords[rng.integers(len(keywords))])
+        if mention_disaster[i]:
+            words = synonyms[video_types[v]]
+            parts.append(words[rng.integers(len(words))])
+        pool = phrases[tone[i]]
+        parts.append(pool[rng.integers(len(pool))])
+        texts.append(" ".join(parts))
+
+    # 댓글은 영상 날짜 이후 며칠 안에 대부분 달림 (지수 분포, 평균 18시간)
+    delay = pd.to_timedelta(rng.exponential(18 * 3600, n).astype(np.int64), unit="s")
+    published = pd.DatetimeIndex(video_days)[video_idx] + pd.to_timedelta(rng.integers(0, 86400, n), unit="s") + delay
+    return pd.DataFrame({
+        "video_id": [f"v{seed:x}{v:07x}" for v in video_idx],
+        "comment_id": [f"Ugx{seed:x}{i:010x}" for i in range(n)],
+        "text": texts,
+        "author": [f"user{a}" for a in rng.integers(0, max(10, n // 3), n)],
+        "published_at": published.to_pydatetime(),
+        "like_count": np.minimum(rng.zipf(2.0, n) - 1, 10000),
+        "video_title": np.asarray(titles, dtype=object)[video_idx],
+    })
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="규모 테스트용 합성 데이터 생성")
+    parser.add_argument("--scale", type=float, default=10, help="실제 데이터 대비 배율")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="CSV를 쓸 폴더 (앱의 data 폴더 대신 사용)")
+    parser.add_argument("--comments", type=int, default=0, help="함께 만들 댓글 수 (out/youtube_comments.parquet)")
+    args = parser.parse_args(argv)
+
+    summary = generate_dataset(args.out, args.scale, args.seed)
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+    if args.comments:
+        alerts = pd.read_csv(os.path.join(args.out, "alerts.csv"))
+        comments = generate_comments(args.comments, args.seed, alerts=alerts)
+        # .parquet이므로 load_data(data 폴더의 .csv만 읽음)에는 섞이지 않음
+        comments.to_parquet(os.path.join(args.out, "youtube_comments.parquet"), index=False)
+        print(f"comments: {len(comments)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+import os
+import json
+import numpy as np
+import geopandas as gpd
+import shapely
+from shapely.errors import GEOSException
+import streamlit as st
+from matplotlib.path import Path
+from utils.regions import resolve_region
+
+GEOJSON_PATH = "geo/korea_regions.geojson"
+GEOMETRY_CACHE_DIR = "geo/.cache"
+TARGET_CRS = "EPSG:5179" # 한국 좌표계 (미터 단위), 단순화 허용 오차를 미터로 지정하기 위해 사용
+
+# 상세 수준별 단순화 허용 오차 (미터), 0이면 원본 형상
+DETAIL_LEVELS = {"high": 0, "medium": 200, "low": 1000}
+DEFAULT_DETAIL_LEVEL = "medium"
+CACHE_SCHEMA_VERSION = 2 # 캐시 파일 구성이 바뀌면 올려서 기존 캐시를 다시 만들도록 함
+
+
+def _source_signature(src):
+    """ 원본 GeoJSON의 크기와 수정 시각으로 캐시 유효성 확인용 서명을 만듭니다. """
+    stat = os.stat(src)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _simplify(geometries, tolerance):
+    """
+    인접 지역 경계가 어긋나지 않도록 커버리지 단위로 단순화합니다.
+    (shapely 2.1 미만이거나 GEOS가 지원하지 않으면 지역별 topology 보존 단순화로 대체)
+    """
+    if tolerance <= 0:
+        return geometries
+    try:
+        return gpd.GeoSeries(shapely.coverage_simplify(geometries.values, tolerance), index=geometries.index, crs=geometries.crs)
+    except (AttributeError, GEOSException, NotImplementedError):
+        return geometries.simplify(tolerance, preserve_topology=True)
+
+
+def build_geometry_cache(src=GEOJSON_PATH, cache_dir=GEOMETRY_CACHE_DIR):
+    """
+    GeoJSON을 한 번 읽어 투영 변환 후, 상세 수준별로 단순화한 형상을 GeoParquet으로 저장합니다.
+    각 파일은 지역명(CTP_KOR_NM) 인덱스를 가집니다.
+    """
+    geo_df = gpd.read_file(src)
+    geo_df = geo_df[["geometry", "CTP_KOR_NM"]].rename(columns={"CTP_KOR_NM": "지역명"})
+    # CTP_KOR_NM을 표준 지역명으로 대응시켜 데이터의 지역 코드와 바로 맞출 수 있게 함
+    resolved = geo_df["지역명"].map(resolve_region)
+    if resolved.isna().any():
+        raise ValueError(f"GeoJSON에 알 수 없는 지역명이 있습니다: {sorted(geo_df.loc[resolved.isna(), '지역명'])}")
+    geo_df["지역명"] = resolved
+    # 한 지역이 여러 피처로 나뉘어 있으면 하나로 합칩니다.
+    geo_df = geo_df.dissolve(by="지역명").to_crs(TARGET_CRS)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    for level, tolerance in DETAIL_LEVELS.items():
+        level_df = gpd.GeoDataFrame(geometry=_simplify(geo_df.geometry, tolerance), crs=TARGET_CRS)
+        level_df.index.name = "지역명"
+        tmp_path = os.path.join(cache_dir, f"regions_{level}.parquet.tmp")
+        level_df.to_parquet(tmp_path)
+        os.replace(tmp_path, os.path.join(cache_dir, f"regions_{level}.parquet"))
+
+    with open(os.path.join(cache_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"schema": CACHE_SCHEMA_VERSION, "source": src, "signature": _source_signature(src), "crs": TARGET_CRS,
+                   "levels": DETAIL_LEVELS}, f, ensure_ascii=False, indent=2)
+
+
+def _cache_is_fresh(src, cache_dir):
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return False
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    return (manifest.get("schema") == CACHE_SCHEMA_VERSION and manifest.get("signature") == _source_signature(src)
+            and manifest.get("levels") == DETAIL_LEVELS)
+
+
+@st.cache_resource(show_spinner="지도 형상 불러오는 중...")
+def load_geometry(level=DEFAULT_DETAIL_LEVEL, src=GEOJSON_PATH, cache_dir=GEOMETRY_CACHE_DIR):
+    """
+    상세 수준별 지역 형상(GeoDataFrame, 지역명 인덱스, EPSG:5179)을 반환합니다.
+    원본이 바뀌었거나 캐시가 없을 때만 GeoJSON을 다시 읽습니다.
+    """
+    if not _cache_is_fresh(src, cache_dir):
+        build_geometry_cache(src, cache_dir)
+    return gpd.read_parquet(os.path.join(cache_dir, f"regions_{level}.parquet"))
+
+
+def _geometry_to_path(geometry):
+    """ (Multi)Polygon 하나를 구멍(interior)까지 포함한 matplotlib Path로 변환합니다. """
+    polygons = geometry.geoms if geometry.geom_type == "MultiPolygon" else [geometry]
+    rings = []
+    for polygon in polygons:
+        rings.append(np.asarray(polygon.exterior.coords)[:, :2])
+        rings.extend(np.asarray(interior.coords)[:, :2] for interior in polygon.interiors)
+    return Path.make_compound_path(*[Path(ring, closed=True) for ring in rings])
+
+
+@st.cache_resource(show_spinner=False)
+def load_region_paths(level=DEFAULT_DETAIL_LEVEL):
+    """
+    지역명 목록과 지역별 matplotlib Path, 지도 범위를 반환합니다.
+    렌더링 시에는 이 Path들에 색상 값만 다시 지정하면 됩니다. (파일 읽기, 투영 변환 없음)
+    """
+    geo_df = load_geometry(level)
+    paths = [_geometry_to_path(geometry) for geometry in geo_df.geometry]
+    return list(geo_df.index), paths, tuple(geo_df.total_bounds)
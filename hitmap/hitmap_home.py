@@ -1,16 +1,25 @@
 import streamlit as st
+from utils.tracing import traced
 import pandas as pd
-import geopandas as gpd
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
-import json
 import ast
-import geopandas as gpd
+from util import data_version
+from utils.store import current_store_version, store_years, read_window
+from .geometry import load_region_paths
+from .render_cache import get_choropleth_png, start_prerender
+from utils.cache import budgeted_cache
+from functools import partial
 
+HITMAP_CMAP = "PuBu"
+HITMAP_PRERENDER = True # 데이터 버전마다 전체 (연도, 재난 유형) 조합을 백그라운드에서 미리 렌더링
+ALERT_COLUMNS = ["날짜", "지역", "재난유형_리스트"] # 파티션 저장소에서 읽을 컬럼
+DEFAULT_YEAR = 2023
+DEFAULT_TYPE = "한파"
 
-@st.cache_data
-def load(total_df):
-    disaster_df = total_df["alerts"]
+
+def explode_alerts(alerts):
+    """ 재난문자 행을 재난 유형별 행으로 펼치고 연도 컬럼을 붙입니다. """
+    # 공유 데이터(load_data 결과)를 바꾸지 않도록 복사본에서 작업
+    disaster_df = alerts.copy()
 
     def safe_eval(val):
         try:
@@ -24,49 +33,106 @@ def load(total_df):
     exploded_df = disaster_df.explode('재난유형_리스트')
     exploded_df.rename(columns={'지역': '지역명', '재난유형_리스트': '재난유형'}, inplace=True)
 
-    # GeoJSON -> GeoDataFrame으로 로드
-    geo_df = gpd.read_file("geo/korea_regions.geojson")
-    geo_df = geo_df[["geometry", "CTP_KOR_NM"]].rename(columns={"CTP_KOR_NM": "지역명"})
-    geo_df['지역명'] = geo_df['지역명'].str.strip()
+    return exploded_df
+
+
+@budgeted_cache(max_entries=2)
+def load(version, _total_df):
+    return explode_alerts(_total_df["alerts"])
+
+
+def read_year(year):
+    """ 파티션 저장소에서 한 연도의 파티션과 필요한 컬럼만 읽어 펼칩니다. """
+    return explode_alerts(read_window("alerts", f"{year}-01-01", f"{year}-12-31", columns=ALERT_COLUMNS))
+
+
+@budgeted_cache(max_entries=4)
+def load_year(version, year):
+    return read_year(year)
+
+
+def count_matrix(df, region_names):
+    """ (연도, 재난 유형)별 지역 건수 배열을 한 번의 groupby로 계산합니다. (미리 렌더링용) """
+    counts = df.dropna(subset=['재난유형']).groupby(['연도', '재난유형', '지역명'], observed=True).size()
+    if counts.empty:
+        return {}
+    table = counts.unstack('지역명').reindex(columns=region_names).fillna(0).astype(int)
+    return {key: row.to_numpy() for key, row in table.iterrows()}
+
+
+def store_source():
+    """
+    파티션 저장소를 쓸 수 있으면 (캐시 키, 연도 목록)을, 저장소가 없거나 재난문자 파티션이 없으면 (None, [])를 반환합니다.
+    (utils.warmup도 같은 키로 캐시를 채우도록 이 함수를 사용)
+    """
+    stored = current_store_version()
+    year_options = store_years("alerts") if stored is not None else []
+    if not year_options:
+        return None, []
+    return f"store-{stored}", year_options
 
-    return exploded_df, geo_df
 
+def default_year(year_options):
+    return DEFAULT_YEAR if DEFAULT_YEAR in year_options else year_options[0]
 
+
+def prerender_counts(region_names, years=None, all_df=None):
+    """
+    미리 렌더링용 건수 배열 묶음을 차례로 냅니다. (start_prerender의 백그라운드 스레드에서 실행)
+    all_df가 있으면 한 번에, 없으면 파티션 저장소에서 한 번에 한 연도씩 읽어 메모리를 연도 하나 크기로 유지합니다.
+    """
+    if all_df is not None:
+        yield count_matrix(all_df, region_names)
+        return
+    for year in years:
+        yield count_matrix(read_year(year), region_names)
+
+
+@traced()
 def run_hitmap(total_df):
 
-    df, geo_df = load(total_df)
+    # 파티션 저장소가 있으면 연도 목록은 파티션에서, 데이터는 선택한 연도의 파티션에서만 읽음
+    # (저장소가 없거나 재난문자 파티션이 없으면 전체 데이터 사용)
+    stored, year_options = store_source()
+    version = data_version() if stored is None else stored
+    region_names, region_paths, map_bounds = load_region_paths()
 
     with st.sidebar:
         st.header("🔎 필터 선택")
-        year_options = sorted(df['연도'].unique())
-        disaster_types = df['재난유형'].dropna().unique().tolist()
+        if stored is None:
+            all_df = load(version, total_df)
+            year_options = sorted(all_df['연도'].dropna().unique())
+        if not year_options:
+            st.warning("표시할 재난문자 데이터가 없습니다.")
+            return
 
         # 기본값 설정: 2023년 한파
-        default_year = 2023 if 2023 in year_options else year_options[0]
-        default_type = "한파" if "한파" in disaster_types else disaster_types[0]
+        selected_year = st.selectbox("연도 선택", year_options, index=year_options.index(default_year(year_options)))
 
-        selected_year = st.selectbox("연도 선택", year_options, index=year_options.index(default_year))
+        df = all_df if stored is None else load_year(version, selected_year)
+        disaster_types = df['재난유형'].dropna().unique().tolist()
+        if not disaster_types:
+            st.warning(f"{selected_year}년에 재난 유형이 기록된 재난문자가 없습니다.")
+            return
+        default_type = DEFAULT_TYPE if DEFAULT_TYPE in disaster_types else disaster_types[0]
         selected_type = st.selectbox("재난 유형 선택", sorted(disaster_types), index=sorted(disaster_types).index(default_type))
 
-    # 필터링 및 병합
-    filtered_df = df[(df['연도'] == selected_year) & (df['재난유형'] == selected_type)]
-    grouped_df = filtered_df.groupby('지역명').size().reset_index(name='건수')
-    grouped_df['지역명'] = grouped_df['지역명'].str.strip()
-    merged = geo_df.merge(grouped_df, on='지역명', how='left').fillna(0)
+    # 필터링 후 지도 지역 순서에 맞춰 건수 배열 생성 (렌더링 캐시가 없을 때만 계산됨)
+    def selected_counts():
+        filtered_df = df[(df['연도'] == selected_year) & (df['재난유형'] == selected_type)]
+        return filtered_df.groupby('지역명', observed=True).size().reindex(region_names, fill_value=0).to_numpy()
 
-    # 시각화
-    st.subheader(f"▶ {selected_year}년 {selected_type} 발생 히트맵")
-    fig, ax = plt.subplots(figsize=(6, 8))
-    cmap = plt.cm.PuBu
-    norm = mcolors.Normalize(vmin=0, vmax=max(10, merged['건수'].max()))
-
-    merged_plot = merged.plot(column='건수', cmap=cmap, linewidth=0.2, edgecolor='grey', legend=False, ax=ax)
-
-    sm = plt.cm.ScalarMappable(cmap=cmap, norm=norm)
-    sm._A = []
-    cbar = fig.colorbar(sm, ax=ax, orientation='vertical', shrink=0.3)
-    # cbar.set_label('재난 발생 건수', fontsize=10)
-
-    ax.axis('off')
-    st.pyplot(fig)
+    if HITMAP_PRERENDER:
+        # 전체 연도 렌더링용 건수는 백그라운드 스레드에서 계산 (저장소에서는 연도별 파티션을 하나씩 읽음)
+        if stored is None:
+            counts_fn = partial(prerender_counts, region_names, all_df=all_df)
+        else:
+            counts_fn = partial(prerender_counts, region_names, years=tuple(year_options))
+        start_prerender(version, counts_fn, region_paths, map_bounds, cmap_names=(HITMAP_CMAP,))
 
+    # 시각화 (캐시된 PNG를 그대로 표시)
+    st.subheader(f"▶ {selected_year}년 {selected_type} 발생 히트맵")
+    png = get_choropleth_png(
+        version, selected_year, selected_type, HITMAP_CMAP, (region_paths, map_bounds, selected_counts)
+    )
+    st.image(png, width=480)
@@ -0,0 +1,130 @@
+import os
+import threading
+import multiprocessing
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+import matplotlib.cm as cm
+import matplotlib.colors as mcolors
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import PatchCollection
+from matplotlib.patches import PathPatch
+import streamlit as st
+from utils.cache import budgeted_cache
+
+RENDER_CACHE_DIR = "hitmap/.render_cache"
+RENDER_MEMORY_MAX_ENTRIES = 256 # 메모리에 보관할 최대 이미지 수
+PRERENDER_MAX_WORKERS = 4
+
+
+def draw_choropleth(ax, paths, bounds, values, cmap, norm):
+    """ 미리 계산된 지역 Path에 값에 따른 색상만 입혀 그립니다. """
+    collection = PatchCollection(
+        [PathPatch(path) for path in paths], cmap=cmap, norm=norm, linewidth=0.2, edgecolor='grey'
+    )
+    collection.set_array(values)
+    ax.add_collection(collection)
+    ax.set_xlim(bounds[0], bounds[2])
+    ax.set_ylim(bounds[1], bounds[3])
+    ax.set_aspect('equal')
+    return collection
+
+
+def render_choropleth_png(paths, bounds, values, cmap_name="PuBu"):
+    """
+    지역별 값으로 단계구분도(컬러바 포함)를 PNG bytes로 렌더링합니다.
+    pyplot을 거치지 않는 Figure를 사용하므로 렌더링 후 Figure가 전역에 남지 않습니다.
+    """
+    fig = Figure(figsize=(6, 8))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    cmap = matplotlib.colormaps[cmap_name]
+    norm = mcolors.Normalize(vmin=0, vmax=max(10, max(values, default=0)))
+
+    draw_choropleth(ax, paths, bounds, values, cmap, norm)
+    sm = cm.ScalarMappable(cmap=cmap, norm=norm)
+    sm.set_array([])
+    fig.colorbar(sm, ax=ax, orientation='vertical', shrink=0.3)
+    ax.axis('off')
+
+    buf = BytesIO()
+    fig.savefig(buf, format="png", bbox_inches="tight")
+    return buf.getvalue()
+
+
+def cache_file_path(version, year, disaster_type, cmap_name):
+    safe_type = str(disaster_type).replace("/", "_").replace(" ", "_")
+    return os.path.join(RENDER_CACHE_DIR, str(version), f"{year}_{safe_type}_{cmap_name}.png")
+
+
+def _write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+@budgeted_cache(max_entries=RENDER_MEMORY_MAX_ENTRIES)
+def get_choropleth_png(version, year, disaster_type, cmap_name, _render_args):
+    """
+    (데이터 버전, 연도, 재난 유형, 컬러맵)별 단계구분도 PNG를 반환합니다.
+    메모리 캐시 -> 디스크 캐시 순으로 찾고, 둘 다 없을 때만 렌더링합니다.
+    _render_args: (paths, bounds, values_fn) - 캐시 키에 포함되지 않으며, 값은 렌더링이 필요할 때만 계산합니다.
+    """
+    path = cache_file_path(version, year, disaster_type, cmap_name)
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            return f.read()
+    paths, bounds, values_fn = _render_args
+    png = render_choropleth_png(paths, bounds, values_fn(), cmap_name)
+    _write_atomic(path, png)
+    return png
+
+
+def _prerender_one(task):
+    """ (프로세스 풀 작업) 하나의 조합을 렌더링해 디스크 캐시에 저장합니다. """
+    path, paths, bounds, values, cmap_name = task
+    if not os.path.exists(path):
+        _write_atomic(path, render_choropleth_png(paths, bounds, values, cmap_name))
+    return path
+
+
+def _run_prerender(version, count_matrices_fn, paths, bounds, cmap_names, max_workers):
+    """ (백그라운드 스레드) 건수 배열 묶음마다 디스크 캐시에 없는 조합만 렌더링합니다. """
+    executor = None
+    try:
+        for counts in count_matrices_fn():
+            tasks = [
+                (cache_file_path(version, year, disaster_type, cmap_name), paths, bounds, values, cmap_name)
+                for (year, disaster_type), values in counts.items()
+                for cmap_name in cmap_names
+                if not os.path.exists(cache_file_path(version, year, disaster_type, cmap_name))
+            ]
+            if not tasks:
+                continue
+            if executor is None: # 렌더링할 조합이 있을 때만 프로세스 풀을 띄움
+                context = multiprocessing.get_context("spawn") # 서버 프로세스의 스레드 상태를 복제하지 않도록 spawn 사용
+                executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=context)
+            for _ in executor.map(_prerender_one, tasks, chunksize=4):
+                pass
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+@st.cache_resource(show_spinner=False)
+def start_prerender(version, _count_matrices_fn, _paths, _bounds, cmap_names=("PuBu",), max_workers=PRERENDER_MAX_WORKERS):
+    """
+    데이터 버전마다 한 번, (연도, 재난 유형, 컬러맵) 전체 조합을 백그라운드 프로세스 풀에서 미리 렌더링합니다.
+    _count_matrices_fn: {(연도, 재난 유형): 지역 순서의 건수 배열} 묶음을 차례로 내는 iterable을 반환하는 함수
+    (백그라운드 스레드에서 버전당 한 번만 호출되므로, 데이터 읽기와 집계가 요청 처리를 막지 않음)
+    반환값은 진행 중인 백그라운드 스레드입니다.
+    """
+    thread = threading.Thread(
+        target=_run_prerender, args=(version, _count_matrices_fn, _paths, _bounds, cmap_names, max_workers),
+        daemon=True, name=f"hitmap-prerender-{version}"
+    )
+    thread.start()
+    return thread
@@ -1,13 +1,11 @@
 import pandas as pd
-from util import load_data
 import streamlit as st
+from utils.tracing import traced
 
 st.set_page_config(page_title="재난 문자 인식 대시보드", layout="wide")
 
+@traced()
 def run_home():
-    # 데이터 불러오기
-    total_df = load_data()
-
     # 🏠 메인 타이틀
     st.title("🌍 재난 문자 인식 대시보드")
 
@@ -0,0 +1,310 @@
+# message/ingest.py
+"""
+원본 재난문자(CBS) 발송 기록을 스트리밍으로 읽어 시간 단위 발송 건수 테이블로 집계합니다.
+
+사용 예:
+    python -m message.ingest raw/cbs_2024-01.csv raw/cbs_2024-02.csv --encoding cp949
+    python -m message.ingest raw/ --alerts-out data/alerts.csv
+
+- 입력(CSV/JSONL/Parquet, 파일 또는 폴더)은 chunk_rows 행씩 필요한 컬럼만 읽으므로 메모리 사용량이 입력 크기와 무관합니다.
+- 문자 본문은 ALERT_TYPE_KEYWORDS 키워드 사전으로 재난 유형을 분류합니다.
+  (한 문자에 여러 유형 가능, 유형 이름은 data/alerts.csv의 재난유형 이름(호우, 대설, 교통통제 등)과 같음)
+- 수신 지역("서울특별시 전체,경기도 수원시")은 시도 단위로 바꿔, 여러 시도에 보낸 문자는 시도마다 한 건으로 셉니다.
+- 결과는 (hour, region, type)별 count 합계를 Parquet 파트로 추가하는 테이블입니다. type "전체"는 유형과 무관한 문자 수입니다.
+  새 파일만 집계해 파트를 덧붙이고, 내용이 바뀐 파일은 그 파일의 파트만 다시 만듭니다.
+- --alerts-out을 주면 시간 단위 테이블에서 alerts.csv와 같은 형식(날짜, 지역, 재난문자_건수, 재난유형_리스트)의 일별 테이블을 씁니다.
+  유형 이름이 같으므로 data/alerts.csv를 그대로 대신할 수 있습니다.
+  (유형 사전이 바뀌기 전에 만든 테이블은 --rebuild로 다시 집계해야 합니다.)
+"""
+import os
+import re
+import sys
+import json
+import argparse
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from SNS.batch_score import detect_format, iter_input_chunks
+from utils.regions import resolve_region, encode_regions
+from utils.cache import budgeted_cache
+
+ALERTS_HOURLY_DIR = "data/alerts_hourly" # 시간 단위 재난문자 집계 테이블 (Parquet 파트 파일)
+RAW_COLUMNS = {"time": "생성일시", "text": "메시지내용", "region": "수신지역명", "authority": None}
+TOTAL_TYPE = "전체"
+DEFAULT_CHUNK_ROWS = 200_000
+COMBINE_EVERY = 8 # 묶음 집계가 이만큼 쌓이면 합쳐서 메모리를 (시간, 지역, 유형) 조합 수 수준으로 유지
+STATE_FILE = "_state.json"
+PART_PATTERN = "part-{}.parquet"
+COMPACT_THRESHOLD = 32 # 파트 파일이 이 수를 넘으면 하나로 합칩니다.
+COUNT_COLUMNS = ["hour", "region", "type", "count"]
+
+# 재난 유형별 키워드 (유형 이름은 data/alerts.csv의 재난유형 이름과 같아야 함)
+ALERT_TYPE_KEYWORDS = {
+    "폭염": ["폭염", "무더위", "열사병", "온열질환"],
+    "산불": ["산불"],
+    "대설": ["대설", "폭설", "적설"],
+    "호우": ["호우", "폭우", "집중호우"],
+    "한파": ["한파", "동파", "강추위"],
+    "화재": ["화재", "불이 나", "연기 흡입"],
+    "강풍": ["강풍", "돌풍"],
+    "산사태": ["산사태", "토사", "낙석", "급경사지"],
+    "교통사고": ["교통사고", "추돌", "차량 사고"],
+    "풍랑": ["풍랑", "너울", "높은 물결"],
+    "교통통제": ["교통통제", "통행 통제", "통행제한", "도로 통제", "전면 통제"],
+    "전염병": ["전염병", "감염병", "코로나", "확진", "방역"],
+    "수도": ["단수", "수돗물", "상수도", "급수"],
+    "건조": ["건조"],
+    "홍수": ["홍수", "범람", "침수", "하천 수위"],
+    "정전": ["정전"],
+    "교통": ["교통정체", "교통혼잡", "우회"],
+    "지진": ["지진"],
+    "미세먼지": ["미세먼지", "초미세먼지"],
+    "태풍": ["태풍"],
+    "환경오염사고": ["유해화학물질", "화학물질 누출", "가스 누출", "유출"],
+    "가축질병": ["가축질병", "조류인플루엔자", "구제역", "돼지열병", "럼피스킨"],
+    "황사": ["황사"],
+    "안개": ["안개"],
+    "붕괴": ["붕괴"],
+    "통신": ["통신장애", "통신 장애", "통신 두절", "먹통"],
+    "민방공": ["민방공", "민방위", "공습"],
+    "가뭄": ["가뭄", "제한급수"],
+    "테러": ["테러"],
+    "지진해일": ["지진해일", "쓰나미"],
+}
+
+_TYPE_PATTERNS = {
+    disaster_type: "|".join(re.escape(word) for word in keywords)
+    for disaster_type, keywords in ALERT_TYPE_KEYWORDS.items()
+}
+
+
+def classify_types(texts):
+    """
+    문자 본문에 키워드가 들어 있는 재난 유형을 찾아 (행 번호, 유형) 쌍의 DataFrame을 반환합니다.
+    부분 문자열 일치를 유형마다 한 번의 벡터 연산으로 적용합니다. (유형 이름은 alerts.csv와 같음)
+    """
+    texts = pd.Series(texts, dtype=object).fillna("").astype(str).reset_index(drop=True)
+    pieces = [
+        pd.DataFrame({"row": np.flatnonzero(texts.str.contains(pattern, regex=True).to_numpy()), "type": disaster_type})
+        for disaster_type, pattern in _TYPE_PATTERNS.items()
+    ]
+    return pd.concat(pieces, ignore_index=True)
+
+
+def attribute_alert_regions(values, lookup=None):
+    """
+    수신 지역 문자열을 표준 시도명으로 바꿔 (행 번호, 지역) 쌍의 DataFrame을 반환합니다.
+    쉼표로 나뉜 각 지역의 첫 단어(시도명 또는 별칭)만 보며, 해석할 수 없는 지역은 제외합니다.
+    lookup: 묶음 사이에 재사용하는 {지역 표기: 표준 지역명} 사전
+    """
+    lookup = {} if lookup is None else lookup
+    parts = pd.Series(values, dtype=object).fillna("").astype(str).reset_index(drop=True).str.split(",").explode()
+    names = parts.str.strip().str.split(n=1).str[0]
+    for name in pd.unique(names.dropna()):
+        if name not in lookup:
+            lookup[name] = resolve_region(name)
+    regions = pd.DataFrame({"row": parts.index.to_numpy(), "region": names.map(lookup).to_numpy()})
+    return regions.dropna().drop_duplicates().reset_index(drop=True)
+
+
+def aggregate_chunk(chunk, columns=RAW_COLUMNS, lookup=None):
+    """ 원본 문자 묶음을 (hour, region, type)별 count로 집계합니다. """
+    hours = pd.to_datetime(chunk[columns["time"]], errors="coerce").dt.floor("h").to_numpy()
+    region_values = chunk[columns["region"]]
+    if columns.get("authority"):
+        # 수신 지역이 비어 있으면 발송 기관명(예: "경기도 수원시")으로 지역을 정함
+        region_values = region_values.where(region_values.notna() & (region_values != ""), chunk[columns["authority"]])
+    regions = attribute_alert_regions(region_values, lookup)
+    types = pd.concat([
+        classify_types(chunk[columns["text"]]),
+        pd.DataFrame({"row": np.arange(len(chunk)), "type": TOTAL_TYPE}),
+    ], ignore_index=True)
+
+    long_df = regions.merge(types, on="row")
+    long_df["hour"] = hours[long_df["row"].to_numpy()]
+    long_df = long_df.dropna(subset=["hour"])
+    return long_df.groupby(["hour", "region", "type"], as_index=False).size().rename(columns={"size": "count"})
+
+
+def _combine(frames):
+    frames = [f for f in frames if not f.empty]
+    if not frames:
+        return pd.DataFrame(columns=COUNT_COLUMNS)
+    return pd.concat(frames, ignore_index=True).groupby(["hour", "region", "type"], as_index=False)["count"].sum()
+
+
+def aggregate_file(path, input_format=None, chunk_rows=DEFAULT_CHUNK_ROWS, columns=RAW_COLUMNS, encoding=None):
+    """ 원본 파일 하나를 묶음 단위로 읽어 집계합니다. 반환: (집계 DataFrame, 읽은 문자 수) """
+    needed = [col for col in (columns["time"], columns["text"], columns["region"], columns.get("authority")) if col]
+    lookup = {}
+    pending = []
+    rows = 0
+    for chunk in iter_input_chunks(path, input_format or detect_format(path), chunk_rows, columns=needed, encoding=encoding):
+        rows += len(chunk)
+        pending.append(aggregate_chunk(chunk, columns, lookup))
+        if len(pending) >= COMBINE_EVERY:
+            pending = [_combine(pending)]
+    return _combine(pending), rows
+
+
+def _load_state(table_dir):
+    path = os.path.join(table_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {"files": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(table_dir, state):
+    path = os.path.join(table_dir, STATE_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _write_part(table_dir, part_df):
+    name = PART_PATTERN.format(datetime.now().strftime("%Y%m%d%H%M%S%f"))
+    tmp_path = os.path.join(table_dir, f"{name}.tmp")
+    part_df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, os.path.join(table_dir, name))
+    return name
+
+
+def _parts(state):
+    return sorted({entry["part"] for entry in state["files"].values() if entry["part"]})
+
+
+def _read_counts(table_dir, parts):
+    return _combine([pd.read_parquet(os.path.join(table_dir, part)) for part in parts])
+
+
+def _raw_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if os.path.splitext(name)[1].lower() in (".csv", ".jsonl", ".ndjson", ".parquet", ".pq"):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def update_hourly_table(raw_paths, table_dir=ALERTS_HOURLY_DIR, chunk_rows=DEFAULT_CHUNK_ROWS, columns=RAW_COLUMNS,
+                        input_format=None, encoding=None):
+    """
+    raw_paths(파일 또는 폴더) 중 아직 반영하지 않았거나 내용이 바뀐 파일만 집계해 테이블에 반영합니다.
+    반영한 파일 수를 반환합니다.
+    """
+    os.makedirs(table_dir, exist_ok=True)
+    state = _load_state(table_dir)
+    updated = 0
+    for path in _raw_files(raw_paths):
+        path = os.path.abspath(path)
+        signature = f"{os.path.getsize(path)}:{os.path.getmtime(path)}"
+        entry = state["files"].get(path)
+        if entry is not None and entry["signature"] == signature:
+            continue
+        if entry is not None and entry.get("compacted"):
+            print(f"건너뜀: {path} (이미 압축된 파트에 합쳐져 있어 다시 반영할 수 없습니다. --rebuild로 다시 만드세요)")
+            continue
+
+        counts, rows = aggregate_file(path, input_format, chunk_rows, columns, encoding)
+        old_part = entry["part"] if entry is not None else None
+        # 내용이 바뀐 파일은 그 파일의 파트만 새로 만들어 교체
+        state["files"][path] = {"signature": signature, "part": _write_part(table_dir, counts) if not counts.empty else None}
+        _save_state(table_dir, state)
+        if old_part:
+            os.remove(os.path.join(table_dir, old_part))
+        print(f"반영: {path} (문자 {rows:,}건 -> 시간 단위 {len(counts):,}행)")
+        updated += 1
+
+    # 파트가 많아지면 합계만 다시 묶어 하나의 파트로 압축합니다. (원본 파일은 다시 읽지 않음)
+    old_parts = _parts(state)
+    if len(old_parts) > COMPACT_THRESHOLD:
+        merged = _write_part(table_dir, _read_counts(table_dir, old_parts))
+        for entry in state["files"].values():
+            if entry["part"]:
+                entry["part"] = merged
+                entry["compacted"] = True
+        _save_state(table_dir, state)
+        for part in old_parts:
+            os.remove(os.path.join(table_dir, part))
+    return updated
+
+
+def hourly_table_version(table_dir=ALERTS_HOURLY_DIR):
+    """ 시간 단위 테이블의 버전(상태 파일 수정 시각)을 반환합니다. 테이블이 없으면 None을 반환합니다. """
+    path = os.path.join(table_dir, STATE_FILE)
+    if not os.path.exists(path) or not _parts(_load_state(table_dir)):
+        return None
+    return os.stat(path).st_mtime_ns
+
+
+@budgeted_cache(max_entries=2)
+def load_hourly_alerts(table_dir=ALERTS_HOURLY_DIR, version=None):
+    """
+    시간 단위 재난문자 건수 테이블(hour, region, type, count)을 읽습니다.
+    region은 REGION_DTYPE, type은 범주형입니다. version은 캐시 무효화용 키로 hourly_table_version()의 값을 전달합니다.
+    """
+    counts = _read_counts(table_dir, _parts(_load_state(table_dir)))
+    counts["hour"] = pd.to_datetime(counts["hour"])
+    counts["region"] = encode_regions(counts["region"])
+    counts["type"] = counts["type"].astype("category")
+    counts["count"] = counts["count"].astype(np.int64)
+    return counts.sort_values(["hour", "region"]).reset_index(drop=True)
+
+
+def daily_alerts(hourly):
+    """ 시간 단위 테이블을 alerts.csv 형식(날짜, 지역, 재난문자_건수, 재난유형_리스트)으로 묶습니다. (유형은 건수 순) """
+    daily = pd.DataFrame({
+        "날짜": pd.to_datetime(hourly["hour"]).dt.normalize(),
+        "지역": hourly["region"].astype(str),
+        "type": hourly["type"].astype(str),
+        "count": hourly["count"],
+    }).groupby(["날짜", "지역", "type"], as_index=False)["count"].sum()
+
+    totals = daily[daily["type"] == TOTAL_TYPE].drop(columns="type").rename(columns={"count": "재난문자_건수"})
+    types = (
+        daily[daily["type"] != TOTAL_TYPE]
+        .sort_values(["날짜", "지역", "count"], ascending=[True, True, False])
+        .groupby(["날짜", "지역"])["type"].agg(lambda t: str(list(t)))
+        .rename("재난유형_리스트")
+    )
+    alerts = totals.merge(types, left_on=["날짜", "지역"], right_index=True, how="left")
+    alerts["재난유형_리스트"] = alerts["재난유형_리스트"].fillna("[]")
+    alerts["날짜"] = alerts["날짜"].dt.strftime("%Y-%m-%d")
+    return alerts.sort_values(["날짜", "지역"]).reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="원본 재난문자 발송 기록을 시간 단위 발송 건수 테이블로 집계합니다.")
+    parser.add_argument("raw_paths", nargs="+", help="원본 파일(CSV/JSONL/Parquet) 또는 그런 파일이 든 폴더")
+    parser.add_argument("--table-dir", default=ALERTS_HOURLY_DIR, help="시간 단위 집계 테이블 디렉터리")
+    parser.add_argument("--alerts-out", help="alerts.csv 형식의 일별 테이블을 쓸 경로 (예: data/alerts.csv)")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="한 번에 읽을 행 수")
+    parser.add_argument("--format", choices=["csv", "jsonl", "parquet"], help="입력 형식 (기본: 확장자로 판단)")
+    parser.add_argument("--encoding", help="CSV/JSONL 인코딩 (예: cp949, 기본 UTF-8)")
+    parser.add_argument("--time-col", default=RAW_COLUMNS["time"], help="발송 시각 컬럼")
+    parser.add_argument("--text-col", default=RAW_COLUMNS["text"], help="문자 본문 컬럼")
+    parser.add_argument("--region-col", default=RAW_COLUMNS["region"], help="수신 지역 컬럼")
+    parser.add_argument("--authority-col", default=RAW_COLUMNS["authority"], help="발송 기관 컬럼 (수신 지역이 없을 때 사용)")
+    parser.add_argument("--rebuild", action="store_true", help="기존 테이블을 지우고 처음부터 다시 집계")
+    args = parser.parse_args(argv)
+
+    if args.rebuild and os.path.isdir(args.table_dir):
+        for name in os.listdir(args.table_dir):
+            if name == STATE_FILE or name.endswith(".parquet"):
+                os.remove(os.path.join(args.table_dir, name))
+    columns = {"time": args.time_col, "text": args.text_col, "region": args.region_col, "authority": args.authority_col}
+    update_hourly_table(args.raw_paths, args.table_dir, args.chunk_rows, columns, args.format, args.encoding)
+
+    if args.alerts_out:
+        alerts = daily_alerts(_read_counts(args.table_dir, _parts(_load_state(args.table_dir))))
+        os.makedirs(os.path.dirname(args.alerts_out) or ".", exist_ok=True)
+        alerts.to_csv(args.alerts_out, index=False)
+        print(f"일별 테이블 저장: {args.alerts_out} ({len(alerts):,}행)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,35 +1,85 @@
 import streamlit as st
+from utils.tracing import traced
 import pandas as pd
 import plotly.express as px
-import re
+import numpy as np
+from util import data_version
+from utils.panel import get_panel, panel_version, parse_type_list, ALERT_METRIC
+from utils.anomaly import get_alert_anomalies, anomalies_for
+from utils.downsample import downsample_series
+from utils.cache import budgeted_cache
+from message.ingest import hourly_table_version, load_hourly_alerts, TOTAL_TYPE
+
+
+@budgeted_cache(max_entries=2)
+def message_counts(version, _alerts):
+    """
+    연도별, (연도, 재난유형)별, (연도, 지역)별 발송 건수를 data 폴더 버전당 한 번만 계산합니다.
+    재난유형은 행 단위 반복 없이 explode로 펼치며, 원본 데이터프레임은 수정하지 않습니다.
+    """
+    data = pd.DataFrame({
+        '연도': pd.to_datetime(_alerts['날짜']).dt.year,
+        '지역': _alerts['지역'],
+        '재난문자_건수': _alerts['재난문자_건수'],
+        '재난유형_리스트': _alerts['재난유형_리스트'].map(parse_type_list),
+    })
+    expanded_data = data.explode('재난유형_리스트').dropna(subset=['재난유형_리스트'])
 
-def run_message(total_df):
+    yearly_counts = data.groupby('연도')['재난문자_건수'].sum().reset_index()
+    type_counts = expanded_data.groupby(['연도', '재난유형_리스트'])['재난문자_건수'].sum().reset_index()
+    region_counts = data.groupby(['연도', '지역'], observed=True)['재난문자_건수'].sum().reset_index()
+    return yearly_counts, type_counts, region_counts
 
-    # 📌 CSV 파일 불러오기
-    data = total_df["alerts"]
 
-    # 날짜 처리 및 연도 추출
-    data['연도'] = pd.to_datetime(data['날짜']).dt.year
+@budgeted_cache(max_entries=2)
+def hourly_profile(version):
+    """ 연도별, 시각(0~23시)별 발송 건수 (message.ingest로 만든 시간 단위 테이블 기준) """
+    hourly = load_hourly_alerts(version=version)
+    total = hourly[hourly['type'] == TOTAL_TYPE]
+    return total.groupby(
+        [total['hour'].dt.year.rename('연도'), total['hour'].dt.hour.rename('시각')]
+    )['count'].sum().rename('재난문자_건수').reset_index()
 
-    # 재난유형 분리 및 정제
-    data['재난유형_리스트'] = data['재난유형_리스트'].apply(lambda x: x.split(','))
 
-    expanded_rows = []
-    for index, row in data.iterrows():
-        for disaster_type in row['재난유형_리스트']:
-            disaster_type_cleaned = re.sub(r'[^가-힣a-zA-Z0-9\s]', '', disaster_type.strip())
-            expanded_rows.append({
-                '연도': row['연도'],
-                '재난유형_리스트': disaster_type_cleaned,
-                '재난문자_건수': row['재난문자_건수']
-            })
+# 버튼과 그 결과 그래프만 fragment로 묶어, 버튼을 눌러도 페이지 전체가 아니라 이 구역만 다시 실행됩니다.
+# fragment 재실행은 마지막 전체 실행에서 넘겨받은 연도별 집계를 그대로 씁니다.
+@st.fragment
+def top_types_section(filtered_detail, selected_year):
+    # 🔘 버튼: 탑 5 재난유형
+    if st.button('🔥 탑 5 재난유형 보기'):
+        st.session_state['show_top5'] = True
 
-    expanded_data = pd.DataFrame(expanded_rows)
+    # 🔸 탑 5 재난유형 그래프
+    if st.session_state['show_top5']:
+        top5 = filtered_detail.sort_values(by='재난문자_건수', ascending=False).head(5)
+        fig3 = px.bar(top5, x='재난유형_리스트', y='재난문자_건수',
+                      title=f'{selected_year}년 탑 5 재난유형',
+                      labels={'재난유형_리스트': '재난유형', '재난문자_건수': '문자 개수'},
+                      color='재난유형_리스트')
+        st.plotly_chart(fig3)
 
-    # 데이터 집계
-    yearly_counts = data.groupby('연도')['재난문자_건수'].sum().reset_index()
-    type_counts = expanded_data.groupby(['연도', '재난유형_리스트'])['재난문자_건수'].sum().reset_index()
-    region_counts = data.groupby(['연도', '지역'])['재난문자_건수'].sum().reset_index()
+
+@st.fragment
+def top_regions_section(filtered_region, selected_year):
+    # 🔘 버튼: 상위 3개 지역
+    if st.button('📍 상위 3개 지역 보기'):
+        st.session_state['show_top3'] = True
+
+    # 🔸 상위 3개 지역 그래프
+    if st.session_state['show_top3']:
+        top3_region = filtered_region.sort_values(by='재난문자_건수', ascending=False).head(3)
+        fig5 = px.bar(top3_region, x='재난문자_건수', y='지역', orientation='h',
+                      title=f'{selected_year}년 상위 3개 지역 재난문자 발송',
+                      labels={'재난문자_건수': '문자 개수', '지역': '지역'},
+                      color='지역')
+        st.plotly_chart(fig5)
+
+
+@traced()
+def run_message(total_df):
+
+    # 📌 데이터 집계 (data 폴더 버전당 한 번 계산)
+    yearly_counts, type_counts, region_counts = message_counts(data_version(), total_df["alerts"])
 
     # Streamlit 레이아웃
     st.title("📊 연도별 재난문자 발송 통계")
@@ -61,6 +111,32 @@ def run_message(total_df):
 
     st.plotly_chart(fig1)
 
+    # 🚨 일별 재난문자 급증 감지 (지역별 EWMA z-score, 데이터 버전당 증분 갱신)
+    version = panel_version()
+    panel = get_panel(version, total_df)
+    year_slice = panel.year_slice(selected_year)
+    daily_dates = panel.dates[year_slice]
+    daily_total = np.nansum(panel.view(ALERT_METRIC, year_slice), axis=1)
+    spikes = anomalies_for(get_alert_anomalies(version, panel), start=f"{selected_year}-01-01", end=f"{selected_year}-12-31")
+    spike_days = spikes.groupby("date").agg(
+        regions=("region", lambda r: ", ".join(r)), spike_count=("count", "sum")
+    ).reset_index()
+    spike_days["total"] = daily_total[daily_dates.get_indexer(spike_days["date"])]
+
+    line_x, line_y = downsample_series(daily_dates, daily_total)
+    fig_spike = px.line(x=line_x, y=line_y, title=f'{selected_year}년 일별 재난문자 발송 및 급증 감지',
+                        labels={'x': '날짜', 'y': '문자 발송 건수'})
+    fig_spike.add_scatter(x=spike_days['date'], y=spike_days['total'], mode='markers',
+                          marker=dict(size=9, color='red', symbol='triangle-up'), name='급증 감지',
+                          customdata=spike_days[['regions']],
+                          hovertemplate='%{x|%Y-%m-%d}<br>급증 지역: %{customdata[0]}<extra></extra>')
+    st.plotly_chart(fig_spike)
+    if not spikes.empty:
+        with st.expander(f"🚨 {selected_year}년 급증 감지 목록 ({len(spikes)}건)"):
+            st.dataframe(spikes.sort_values('date', ascending=False).rename(
+                columns={'date': '날짜', 'region': '지역', 'count': '문자 건수', 'z': 'z-score'}
+            ).drop(columns='type'), hide_index=True)
+
     # ✅ 재난유형별 막대 그래프 (상세보기 자동 출력)
     filtered_detail = type_counts[type_counts['연도'] == selected_year]
     fig2 = px.bar(filtered_detail, x='재난유형_리스트', y='재난문자_건수',
@@ -76,18 +152,7 @@ def run_message(total_df):
     if 'show_top3' not in st.session_state:
         st.session_state['show_top3'] = False
 
-    # 🔘 버튼: 탑 5 재난유형
-    if st.button('🔥 탑 5 재난유형 보기'):
-        st.session_state['show_top5'] = True
-
-    # 🔸 탑 5 재난유형 그래프
-    if st.session_state['show_top5']:
-        top5 = filtered_detail.sort_values(by='재난문자_건수', ascending=False).head(5)
-        fig3 = px.bar(top5, x='재난유형_리스트', y='재난문자_건수',
-                      title=f'{selected_year}년 탑 5 재난유형',
-                      labels={'재난유형_리스트': '재난유형', '재난문자_건수': '문자 개수'},
-                      color='재난유형_리스트')
-        st.plotly_chart(fig3)
+    top_types_section(filtered_detail, selected_year)
 
     # 🔸 도넛 차트: 지역별
     filtered_region = region_counts[region_counts['연도'] == selected_year]
@@ -96,15 +161,14 @@ def run_message(total_df):
                   hole=0.4)
     st.plotly_chart(fig4)
 
-    # 🔘 버튼: 상위 3개 지역
-    if st.button('📍 상위 3개 지역 보기'):
-        st.session_state['show_top3'] = True
-
-    # 🔸 상위 3개 지역 그래프
-    if st.session_state['show_top3']:
-        top3_region = filtered_region.sort_values(by='재난문자_건수', ascending=False).head(3)
-        fig5 = px.bar(top3_region, x='재난문자_건수', y='지역', orientation='h',
-                      title=f'{selected_year}년 상위 3개 지역 재난문자 발송',
-                      labels={'재난문자_건수': '문자 개수', '지역': '지역'},
-                      color='지역')
-        st.plotly_chart(fig5)
+    top_regions_section(filtered_region, selected_year)
+
+    # 🕐 시각별 발송 건수 (원본 재난문자 기록을 message.ingest로 집계한 테이블이 있을 때만 표시)
+    hourly_version = hourly_table_version()
+    if hourly_version is not None:
+        profile = hourly_profile(hourly_version)
+        year_profile = profile[profile['연도'] == selected_year].set_index('시각')['재난문자_건수'].reindex(range(24), fill_value=0)
+        fig6 = px.bar(x=year_profile.index, y=year_profile.values,
+                      title=f'{selected_year}년 시각별 재난문자 발송',
+                      labels={'x': '시각', 'y': '문자 개수'})
+        st.plotly_chart(fig6)
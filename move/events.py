@@ -0,0 +1,143 @@
+# events.py
+"""
+기상 데이터에서 지역별 기상 이변 사건을 찾아 재난문자 발송, 감정 반응 피크와 연결합니다.
+
+- 사건: 기상 지표가 기준값을 연속으로 넘은 구간 (threshold run)
+- 재난문자: 사건 시작 이후 같은 지역에 처음 발송된 관련 유형 문자 (merge_asof, forward)
+- 감정 피크: 재난문자 발송 이후 같은 지역에 처음 나타난 부정 감정 피크 (merge_asof, forward)
+모든 지역을 한 번에 정렬/결합하므로 데이터 크기에 대해 O(n log n)입니다.
+결과는 analysis.calculate_time_delays에 그대로 넘길 수 있는 형태입니다.
+"""
+import numpy as np
+import pandas as pd
+from utils.panel import parse_type_list
+from utils.regions import encode_regions
+
+# 사건 유형별 판정 기준 (기상청 특보 기준을 일 단위 자료에 맞춰 단순화)
+EVENT_RULES = {
+    "폭염": {"metric": "최고기온", "op": ">=", "threshold": 33.0, "min_duration": 2, "alert_types": ["폭염"]},
+    "한파": {"metric": "최저기온", "op": "<=", "threshold": -12.0, "min_duration": 2, "alert_types": ["한파"]},
+    "호우": {"metric": "강수량", "op": ">=", "threshold": 80.0, "min_duration": 1, "alert_types": ["호우", "홍수", "산사태"]},
+}
+ALERT_LINK_WINDOW = pd.Timedelta(days=3)   # 사건 시작 후 이 기간 안의 재난문자만 연결
+EMOTION_LINK_WINDOW = pd.Timedelta(days=7) # 재난문자 발송 후 이 기간 안의 감정 피크만 연결
+EMOTION_PEAK_WINDOW = 7                    # 감정 피크 판정용 중심 이동 구간 (행 수)
+EMOTION_PEAK_QUANTILE = 0.75               # 지역별 부정 감정 상위 25% 이상만 피크로 인정
+
+
+def detect_events(weather, rules=EVENT_RULES):
+    """
+    weather(날짜, 지역, 기상 지표)에서 사건 유형별 기준을 연속으로 만족한 구간을 찾습니다.
+    반환: region, event_type, start, end, duration, peak_value
+    """
+    weather = pd.DataFrame({
+        "time": pd.to_datetime(weather["날짜"]),
+        "region": encode_regions(weather["지역"]),
+        **{rule["metric"]: pd.to_numeric(weather[rule["metric"]], errors="coerce") for rule in rules.values()},
+    }).dropna(subset=["time", "region"]).sort_values(["region", "time"], kind="stable").reset_index(drop=True)
+
+    region_codes = weather["region"].cat.codes.to_numpy()
+    region_start = np.r_[True, region_codes[1:] != region_codes[:-1]]
+    events = []
+    for event_type, rule in rules.items():
+        values = weather[rule["metric"]].to_numpy()
+        if rule["op"] == ">=":
+            flag = values >= rule["threshold"]
+        else:
+            flag = values <= rule["threshold"]
+        # 지역이 바뀌거나 판정이 바뀌는 곳마다 새 구간을 시작
+        run_id = np.cumsum(region_start | np.r_[True, flag[1:] != flag[:-1]])
+        runs = pd.DataFrame({
+            "run": run_id[flag], "region": weather["region"].to_numpy()[flag],
+            "time": weather["time"].to_numpy()[flag], "value": values[flag],
+        })
+        if runs.empty:
+            continue
+        best = np.max if rule["op"] == ">=" else np.min
+        grouped = runs.groupby("run", sort=False).agg(
+            region=("region", "first"), start=("time", "min"), end=("time", "max"),
+            duration=("time", "size"), peak_value=("value", best),
+        )
+        grouped = grouped[grouped["duration"] >= rule["min_duration"]]
+        grouped.insert(1, "event_type", event_type)
+        events.append(grouped)
+
+    if not events:
+        return pd.DataFrame(columns=["region", "event_type", "start", "end", "duration", "peak_value"])
+    return pd.concat(events, ignore_index=True)
+
+
+def _alert_bursts(alerts, rules=EVENT_RULES):
+    """ 재난문자 행을 (지역, 사건 유형, 발송 시각) 단위로 펼칩니다. (사건 유형과 관련된 문자만) """
+    type_to_event = {t: event_type for event_type, rule in rules.items() for t in rule["alert_types"]}
+    bursts = pd.DataFrame({
+        "alert_time": pd.to_datetime(alerts["날짜"]),
+        "region": encode_regions(alerts["지역"]),
+        "alert_count": pd.to_numeric(alerts["재난문자_건수"], errors="coerce"),
+        "alert_type": alerts["재난유형_리스트"].map(parse_type_list),
+    }).explode("alert_type")
+    bursts["event_type"] = bursts["alert_type"].map(type_to_event)
+    bursts = bursts.dropna(subset=["alert_time", "region", "event_type"])
+    # 같은 날 같은 사건 유형으로 묶이는 문자(호우/홍수 등)는 하나의 발송으로 봄
+    return bursts.groupby(["region", "event_type", "alert_time"], observed=True, as_index=False)["alert_count"].max()
+
+
+def _emotion_peaks(emotion):
+    """ 지역별 부정 감정 시계열에서 중심 이동 구간의 최댓값이면서 상위 분위 이상인 지점을 찾습니다. """
+    emotion = pd.DataFrame({
+        "emotion_peak_time": pd.to_datetime(emotion["date"]),
+        "region": encode_regions(emotion["region"]),
+        "negative_emotion": pd.to_numeric(emotion["negative_emotion"], errors="coerce"),
+    }).dropna().sort_values(["region", "emotion_peak_time"]).reset_index(drop=True)
+    by_region = emotion.groupby("region", observed=True)["negative_emotion"]
+    local_max = by_region.transform(
+        lambda s: s.rolling(EMOTION_PEAK_WINDOW, center=True, min_periods=1).max()
+    )
+    high = by_region.transform(lambda s: s.quantile(EMOTION_PEAK_QUANTILE))
+    peaks = emotion[(emotion["negative_emotion"] >= local_max) & (emotion["negative_emotion"] >= high)]
+    return peaks.rename(columns={"negative_emotion": "peak_negative_emotion"})
+
+
+# link_events 반환 컬럼과 dtype (사건이 없을 때의 빈 결과도 같은 형식)
+LINKED_DTYPES = {
+    "event": object, "weather_time": "datetime64[ns]", "alert_time": "datetime64[ns]",
+    "emotion_peak_time": "datetime64[ns]", "peak_emotion": object, "region": object, "event_type": object,
+    "duration": "int64", "peak_value": "float64", "alert_count": "float64", "peak_negative_emotion": "float64",
+}
+
+
+def link_events(events, alerts, emotion, rules=EVENT_RULES):
+    """
+    사건마다 이후 첫 관련 재난문자와 그 이후 첫 부정 감정 피크를 연결합니다.
+    반환 컬럼은 calculate_time_delays 입력 형식(event, weather_time, alert_time, emotion_peak_time, peak_emotion)에
+    사건 정보(region, event_type, duration, peak_value, alert_count, peak_negative_emotion)를 더한 것입니다.
+    """
+    if events.empty:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in LINKED_DTYPES.items()})
+
+    linked = events.rename(columns={"start": "weather_time"}).sort_values("weather_time")
+    linked["region"] = linked["region"].astype(str)
+    bursts = _alert_bursts(alerts, rules).sort_values("alert_time")
+    bursts["region"] = bursts["region"].astype(str)
+    linked = pd.merge_asof(
+        linked, bursts, left_on="weather_time", right_on="alert_time",
+        by=["region", "event_type"], direction="forward", tolerance=ALERT_LINK_WINDOW
+    )
+    linked = linked.dropna(subset=["alert_time"]).sort_values("alert_time")
+
+    if emotion is not None and not emotion.empty:
+        peaks = _emotion_peaks(emotion).sort_values("emotion_peak_time")
+        peaks["region"] = peaks["region"].astype(str)
+        linked = pd.merge_asof(
+            linked, peaks, left_on="alert_time", right_on="emotion_peak_time",
+            by="region", direction="forward", tolerance=EMOTION_LINK_WINDOW
+        )
+    else:
+        linked["emotion_peak_time"] = pd.NaT
+        linked["peak_negative_emotion"] = np.nan
+
+    linked["event"] = (
+        linked["weather_time"].dt.strftime("%Y-%m-%d") + " " + linked["event_type"] + " " + linked["region"]
+    )
+    linked["peak_emotion"] = np.where(linked["emotion_peak_time"].notna(), "부정", None)
+    return linked.sort_values("weather_time")[list(LINKED_DTYPES)].reset_index(drop=True)
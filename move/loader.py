@@ -1,9 +1,13 @@
 import pandas as pd
 import os
+from SNS.emotion_series import emotion_table_version, load_emotion_table
+from utils.regions import encode_region_columns
 
 def load_all_data(total_df):
+    # total_df와 감정 테이블은 캐시에서 모든 세션이 공유하는 DataFrame이므로 복사본에서 컬럼을 바꿈
+
     # ✅ 재난문자 데이터 불러오기
-    alerts = total_df["alerts"]
+    alerts = total_df["alerts"].copy()
     alerts = alerts.rename(columns={
         "날짜": "date",
         "지역": "region",
@@ -15,7 +19,7 @@ def load_all_data(total_df):
     alerts_daily = alerts[["date", "region", "count", "type"]]  # 🔄 type 포함 유지
 
     # ✅ 기상청 데이터 불러오기
-    weather = total_df["weather"]
+    weather = total_df["weather"].copy()
     weather = weather.rename(columns={
         "날짜": "date",
         "평균기온": "temperature",
@@ -25,7 +29,14 @@ def load_all_data(total_df):
     weather["date"] = pd.to_datetime(weather["date"])
 
     # ✅ 감정 데이터 불러오기
-    emotion = total_df["emotion_sample"]
+    # KOTE 분석 결과로 만든 일별 지역 감정 테이블이 있으면 사용하고, 없으면 샘플 데이터를 사용
+    emotion_version = emotion_table_version()
+    if emotion_version is not None:
+        emotion = load_emotion_table(version=emotion_version)
+    else:
+        emotion = total_df["emotion_sample"]
+    emotion = emotion.copy()
+    encode_region_columns(emotion)
     emotion["date"] = pd.to_datetime(emotion["date"])
 
     return weather, alerts_daily, emotion
@@ -1,11 +1,36 @@
 import streamlit as st
+from utils.tracing import traced
 import pandas as pd
-from .loader import load_all_data
-from .processor import analyze_time_flow
+from .processor import time_flow_frames, start_flow_precompute
 from .visualizer import plot_time_series, plot_emotion_heatmap
 from .preprocessing import prepare_dataset
+from .events import EVENT_RULES
+from utils.panel import get_panel, panel_version, get_window_panel, store_panel_version
+from utils.downsample import date_window_slider
 import plotly.express as px
 
+FLOW_YEARS = (2023, 2024, 2025)
+FLOW_DISASTER_TYPES = ("전체", "폭염", "미세먼지", "호우", "한파", "기타")
+FLOW_REGIONS = ("전체", "서울특별시", "부산광역시", "경상남도", "제주특별자치도")
+FLOW_PRECOMPUTE = True # 데이터 버전마다 전체 필터 조합을 백그라운드에서 미리 계산
+
+
+def flow_panel(total_df, selected_year):
+    """
+    시계열 흐름 분석에 쓸 (캐시 키, 패널, 미리 계산할 연도)를 반환합니다.
+    파티션 저장소가 있으면 선택한 연도의 파티션만 읽어 만든 연도별 패널을, 없으면 공유 패널을 사용합니다.
+    (utils.warmup도 같은 키로 캐시를 채우도록 이 함수를 사용)
+    """
+    window_version = store_panel_version()
+    if window_version is not None:
+        panel = get_window_panel(window_version, f"{selected_year}-01-01", f"{selected_year}-12-31")
+        if panel is not None:
+            return f"{window_version}:{selected_year}", panel, (selected_year,)
+    version = panel_version()
+    return version, get_panel(version, total_df), FLOW_YEARS
+
+
+@traced()
 def run_move(total_df):
 
 
@@ -21,65 +46,39 @@ def run_move(total_df):
 
         with st.sidebar:
             st.header("🔍 필터 선택")
-            selected_year = st.selectbox("연도 선택", [2023, 2024, 2025])
-            disaster_type = st.selectbox("재난 유형 선택", ["전체", "폭염", "미세먼지", "호우", "한파", "기타"])
-            region_filter = st.selectbox("지역 선택", ["전체", "서울특별시", "부산광역시", "경상남도", "제주특별자치도"])
+            selected_year = st.selectbox("연도 선택", FLOW_YEARS)
+            disaster_type = st.selectbox("재난 유형 선택", FLOW_DISASTER_TYPES)
+            region_filter = st.selectbox("지역 선택", FLOW_REGIONS)
             show_emotion = st.checkbox("감정 데이터 포함", value=True)
 
         with st.spinner("데이터 불러오는 중..."):
-            weather_df, alert_df, emotion_df = load_all_data(total_df)
-
-        # ✅ 날짜 변환
-        weather_df["date"] = pd.to_datetime(weather_df["date"], errors="coerce")
-        alert_df["date"] = pd.to_datetime(alert_df["date"], errors="coerce")
-        if not emotion_df.empty:
-            emotion_df["date"] = pd.to_datetime(emotion_df["date"], errors="coerce")
-
-        # ✅ 연도 필터링
-        weather_df = weather_df[weather_df["date"].dt.year == selected_year]
-        alert_df = alert_df[alert_df["date"].dt.year == selected_year]
-        if show_emotion:
-            emotion_df = emotion_df[emotion_df["date"].dt.year == selected_year]
-
-        # ✅ 지역 필터링
-        if region_filter != "전체":
-            weather_df = weather_df[weather_df["region"] == region_filter]
-            alert_df = alert_df[alert_df["region"] == region_filter]
-            emotion_df = emotion_df[emotion_df["region"] == region_filter]
-
-        # ✅ 재난유형 필터링
-        if disaster_type != "전체" and "type" in alert_df.columns:
-            alert_df = alert_df[alert_df["type"].str.contains(disaster_type, na=False)]
-
-        # ✅ 기후 조건 설정
-        indicator_col = "temperature"
-        if disaster_type == "폭염":
-            weather_df = weather_df[weather_df["temperature"] >= 30]
-        elif disaster_type == "한파":
-            weather_df = weather_df[weather_df["temperature"] <= 0]
-        elif disaster_type == "미세먼지" and "pm10" in weather_df.columns:
-            weather_df = weather_df[weather_df["pm10"] >= 80]
-            indicator_col = "pm10"
-        elif disaster_type == "호우" and "rainfall" in weather_df.columns:
-            weather_df = weather_df[weather_df["rainfall"] >= 20]
-            indicator_col = "rainfall"
-
-        # ✅ 공통 날짜 필터링
-        common_dates = set(weather_df["date"]) & set(alert_df["date"])
-        weather_df = weather_df[weather_df["date"].isin(common_dates)]
-        alert_df = alert_df[alert_df["date"].isin(common_dates)]
-        emotion_df = emotion_df[emotion_df["date"].isin(common_dates)]
+            # 기상/재난문자/감정이 [날짜, 지역, 지표]로 정렬된 공유 패널 (데이터 버전당 한 번 구성)
+            # 파티션 저장소가 있으면 선택한 연도의 파티션만 읽어 만든 연도별 패널을 사용
+            version, panel, precompute_years = flow_panel(total_df, selected_year)
+            if FLOW_PRECOMPUTE:
+                start_flow_precompute(
+                    version, panel, precompute_years, FLOW_DISASTER_TYPES,
+                    tuple(None if r == "전체" else r for r in FLOW_REGIONS)
+                )
+
+        # ✅ 연도 / 지역 / 재난유형(기후 조건 포함) 필터링 결과는 선택 조합별로 캐시된 것을 사용
+        region = None if region_filter == "전체" else region_filter
+        flow_df, emotion_df = time_flow_frames(
+            version, panel, selected_year, disaster_type, region, include_emotion=show_emotion
+        )
+
+        # ✅ 확대 구간 선택: 선택한 기간만 원본에서 잘라 다시 다운샘플링
+        start, end = date_window_slider(flow_df["date"], key="move_window")
+        if start is not None:
+            flow_df = flow_df[(flow_df["date"] >= start) & (flow_df["date"] <= end)]
+            emotion_df = emotion_df[(emotion_df["date"] >= start) & (emotion_df["date"] <= end)]
 
         # ✅ 시각화
         st.header("📈 시간 흐름 분석")
-        if weather_df.empty or alert_df.empty:
+        if flow_df.empty:
             st.warning("⚠️ 선택한 조건에 해당하는 기후 및 재난문자 데이터가 없어 시계열 그래프를 표시할 수 없습니다.")
         else:
-            flow_df = analyze_time_flow(weather_df, alert_df, emotion_df, indicator_col)
-            if flow_df.empty:
-                st.warning("⚠️ 시계열 분석 결과가 없습니다. 조건을 다시 확인해주세요.")
-            else:
-                st.plotly_chart(plot_time_series(flow_df), use_container_width=True)
+            st.plotly_chart(plot_time_series(flow_df), use_container_width=True)
 
         st.header("📊 지역별 감정 반응")
         if emotion_df.empty:
@@ -96,7 +95,21 @@ def run_move(total_df):
         - 기후 현상 발생 → 재난 문자 발송 → 감정 반응까지 얼마나 걸렸는지를 시각적으로 분석합니다.
         """)
 
-        df = prepare_dataset()
+        df = prepare_dataset(total_df)
+
+        # ✅ 사건 유형 / 지역 필터링 (기상 데이터에서 찾은 실제 사건)
+        with st.sidebar:
+            st.header("🔍 사건 필터")
+            event_type = st.selectbox("사건 유형 선택", ["전체"] + list(EVENT_RULES))
+            event_regions = sorted(df["region"].unique())
+            event_region = st.selectbox("지역 선택", ["전체"] + event_regions)
+        if event_type != "전체":
+            df = df[df["event_type"] == event_type]
+        if event_region != "전체":
+            df = df[df["region"] == event_region]
+        if df.empty:
+            st.info("선택한 조건에 해당하는 사건이 없습니다.")
+            return
 
         # ✅ 긴 포맷으로 변환 (bar 시각화용)
         df_long = df.melt(
@@ -128,4 +141,4 @@ def run_move(total_df):
         st.dataframe(df.style.format({
             "alert_delay_min": "{:.0f}분",
             "emotion_delay_min": "{:.0f}분"
-        }))
+        }, na_rep="-"))
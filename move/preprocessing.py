@@ -1,6 +1,7 @@
 from .analysis import load_event_data, calculate_time_delays
+from utils.panel import panel_version
 
-def prepare_dataset():
-    raw_data = load_event_data()
+def prepare_dataset(total_df):
+    raw_data = load_event_data(panel_version(), total_df)
     processed_data = calculate_time_delays(raw_data)
     return processed_data
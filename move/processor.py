@@ -1,20 +1,129 @@
+import threading
+import numpy as np
 import pandas as pd
+import streamlit as st
+from utils.panel import ALERT_METRIC, alert_type_metric
+from utils.cache import budgeted_cache
 
-def analyze_time_flow(weather_df, alert_df, emotion_df, indicator_col="temperature"):
-    # ✅ 날짜 타입 명확히 통일
-    weather_df["date"] = pd.to_datetime(weather_df["date"], errors="coerce")
-    alert_df["date"] = pd.to_datetime(alert_df["date"], errors="coerce")
-    emotion_df["date"] = pd.to_datetime(emotion_df["date"], errors="coerce")
+FLOW_CACHE_MAX_ENTRIES = 256 # (데이터 버전, 연도, 재난 유형, 지역, 감정 포함 여부) 조합 최대 보관 수
+FLOW_CACHE_MAX_BYTES = 128 * 1024 * 1024
 
-    # ✅ 날짜 기준 병합
-    df = pd.merge(weather_df[["date", indicator_col]], alert_df[["date", "count"]], on="date", how="outer")
-    df = df.rename(columns={indicator_col: "climate", "count": "alerts"})
+# 재난 유형별 기후 조건: (지표, 비교, 기준값)
+CLIMATE_CONDITIONS = {
+    "폭염": ("평균기온", ">=", 30),
+    "한파": ("평균기온", "<=", 0),
+    "호우": ("강수량", ">=", 20),
+}
 
-    if not emotion_df.empty:
-        emotion_grouped = emotion_df.groupby("date")["negative_emotion"].mean().reset_index()
-        df = pd.merge(df, emotion_grouped, on="date", how="left")
+
+def select_flow_days(panel, year, disaster_type="전체", region=None):
+    """
+    공유 패널에서 (연도, 재난 유형, 지역) 조건에 맞는 날짜를 고르고 필요한 view를 반환합니다.
+    - 기후: 재난 유형의 기후 조건을 만족하는 (날짜, 지역) 칸
+    - 재난문자: 해당 유형(전체면 모든 유형)의 문자가 1건 이상 발송된 칸
+    두 조건을 모두 만족하는 지역이 있는 날짜만 남깁니다. (기존 공통 날짜 필터링)
+    """
+    dates = panel.year_slice(year)
+    regions = panel.region_slice(region)
+
+    indicator, op, threshold = CLIMATE_CONDITIONS.get(disaster_type, ("평균기온", None, None))
+    climate = panel.view(indicator, dates, regions)
+    climate_ok = panel.mask_view(indicator, dates, regions)
+    if op == ">=":
+        climate_ok = climate_ok & (np.nan_to_num(climate, nan=-np.inf) >= threshold)
+    elif op == "<=":
+        climate_ok = climate_ok & (np.nan_to_num(climate, nan=np.inf) <= threshold)
+
+    if disaster_type == "전체":
+        alert_metric = ALERT_METRIC
     else:
-        df["negative_emotion"] = None
+        alert_metric = alert_type_metric(disaster_type)
+    if panel.has_metric(alert_metric):
+        alerts = panel.view(alert_metric, dates, regions)
+        alert_ok = np.nan_to_num(alerts) > 0
+    else:
+        alerts = np.zeros(climate.shape)
+        alert_ok = np.zeros(climate.shape, dtype=bool)
+
+    day_ok = climate_ok.any(axis=1) & alert_ok.any(axis=1)
+    return {
+        "dates": panel.dates[dates][day_ok],
+        "day_ok": day_ok,
+        "climate": climate, "climate_ok": climate_ok,
+        "alerts": alerts, "alert_ok": alert_ok,
+        "date_slice": dates, "region_slice": regions,
+    }
+
+
+def _masked_mean(values, mask):
+    """ [날짜, 지역] 배열에서 mask가 True인 칸만 지역 평균을 냅니다. (해당 칸이 없으면 NaN) """
+    count = mask.sum(axis=1)
+    total = np.where(mask, np.nan_to_num(values), 0.0).sum(axis=1)
+    return np.divide(total, count, out=np.full(total.shape, np.nan), where=count > 0)
+
+
+def analyze_time_flow(panel, year, disaster_type="전체", region=None, include_emotion=True):
+    """
+    날짜별 기후 지표(조건을 만족한 지역 평균), 재난문자 건수(지역 합계), 부정 감정(지역 평균)을 반환합니다.
+    병합 없이 패널의 view에서 바로 집계합니다.
+    """
+    selected = select_flow_days(panel, year, disaster_type, region)
+    day_ok = selected["day_ok"]
+    climate = _masked_mean(selected["climate"], selected["climate_ok"])[day_ok]
+    alerts = np.where(selected["alert_ok"], selected["alerts"], 0.0).sum(axis=1)[day_ok]
 
-    df = df.sort_values("date")
+    df = pd.DataFrame({"date": selected["dates"], "climate": climate, "alerts": alerts})
+    if include_emotion:
+        negative = panel.view("negative_emotion", selected["date_slice"], selected["region_slice"])
+        negative_ok = panel.mask_view("negative_emotion", selected["date_slice"], selected["region_slice"])
+        df["negative_emotion"] = _masked_mean(negative, negative_ok)[day_ok]
+    else:
+        df["negative_emotion"] = None
     return df
+
+
+def emotion_flow(panel, year, disaster_type="전체", region=None):
+    """ 시간 흐름 분석과 같은 날짜에 대해 날짜별 긍정/중립/부정 감정 평균(지역 평균)을 반환합니다. """
+    selected = select_flow_days(panel, year, disaster_type, region)
+    day_ok = selected["day_ok"]
+    df = pd.DataFrame({"date": selected["dates"]})
+    for col in ["positive_emotion", "neutral_emotion", "negative_emotion"]:
+        values = panel.view(col, selected["date_slice"], selected["region_slice"])
+        mask = panel.mask_view(col, selected["date_slice"], selected["region_slice"])
+        df[col] = _masked_mean(values, mask)[day_ok]
+    return df.dropna(subset=["negative_emotion"]).reset_index(drop=True)
+
+
+@budgeted_cache(max_entries=FLOW_CACHE_MAX_ENTRIES, max_bytes=FLOW_CACHE_MAX_BYTES)
+def time_flow_frames(version, _panel, year, disaster_type="전체", region=None, include_emotion=True):
+    """
+    (데이터 버전, 연도, 재난 유형, 지역, 감정 포함 여부)별 (flow_df, emotion_df)를 반환합니다.
+    캐시에 있으면 pandas 연산 없이 그대로 반환하고, 없을 때만 패널에서 계산합니다.
+    모든 세션과 백그라운드 사전 계산 스레드가 공유하므로 반환된 DataFrame은 수정하지 않고 사용합니다.
+    """
+    return (
+        analyze_time_flow(_panel, year, disaster_type, region, include_emotion),
+        emotion_flow(_panel, year, disaster_type, region),
+    )
+
+
+def _precompute_flows(version, panel, years, disaster_types, regions):
+    for year in years:
+        for disaster_type in disaster_types:
+            for region in regions:
+                for include_emotion in (True, False):
+                    time_flow_frames(version, panel, year, disaster_type, region, include_emotion)
+
+
+@st.cache_resource(show_spinner=False)
+def start_flow_precompute(version, _panel, years, disaster_types, regions):
+    """
+    데이터 버전마다 한 번, 선택 가능한 전체 조합의 시간 흐름 분석 결과를 백그라운드 스레드에서 미리 계산합니다.
+    반환값은 진행 중인 백그라운드 스레드입니다.
+    """
+    thread = threading.Thread(
+        target=_precompute_flows, args=(version, _panel, years, disaster_types, regions),
+        daemon=True, name=f"move-flow-precompute-{version}"
+    )
+    thread.start()
+    return thread
@@ -1,20 +1,20 @@
 import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
+from utils.downsample import downsample_long, downsample_series, target_points
+from utils.tracing import traced
 
-def plot_time_series(df):
+@traced(rows=None)
+def plot_time_series(df, n_points=None):
     """
     기후 현상, 재난문자 시계열 그래프 (감정 반응 제외)
+    시리즈별로 차트 폭에 맞는 점 개수(n_points)까지 LTTB 다운샘플링해서 그립니다.
     """
-    df_long = df.melt(
-        id_vars="date",
-        value_vars=["climate", "alerts"],  # ✅ negative_emotion 제거
-        var_name="variable",
-        value_name="value"
+    df_long = downsample_long(
+        df.sort_values("date"), "date", ["climate", "alerts"],  # ✅ negative_emotion 제거
+        n_out=n_points or target_points()
     )
 
-    df_long["value"] = pd.to_numeric(df_long["value"], errors="coerce")
-
     fig = px.line(
         df_long,
         x="date",
@@ -44,9 +44,11 @@ def plot_time_series(df):
     return fig
 
 
-def plot_emotion_heatmap(emotion_df):
+@traced(rows=None)
+def plot_emotion_heatmap(emotion_df, n_points=None):
     """
     긍정/중립/부정 감정 반응 시계열 (7일 이동 평균 smoothing)
+    smoothing 후 차트 폭에 맞는 점 개수(n_points)까지 LTTB 다운샘플링해서 그립니다.
     """
     if emotion_df.empty:
         return go.Figure().update_layout(
@@ -63,21 +65,18 @@ def plot_emotion_heatmap(emotion_df):
     df["negative_smoothed"] = df["negative_emotion"].rolling(window=7, min_periods=1).mean()
 
     fig = go.Figure()
+    n_points = n_points or target_points()
 
-    fig.add_trace(go.Scatter(
-        x=df["date"], y=df["positive_smoothed"],
-        mode='lines', name="긍정 감정", line=dict(color="green")
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=df["date"], y=df["neutral_smoothed"],
-        mode='lines', name="중립 감정", line=dict(color="gray")
-    ))
-
-    fig.add_trace(go.Scatter(
-        x=df["date"], y=df["negative_smoothed"],
-        mode='lines', name="부정 감정", line=dict(color="red")
-    ))
+    for col, name, color in [
+        ("positive_smoothed", "긍정 감정", "green"),
+        ("neutral_smoothed", "중립 감정", "gray"),
+        ("negative_smoothed", "부정 감정", "red"),
+    ]:
+        x, y = downsample_series(df["date"].to_numpy(), df[col].to_numpy(dtype=float), n_points)
+        fig.add_trace(go.Scatter(
+            x=x, y=y,
+            mode='lines', name=name, line=dict(color=color)
+        ))
 
     fig.update_layout(
         title="📊 지역별 감정 반응 시계열",
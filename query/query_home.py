@@ -0,0 +1,69 @@
+import sqlite3
+import streamlit as st
+from utils.tracing import traced
+from utils.cache import budgeted_cache
+from utils.query_db import QUERY_MAX_ROWS, source_version, ensure_query_db, list_tables, run_sql
+
+DEFAULT_ROW_LIMIT = 1000
+
+# 예시 질의 (이름: SQL)
+# alert_types.day_alert_count는 그날의 전체 건수이므로 유형별 집계는 COUNT(*)(발생 일수)로 함
+EXAMPLE_QUERIES = {
+    "태풍 특보일 해안 지역의 유형별 재난문자 발생 일수": """SELECT t.type, t.region, COUNT(*) AS alert_days
+FROM alert_types AS t
+WHERE t.region IN ('부산광역시', '울산광역시', '경상남도', '전라남도', '제주특별자치도')
+  AND t.date IN (SELECT date FROM alert_types WHERE type = '태풍')
+GROUP BY t.type, t.region
+ORDER BY alert_days DESC""",
+    "호우 재난문자가 있는 날의 전체 재난문자 건수와 강수량": """SELECT a.date, a.region, a.day_alert_count, w.precipitation
+FROM alert_types AS a
+JOIN weather AS w ON w.date = a.date AND w.region = a.region
+WHERE a.type = '호우'
+ORDER BY a.date, a.region""",
+    "월별 재난문자 건수와 부정 감정": """SELECT substr(a.date, 1, 7) AS month, SUM(a.alert_count) AS alerts,
+       ROUND(AVG(e.negative_emotion), 3) AS negative_emotion
+FROM alerts AS a
+LEFT JOIN emotion AS e ON e.date = a.date AND e.region = a.region
+GROUP BY month
+ORDER BY month""",
+}
+
+
+@budgeted_cache(max_entries=2)
+def table_schema(version):
+    return list_tables()
+
+
+@traced()
+def run_query():
+    st.title("🧮 SQL 질의")
+    st.markdown("대시보드 데이터(재난문자, 기상, 감정, 댓글)에 SQL로 직접 질의합니다. 읽기 전용이며 결과는 캐시됩니다.")
+
+    # 원본 데이터가 바뀌었으면 DB를 다시 만듦 (버전당 한 번)
+    version = ensure_query_db(source_version())
+
+    with st.expander("📚 테이블 구조", expanded=False):
+        for name, columns in table_schema(version).items():
+            st.markdown(f"**{name}**: " + ", ".join(f"`{col}` {col_type}" for col, col_type in columns))
+
+    example = st.selectbox("예시 질의", ["직접 입력"] + list(EXAMPLE_QUERIES))
+    with st.form("sql_query"):
+        sql = st.text_area(
+            "SQL", value=EXAMPLE_QUERIES.get(example, "SELECT * FROM alerts LIMIT 10"), height=200, key=f"sql_{example}"
+        )
+        limit = st.number_input("최대 행 수", min_value=1, max_value=QUERY_MAX_ROWS, value=DEFAULT_ROW_LIMIT, step=100)
+        submitted = st.form_submit_button("실행")
+
+    if not submitted or not sql.strip():
+        return
+    try:
+        result, truncated, elapsed_ms = run_sql(version, sql.strip(), int(limit))
+    except sqlite3.Error as e:
+        st.error(f"질의 실패: {e}")
+        return
+
+    st.caption(f"{len(result):,}행 · 실행 {elapsed_ms:.1f}ms (캐시된 결과는 처음 실행 시간)")
+    if truncated:
+        st.warning(f"⚠️ 결과가 {int(limit):,}행을 넘어 앞의 {int(limit):,}행만 표시합니다.")
+    st.dataframe(result, hide_index=True, use_container_width=True)
+    st.download_button("CSV 다운로드", result.to_csv(index=False).encode("utf-8-sig"), "query_result.csv", "text/csv")
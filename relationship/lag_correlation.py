@@ -0,0 +1,100 @@
+# lag_correlation.py
+"""
+기상 요소와 재난문자 발송량 사이의 시차(lag) 상관계수를 전 지역, 전 시차에 대해 한 번에 계산합니다.
+
+lag = L 의 상관계수는 "L일 전 기상 값"과 "오늘 재난문자 건수"의 Pearson 상관계수입니다.
+결측값이 있어도 되도록 (값 * 마스크) 시계열들의 교차상관을 FFT로 구해
+유효한 쌍의 개수와 합, 제곱합, 곱의 합을 모든 시차에 대해 동시에 계산합니다.
+"""
+import numpy as np
+import pandas as pd
+from utils.panel import WEATHER_METRICS, ALERT_METRIC
+from utils.cache import budgeted_cache
+
+WEATHER_COLUMNS = WEATHER_METRICS
+MAX_LAG_DAYS = 14
+MIN_PERIODS = 30 # 유효한 (기상, 재난문자) 쌍이 이보다 적으면 상관계수를 계산하지 않음
+
+
+def _cross_sums(a, b, max_lag, n_fft):
+    """ 시간축(0번 축) 기준 교차상관 sum_t a[t] * b[t + L] 을 L = 0..max_lag 에 대해 계산합니다. """
+    fa = np.fft.rfft(a, n=n_fft, axis=0)
+    fb = np.fft.rfft(b, n=n_fft, axis=0)
+    return np.fft.irfft(np.conj(fa) * fb, n=n_fft, axis=0)[:max_lag + 1]
+
+
+def lagged_correlation(x, y, max_lag=MAX_LAG_DAYS, min_periods=MIN_PERIODS):
+    """
+    x: [날짜, 지역, 변수] 기상 배열, y: [날짜, 지역] 재난문자 배열 (NaN은 결측)
+    반환: (corr, pairs) 각각 [변수, 지역, 시차] 배열
+      - corr[v, r, L]: 지역 r에서 L일 전 변수 v와 당일 재난문자 건수의 상관계수
+      - pairs[v, r, L]: 계산에 사용된 유효한 쌍의 개수
+    """
+    n_dates = x.shape[0]
+    max_lag = min(max_lag, n_dates - 1)
+    n_fft = 1 << int(np.ceil(np.log2(n_dates + max_lag + 1)))
+
+    mx = (~np.isnan(x)).astype(float)
+    my = (~np.isnan(y)).astype(float)[:, :, None]
+    x = np.nan_to_num(x)
+    y = np.nan_to_num(y)[:, :, None]
+    # 지역별로 평균을 빼서 FFT 반올림 오차로 인한 자릿수 손실을 줄입니다. (결측 칸은 0)
+    xc = (x - x.sum(axis=0) / np.maximum(mx.sum(axis=0), 1)) * mx
+    yc = (y - y.sum(axis=0) / np.maximum(my.sum(axis=0), 1)) * my
+
+    n = _cross_sums(mx, my, max_lag, n_fft)
+    sx = _cross_sums(xc, my, max_lag, n_fft)
+    sxx = _cross_sums(xc * xc, my, max_lag, n_fft)
+    sy = _cross_sums(mx, yc, max_lag, n_fft)
+    syy = _cross_sums(mx, yc * yc, max_lag, n_fft)
+    sxy = _cross_sums(xc, yc, max_lag, n_fft)
+
+    n = np.rint(n)
+    cov = n * sxy - sx * sy
+    var_x = n * sxx - sx * sx
+    var_y = n * syy - sy * sy
+    denom = np.sqrt(np.clip(var_x, 0, None) * np.clip(var_y, 0, None))
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = np.where((n >= min_periods) & (denom > 1e-9 * np.maximum(n, 1) ** 2), cov / denom, np.nan)
+    corr = np.clip(corr, -1.0, 1.0)
+
+    # [시차, 지역, 변수] -> [변수, 지역, 시차]
+    return corr.transpose(2, 1, 0), n.astype(int).transpose(2, 1, 0)
+
+
+@budgeted_cache(max_entries=2, show_spinner="시차 상관계수 계산 중...")
+def compute_lag_correlations(version, _panel, max_lag=MAX_LAG_DAYS):
+    """
+    공유 패널(utils.panel)에서 전 지역, 0..max_lag 일 시차 상관계수를 한 번에 계산합니다.
+    version(panel_version)이 바뀔 때만 다시 계산하며, 지역/변수 선택은 결과 배열을 잘라 씁니다.
+    반환: {"corr": [변수, 지역, 시차], "pairs": 같은 형태, "variables", "regions", "lags"}
+    """
+    weather = np.stack([_panel.view(col) for col in WEATHER_COLUMNS], axis=2)
+    corr, pairs = lagged_correlation(weather, _panel.view(ALERT_METRIC), max_lag)
+    return {
+        "corr": corr,
+        "pairs": pairs,
+        "variables": list(WEATHER_COLUMNS),
+        "regions": list(_panel.regions),
+        "lags": list(range(corr.shape[2])),
+    }
+
+
+def lag_table(result, variable):
+    """ 변수 하나에 대한 지역 x 시차 상관계수 표를 반환합니다. (데이터가 없는 지역 제외) """
+    table = pd.DataFrame(
+        result["corr"][result["variables"].index(variable)],
+        index=result["regions"], columns=result["lags"]
+    )
+    table.columns.name = "시차(일)"
+    return table.dropna(how="all")
+
+
+def peak_lags(result, variable):
+    """ 지역별로 상관계수 절댓값이 가장 큰 시차와 그 값을 반환합니다. """
+    table = lag_table(result, variable)
+    best = table.abs().idxmax(axis=1)
+    return pd.DataFrame({
+        "최대 상관 시차(일)": best,
+        "상관계수": [table.loc[region, lag] for region, lag in best.items()],
+    })
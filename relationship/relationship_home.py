@@ -1,4 +1,5 @@
 import streamlit as st
+from utils.tracing import traced
 import pandas as pd
 from streamlit_option_menu import option_menu
 import os
@@ -7,7 +8,12 @@ import seaborn as sns
 import platform
 import matplotlib
 import matplotlib.font_manager as fm
+from utils.panel import get_panel, panel_version
+from utils.downsample import date_window_slider, downsample_series, target_points
+from utils.anomaly import get_alert_anomalies, anomalies_for
+from .lag_correlation import WEATHER_COLUMNS, compute_lag_correlations, lag_table, peak_lags
 
+@traced()
 def run_relationship(total_df):
 
      # ✅ 사용자 폰트 경로 지정 (예: relationship 폴더 내부 NanumGothic-Regular.ttf)
@@ -28,51 +34,68 @@ def run_relationship(total_df):
 
     matplotlib.rcParams['axes.unicode_minus'] = False
 
-    # 데이터 로드
-    @st.cache_data
-    def load():
-        weather_df = total_df["weather"]
-        alert_df = total_df["alerts"]
-
-        # 지역명 통일
-        alert_df["지역"] = alert_df["지역"].replace({
-            "강원특별자치도": "강원도"
-        })
-
-        # 날짜 포맷 통일
-        weather_df["날짜"] = pd.to_datetime(weather_df["날짜"])
-        alert_df["날짜"] = pd.to_datetime(alert_df["날짜"])
-
-        # 날짜 + 지역 기준으로 병합
-        merged = pd.merge(weather_df, alert_df, on=["날짜", "지역"], how="left")
-        merged["재난문자_건수"] = merged["재난문자_건수"].fillna(0)
-        return merged
-
-    df = load()
+    # 데이터 로드: 기상/재난문자가 [날짜, 지역, 지표]로 정렬된 공유 패널 (데이터 버전당 한 번 구성)
+    version = panel_version()
+    panel = get_panel(version, total_df)
 
     st.title("📊 지역별 기상 데이터와 재난 문자 발송량 상관관계 대시보드")
 
-    # 지역 선택
-    region = st.selectbox("지역을 선택하세요", sorted(df["지역"].unique()))
-    region_df = df[df["지역"] == region]
-
-    # 상관계수 분석
-    correlation = region_df[["최고기온", "최저기온", "평균기온", "강수량", "재난문자_건수"]].corr()
+    # 전 지역, 전 시차 상관계수는 데이터 버전당 한 번만 계산 (선택 변경 시에는 결과만 잘라 씀)
+    lag_result = compute_lag_correlations(version, panel)
+
+    # 시차 상관계수 분석 (지역 x 시차)
+    st.subheader("🕒 기상 요소가 며칠 뒤 재난문자 발송량과 가장 관련이 깊은가")
+    variable = st.selectbox("기상 요소를 선택하세요", WEATHER_COLUMNS, index=WEATHER_COLUMNS.index("강수량"))
+    table = lag_table(lag_result, variable)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    sns.heatmap(table, annot=True, fmt=".2f", cmap="coolwarm", vmin=-1, vmax=1, ax=ax, annot_kws={"size": 7})
+    ax.set_xlabel("시차(일): N일 전 기상 값과 당일 재난문자 건수")
+    ax.set_ylabel("")
+    st.pyplot(fig)
+    with st.expander("지역별 최대 상관 시차"):
+        st.dataframe(peak_lags(lag_result, variable).style.format({"상관계수": "{:.3f}"}))
 
-    st.subheader(f"🔍 {region}의 기상 요소와 재난문자 발송 상관관계")
-    fig, ax = plt.subplots(figsize=(6, 4))
-    sns.heatmap(correlation, annot=True, cmap="coolwarm", ax=ax)
+    # 지역 선택
+    weather_regions = [r for r, has_data in zip(panel.regions, panel.mask_view("평균기온").any(axis=0)) if has_data]
+    region = st.selectbox("지역을 선택하세요", sorted(weather_regions))
+    region_slice = panel.region_slice(region)
+    weather_days = panel.mask_view("평균기온", regions=region_slice)[:, 0]
+
+    # 선택한 지역의 기상 요소별 시차 상관계수 (계산된 결과에서 해당 지역만 사용)
+    st.subheader(f"🔍 {region}의 기상 요소와 재난문자 발송 시차 상관관계")
+    region_table = pd.DataFrame(
+        {v: lag_table(lag_result, v).reindex([region]).iloc[0] for v in WEATHER_COLUMNS}
+    ).T
+    fig, ax = plt.subplots(figsize=(10, 3))
+    sns.heatmap(region_table, annot=True, fmt=".2f", cmap="coolwarm", vmin=-1, vmax=1, ax=ax, annot_kws={"size": 7})
+    ax.set_xlabel("시차(일)")
     st.pyplot(fig)
 
-    # 📈 선 그래프
+    # 📈 선 그래프 (선택한 기간만 잘라서 차트 폭에 맞게 다운샘플링)
     st.subheader(f"📈 {region}의 기상 변화 및 재난문자 발송 추이")
+    start, end = date_window_slider(panel.dates[weather_days], key="relationship_window")
+    window = panel.date_slice(start, end)
+    window_days = weather_days[window]
+    window_dates = panel.dates[window][window_days]
+    n_points = target_points(12 * 100) # figsize 12인치 x 100dpi
+    temp_x, temp_y = downsample_series(
+        window_dates, panel.view("평균기온", window, region_slice)[window_days, 0], n_points
+    )
+    alert_x, alert_y = downsample_series(
+        window_dates, panel.view("재난문자_건수", window, region_slice)[window_days, 0], n_points, method="minmax"
+    )
     fig2, ax2 = plt.subplots(figsize=(12, 5))
-    ax2.plot(region_df["날짜"], region_df["평균기온"], label="평균기온 (°C)", color="orange")
+    ax2.plot(temp_x, temp_y, label="평균기온 (°C)", color="orange")
     ax2.set_ylabel("평균기온 (°C)", color="orange")
     ax2.tick_params(axis='y', labelcolor="orange")
 
     ax3 = ax2.twinx()
-    ax3.plot(region_df["날짜"], region_df["재난문자_건수"], label="재난문자 건수", color="blue")
+    ax3.plot(alert_x, alert_y, label="재난문자 건수", color="blue")
+    # 재난문자 급증 감지 결과 표시 (EWMA z-score, 데이터 버전당 증분 갱신)
+    spikes = anomalies_for(get_alert_anomalies(version, panel), region=region, start=start, end=end)
+    if not spikes.empty:
+        ax3.scatter(spikes["date"], spikes["count"], color="red", marker="^", zorder=3, label="급증 감지")
+        ax3.legend(loc="upper right")
     ax3.set_ylabel("재난문자 건수", color="blue")
     ax3.tick_params(axis='y', labelcolor="blue")
 
@@ -0,0 +1,159 @@
+# tests/test_download_model.py
+"""
+모델 다운로더(utils.download_model.download_file)를 로컬 HTTP 서버에 대해 확인합니다.
+(병렬 Range 다운로드, 이어받기, SHA-256 검증, Range 미지원 서버, lock)
+
+    python -m pytest tests
+"""
+import os
+import re
+import json
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import utils.download_model as download_model
+from utils.download_model import download_file, DownloadError, _FileLock
+
+CHUNK_SIZE = 4096
+PAYLOAD = os.urandom(CHUNK_SIZE * 5 + 123) # 마지막 구간은 CHUNK_SIZE보다 짧음
+PAYLOAD_SHA256 = hashlib.sha256(PAYLOAD).hexdigest()
+_RANGE_PATTERN = re.compile(r"bytes=(\d+)-(\d+)")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """ PAYLOAD를 내려주는 핸들러. server.accept_ranges가 False면 Range 헤더를 무시합니다. """
+
+    def _send_headers(self, status, length, extra=None):
+        self.send_response(status)
+        self.send_header("Content-Length", str(length))
+        if self.server.accept_ranges:
+            self.send_header("Accept-Ranges", "bytes")
+        for name, value in (extra or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def do_HEAD(self):
+        self.server.requests.append(("HEAD", None))
+        self._send_headers(200, len(PAYLOAD))
+
+    def do_GET(self):
+        match = _RANGE_PATTERN.match(self.headers.get("Range", ""))
+        if match and self.server.accept_ranges:
+            start, end = int(match.group(1)), min(int(match.group(2)), len(PAYLOAD) - 1)
+            self.server.requests.append(("GET", (start, end)))
+            self._send_headers(206, end - start + 1, {"Content-Range": f"bytes {start}-{end}/{len(PAYLOAD)}"})
+            self.wfile.write(PAYLOAD[start:end + 1])
+        else:
+            self.server.requests.append(("GET", None))
+            self._send_headers(200, len(PAYLOAD))
+            self.wfile.write(PAYLOAD)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.accept_ranges = True
+    httpd.requests = []
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}/model.bin"
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(download_model, "CHUNK_SIZE", CHUNK_SIZE)
+
+
+def _ranges(server):
+    return sorted(r for method, r in server.requests if method == "GET" and r is not None)
+
+
+def _leftovers(save_path):
+    return [path for path in (f"{save_path}.part", f"{save_path}.part.json", f"{save_path}.lock") if os.path.exists(path)]
+
+
+def test_parallel_download_matches_sha256(server, tmp_path):
+    save_path = str(tmp_path / "model.bin")
+    assert download_file(server.url, save_path, expected_sha256=PAYLOAD_SHA256, max_workers=3) == save_path
+
+    with open(save_path, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert len(_ranges(server)) == 6
+    assert _leftovers(save_path) == []
+    with open(f"{save_path}.sha256", encoding="utf-8") as f:
+        assert json.load(f) == {"sha256": PAYLOAD_SHA256, "size": len(PAYLOAD)}
+
+    # 검증 기록이 있으면 다시 받지 않음 (네트워크 요청 없음)
+    server.requests.clear()
+    download_file(server.url, save_path, expected_sha256=PAYLOAD_SHA256)
+    assert server.requests == []
+
+
+def test_resume_fetches_only_missing_chunks(server, tmp_path):
+    save_path = str(tmp_path / "model.bin")
+    part_path = f"{save_path}.part"
+    # 0, 2번 구간까지 받은 뒤 중단된 상태
+    with open(part_path, "wb") as f:
+        f.truncate(len(PAYLOAD))
+        for index in (0, 2):
+            f.seek(index * CHUNK_SIZE)
+            f.write(PAYLOAD[index * CHUNK_SIZE:(index + 1) * CHUNK_SIZE])
+    with open(f"{part_path}.json", "w", encoding="utf-8") as f:
+        json.dump({"size": len(PAYLOAD), "chunk_size": CHUNK_SIZE, "done": [0, 2]}, f)
+
+    download_file(server.url, save_path, expected_sha256=PAYLOAD_SHA256)
+
+    with open(save_path, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert [start // CHUNK_SIZE for start, _ in _ranges(server)] == [1, 3, 4, 5]
+    assert _leftovers(save_path) == []
+
+
+def test_hash_mismatch_leaves_no_final_file(server, tmp_path):
+    save_path = str(tmp_path / "model.bin")
+    with pytest.raises(DownloadError):
+        download_file(server.url, save_path, expected_sha256="0" * 64)
+
+    assert not os.path.exists(save_path)
+    assert not os.path.exists(f"{save_path}.sha256")
+    assert _leftovers(save_path) == []
+
+
+def test_falls_back_to_single_stream_without_range_support(server, tmp_path):
+    server.accept_ranges = False
+    save_path = str(tmp_path / "model.bin")
+    download_file(server.url, save_path, expected_sha256=PAYLOAD_SHA256)
+
+    with open(save_path, "rb") as f:
+        assert f.read() == PAYLOAD
+    assert server.requests == [("HEAD", None), ("GET", None)]
+    assert _leftovers(save_path) == []
+
+
+def test_waits_for_lock_and_reuses_file_finished_by_holder(server, tmp_path):
+    save_path = str(tmp_path / "model.bin")
+    result = {}
+
+    with _FileLock(f"{save_path}.lock"):
+        worker = threading.Thread(target=lambda: result.update(path=download_file(server.url, save_path)))
+        worker.start()
+        worker.join(timeout=1.5)
+        assert worker.is_alive() # lock을 가진 쪽이 끝날 때까지 기다림
+        assert server.requests == []
+        # lock을 가진 다른 프로세스가 다운로드를 끝낸 상태를 만듦
+        with open(save_path, "wb") as f:
+            f.write(PAYLOAD)
+        with open(f"{save_path}.sha256", "w", encoding="utf-8") as f:
+            json.dump({"sha256": PAYLOAD_SHA256, "size": len(PAYLOAD)}, f)
+
+    worker.join(timeout=10)
+    assert result["path"] == save_path
+    assert server.requests == [] # 기다린 뒤 검증된 파일을 확인하고 다시 받지 않음
+    assert not os.path.exists(f"{save_path}.lock")
@@ -0,0 +1,93 @@
+# tests/test_query_db.py
+"""
+SQL 질의 페이지(utils.query_db.run_sql)가 조회 외의 문장을 거부하는지,
+재난 유형 테이블과 예시 질의가 유형별 건수를 중복 집계하지 않는지 확인합니다.
+
+    python -m pytest tests
+"""
+import sqlite3
+import pytest
+from utils.query_db import run_sql, SCHEMA, _load_alerts
+from query.query_home import EXAMPLE_QUERIES
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "query.sqlite"
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE alerts (date TEXT, region TEXT, alert_count INTEGER)")
+    conn.executemany("INSERT INTO alerts VALUES (?, ?, ?)", [
+        ("2023-09-01", "부산광역시", 3), ("2023-09-02", "경상남도", 1),
+    ])
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def test_select_is_allowed(db_path):
+    result, truncated, _ = run_sql("test", "SELECT region, SUM(alert_count) AS n FROM alerts GROUP BY region", 10,
+                                   db_path=db_path)
+    assert sorted(result["region"]) == ["경상남도", "부산광역시"]
+    assert not truncated
+
+
+def test_row_limit(db_path):
+    result, truncated, _ = run_sql("test", "SELECT * FROM alerts", 1, db_path=db_path)
+    assert len(result) == 1
+    assert truncated
+
+
+@pytest.mark.parametrize("sql", [
+    "ATTACH '{target}' AS x",
+    "VACUUM INTO '{target}'",
+    "PRAGMA table_info('alerts')",
+    "DELETE FROM alerts",
+    "CREATE TABLE t (x)",
+])
+def test_unsafe_statements_are_denied(db_path, tmp_path, sql):
+    target = tmp_path / "leak.sqlite"
+    with pytest.raises(sqlite3.DatabaseError):
+        run_sql("test", sql.format(target=target), 10, db_path=db_path)
+    assert not target.exists()
+    # 원본 DB는 그대로
+    result, _, _ = run_sql("test", "SELECT COUNT(*) AS n FROM alerts", 10, db_path=db_path)
+    assert result["n"][0] == 2
+
+
+@pytest.fixture
+def alerts_db(tmp_path):
+    csv_path = tmp_path / "alerts.csv"
+    csv_path.write_text(
+        "날짜,지역,재난문자_건수,재난유형_리스트\n"
+        "2023-08-10,부산광역시,5,\"['태풍', '호우']\"\n"
+        "2023-08-11,부산광역시,2,\"['호우']\"\n",
+        encoding="utf-8"
+    )
+    path = tmp_path / "alerts.sqlite"
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+    _load_alerts(conn, str(csv_path))
+    conn.commit()
+    conn.close()
+    return str(path)
+
+
+def test_alert_types_keeps_day_total_separate(alerts_db):
+    result, _, _ = run_sql("test", "SELECT type, COUNT(*) AS days, SUM(day_alert_count) AS day_total "
+                                   "FROM alert_types GROUP BY type ORDER BY type", 10, db_path=alerts_db)
+    assert result.to_dict("records") == [
+        {"type": "태풍", "days": 1, "day_total": 5}, {"type": "호우", "days": 2, "day_total": 7},
+    ]
+    # 유형별 행의 합이 아니라 alerts 테이블이 전체 건수
+    result, _, _ = run_sql("test", "SELECT SUM(alert_count) AS n FROM alerts", 10, db_path=alerts_db)
+    assert result["n"][0] == 7
+
+
+@pytest.mark.parametrize("name", list(EXAMPLE_QUERIES))
+def test_example_queries_run(alerts_db, name):
+    run_sql("test", EXAMPLE_QUERIES[name], 10, db_path=alerts_db)
+
+
+def test_typhoon_example_counts_days(alerts_db):
+    result, _, _ = run_sql("test", EXAMPLE_QUERIES["태풍 특보일 해안 지역의 유형별 재난문자 발생 일수"], 10, db_path=alerts_db)
+    assert sorted(result["alert_days"]) == [1, 1]
@@ -0,0 +1,103 @@
+# tests/test_snapshot.py
+"""
+스냅샷 복원(SNS.snapshot.restore_snapshot)이 manifest만 읽고, 테이블은 탭이 조회할 때 필요한 컬럼만 읽는지 확인합니다.
+
+    python -m pytest tests
+"""
+import pandas as pd
+import pytest
+import SNS.snapshot as snapshot
+import SNS.result_store as result_store
+from SNS.config import LABELS
+
+TABLE_METHODS = ["comments", "probabilities", "keyword_index", "videos"]
+
+
+@pytest.fixture
+def saved_snapshot(tmp_path):
+    comments = pd.DataFrame({
+        "video_id": ["v1", "v1", "v2"],
+        "video_title": ["영상1", "영상1", "영상2"],
+        "comment_id": ["c1", "c2", "c3"],
+        "text": ["태풍이 온다", "무섭다", "비가 많이 온다"],
+        "author": ["a", "b", "c"],
+        "published_at": pd.to_datetime(["2023-08-10 09:00", "2023-08-10 10:00", "2023-08-11 11:00"]),
+        "like_count": [1, 0, 3],
+        "disaster_labels": [["태풍"], [], ["호우"]],
+        "sentiment_labels": [[LABELS[0]], [LABELS[1]], []],
+    })
+    comments["comment_hour"] = comments["published_at"].dt.hour
+    probabilities = pd.DataFrame([[0.1] * len(LABELS)] * 3, columns=LABELS)
+    probabilities.insert(0, "comment_id", comments["comment_id"])
+    keyword_index = pd.DataFrame({"comment_id": ["c1", "c3"], "keyword": ["태풍", "비"]})
+    path = snapshot.save_snapshot(
+        "test", "result-key", comments, probabilities, keyword_index,
+        [{"id": "v1", "title": "영상1"}, {"id": "v2", "title": "영상2"}], snapshot_dir=str(tmp_path / "snapshots")
+    )
+    return path, comments
+
+
+@pytest.fixture
+def table_reads(monkeypatch):
+    """ Snapshot의 테이블 읽기 메서드 호출을 (메서드 이름, 인자) 목록으로 기록합니다. """
+    reads = []
+    for name in TABLE_METHODS:
+        original = getattr(snapshot.Snapshot, name)
+
+        def recording(self, *args, _name=name, _original=original, **kwargs):
+            reads.append((_name, args, kwargs))
+            return _original(self, *args, **kwargs)
+        monkeypatch.setattr(snapshot.Snapshot, name, recording)
+    return reads
+
+
+def make_store(tmp_path):
+    return result_store.AnalysisResultStore(memory_budget_bytes=64 * 1024 * 1024, spill_dir=str(tmp_path / "spill"))
+
+
+def test_restore_reads_only_manifest(saved_snapshot, table_reads, tmp_path):
+    path, _ = saved_snapshot
+    store = make_store(tmp_path)
+    handle = snapshot.restore_snapshot(snapshot.Snapshot(path), store)
+
+    assert handle == "result-key"
+    assert handle in store
+    assert result_store.keywords_key(handle) in store
+    assert table_reads == []
+    assert store.memory_bytes == 0
+
+
+def test_tabs_read_requested_columns_on_access(saved_snapshot, table_reads, tmp_path):
+    path, comments = saved_snapshot
+    store = make_store(tmp_path)
+    handle = snapshot.restore_snapshot(snapshot.Snapshot(path), store)
+
+    df = store.get(handle, columns=["comment_id", "sentiment_bits"])
+    assert list(df.columns) == ["comment_id", "sentiment_labels"]
+    assert df.set_index("comment_id")["sentiment_labels"].to_dict() == \
+        comments.set_index("comment_id")["sentiment_labels"].to_dict()
+    assert [name for name, _, _ in table_reads] == ["comments"]
+
+    # 이미 읽은 컬럼은 다시 읽지 않고, 없는 컬럼만 읽어 붙임
+    df = store.get(handle, columns=["comment_id", "text", "author"])
+    assert list(df.columns) == ["comment_id", "text", "author"]
+    assert df["text"].tolist() == comments.sort_values("video_id")["text"].tolist()
+    assert table_reads[-1] == ("comments", (), {"columns": ["text", "author"]})
+    store.get(handle, columns=["comment_id", "text"])
+    assert len(table_reads) == 2
+
+    # 키워드 색인과 확률 행렬은 조회할 때 처음 읽음
+    assert store.get_table(result_store.keywords_key(handle))["keyword"].tolist() == ["태풍", "비"]
+    assert "probabilities" not in [name for name, _, _ in table_reads]
+    assert list(store.get_table(result_store.probabilities_key(handle)).columns) == ["comment_id"] + list(LABELS)
+
+
+def test_full_read_after_partial_read(saved_snapshot, tmp_path):
+    path, comments = saved_snapshot
+    store = make_store(tmp_path)
+    handle = snapshot.restore_snapshot(snapshot.Snapshot(path), store)
+
+    store.get(handle, columns=["comment_id"])
+    df = store.get(handle)
+    assert set(df.columns) == set(comments.columns)
+    assert len(df) == len(comments)
@@ -1,18 +1,59 @@
 import os
+import hashlib
+from collections.abc import Mapping
 import pandas as pd
 import streamlit as st
+from utils.regions import encode_region_columns
+from utils.tracing import span
+from utils.cache import budgeted_cache
 
-@st.cache_data
+DATA_FOLDER = "data/"
+
+# 키는 data 폴더 버전이므로 CSV가 바뀌면 다시 읽고, 이전 버전은 곧 내보내집니다.
+@budgeted_cache(key=lambda: data_version(), max_entries=2)
 def load_data():
-    folder_path = "data/"
+    folder_path = DATA_FOLDER
     data_dict = {}
 
     for file in os.listdir(folder_path):
         if file.endswith(".csv"):
             file_path = os.path.join(folder_path, file)
-            df = pd.read_csv(file_path)
+            with span("read_csv", file=file) as s:
+                df = pd.read_csv(file_path)
+                s.set(rows=len(df))
+            # 지역 컬럼은 로드 시 한 번만 공통 지역 코드(범주형)로 변환
+            with span("encode_regions", file=file):
+                encode_region_columns(df, source=file)
             # 파일 확장자 제거한 이름을 key로 사용
             name = os.path.splitext(file)[0]
             data_dict[name] = df
 
     return data_dict
+
+
+class LazyTables(Mapping):
+    """
+    load_data() 결과처럼 테이블 이름으로 접근하되, 처음 접근할 때 전체 CSV를 읽습니다.
+    파티션 저장소(utils.store)에서 필요한 구간만 읽는 페이지에서는 전체 데이터를 읽지 않게 됩니다.
+    """
+
+    def __getitem__(self, name):
+        return load_data()[name]
+
+    def __iter__(self):
+        return iter(load_data())
+
+    def __len__(self):
+        return len(load_data())
+
+def data_version(folder_path=DATA_FOLDER):
+    """
+    data 폴더 CSV 파일들의 이름, 크기, 수정 시각으로 데이터 버전 문자열을 만듭니다.
+    DataFrame을 해시하지 않고도 데이터가 바뀌었는지 판단하는 캐시 키로 사용합니다.
+    """
+    hasher = hashlib.sha1()
+    for file in sorted(os.listdir(folder_path)):
+        if file.endswith(".csv"):
+            stat = os.stat(os.path.join(folder_path, file))
+            hasher.update(f"{file}:{stat.st_size}:{stat.st_mtime_ns}\n".encode("utf-8"))
+    return hasher.hexdigest()[:12]
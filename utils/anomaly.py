@@ -0,0 +1,166 @@
+# utils/anomaly.py
+"""
+지역 x 재난 유형별 일일 재난문자 건수의 급증을 감지하는 온라인(증분) 이상 탐지기입니다.
+
+각 시계열은 log1p(건수)의 EWMA 평균/분산만 상태로 가지므로 시계열당 메모리가 O(1)이고,
+하루치 갱신은 모든 (지역, 유형) 시계열에 대해 한 번의 벡터 연산입니다.
+상태와 지금까지 감지한 이상 목록은 디스크에 저장되어, 새 날짜가 추가되면 그 날짜만 갱신합니다.
+"""
+import os
+import json
+import numpy as np
+import pandas as pd
+from utils.panel import ALERT_METRIC, ALERT_TYPE_PREFIX
+from utils.cache import budgeted_cache
+
+ANOMALY_STATE_DIR = "data/.anomaly"
+STATE_FILE = "state.npz"
+META_FILE = "state.json"
+ANOMALIES_FILE = "anomalies.parquet"
+
+EWMA_ALPHA = 0.1    # 평활 계수 (약 20일 기준선)
+Z_THRESHOLD = 3.0   # 기준선 대비 z-score가 이 값 이상이면 급증
+MIN_COUNT = 3       # 이 건수 미만은 급증으로 보지 않음
+MIN_STD = 0.25      # log1p 공간의 최소 표준편차 (평소 0건인 시계열의 과민 반응 방지)
+WARMUP_DAYS = 14    # 관측일이 이보다 적은 시계열은 판정하지 않음
+
+
+class EWMADetector:
+    """ 시계열 묶음(임의 shape)에 대한 EWMA z-score 탐지기. 상태는 mean, var, count 배열뿐입니다. """
+
+    def __init__(self, shape, alpha=EWMA_ALPHA, z_threshold=Z_THRESHOLD, min_count=MIN_COUNT,
+                 min_std=MIN_STD, warmup=WARMUP_DAYS):
+        self.alpha = alpha
+        self.z_threshold = z_threshold
+        self.min_count = min_count
+        self.min_std = min_std
+        self.warmup = warmup
+        self.mean = np.zeros(shape)
+        self.var = np.zeros(shape)
+        self.count = np.zeros(shape, dtype=np.int64)
+
+    def update(self, x):
+        """
+        하루치 관측값 x(shape 동일, NaN은 관측 없음)로 상태를 갱신하고 (급증 여부, z-score)를 반환합니다.
+        판정은 갱신 전 기준선으로 합니다.
+        """
+        observed = ~np.isnan(x)
+        value = np.log1p(np.where(observed, np.maximum(x, 0), 0.0))
+        diff = value - self.mean
+        z = diff / np.maximum(np.sqrt(self.var), self.min_std)
+        anomaly = observed & (self.count >= self.warmup) & (z >= self.z_threshold) & (np.nan_to_num(x) >= self.min_count)
+
+        increment = self.alpha * diff
+        self.mean = np.where(observed, self.mean + increment, self.mean)
+        self.var = np.where(observed, (1 - self.alpha) * (self.var + diff * increment), self.var)
+        self.count += observed
+        return anomaly, np.where(observed, z, np.nan)
+
+    def state(self):
+        return {"mean": self.mean, "var": self.var, "count": self.count}
+
+    def load_state(self, state):
+        self.mean = state["mean"].astype(float)
+        self.var = state["var"].astype(float)
+        self.count = state["count"].astype(np.int64)
+
+
+def _alert_block(panel):
+    """ 패널에서 재난문자 지표(전체 + 유형별) 블록의 [날짜, 지역, 지표] view와 지표 이름을 반환합니다. """
+    metrics = [m for m in panel.metrics if m == ALERT_METRIC or m.startswith(ALERT_TYPE_PREFIX)]
+    start = panel.metric_index(metrics[0])
+    return panel.values[:, :, start:start + len(metrics)], metrics
+
+
+def _load(state_dir):
+    meta_path = os.path.join(state_dir, META_FILE)
+    if not os.path.exists(meta_path):
+        return None, None, None
+    with open(meta_path, encoding="utf-8") as f:
+        meta = json.load(f)
+    state = dict(np.load(os.path.join(state_dir, STATE_FILE)))
+    anomalies_path = os.path.join(state_dir, ANOMALIES_FILE)
+    anomalies = pd.read_parquet(anomalies_path) if os.path.exists(anomalies_path) else None
+    return meta, state, anomalies
+
+
+def _save(state_dir, meta, detector, anomalies):
+    os.makedirs(state_dir, exist_ok=True)
+    np.savez(os.path.join(state_dir, "state.tmp.npz"), **detector.state())
+    os.replace(os.path.join(state_dir, "state.tmp.npz"), os.path.join(state_dir, STATE_FILE))
+    anomalies.to_parquet(os.path.join(state_dir, f"{ANOMALIES_FILE}.tmp"), index=False)
+    os.replace(os.path.join(state_dir, f"{ANOMALIES_FILE}.tmp"), os.path.join(state_dir, ANOMALIES_FILE))
+    with open(os.path.join(state_dir, f"{META_FILE}.tmp"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=2)
+    os.replace(os.path.join(state_dir, f"{META_FILE}.tmp"), os.path.join(state_dir, META_FILE))
+
+
+def update_alert_anomalies(panel, state_dir=ANOMALY_STATE_DIR):
+    """
+    저장된 상태 이후에 추가된 날짜만 탐지기에 넣어 이상 목록을 갱신하고 전체 이상 목록을 반환합니다.
+    시계열 구성(지표 목록, 시작 날짜)이 바뀌었거나 이미 처리한 구간의 데이터가 달라졌으면 처음부터 다시 계산합니다.
+    반환: date, region, type(전체 또는 재난 유형), count, z
+    """
+    block, metrics = _alert_block(panel)
+    meta, state, anomalies = _load(state_dir)
+
+    params = {"alpha": EWMA_ALPHA, "z_threshold": Z_THRESHOLD, "min_count": MIN_COUNT,
+              "min_std": MIN_STD, "warmup": WARMUP_DAYS}
+    detector = EWMADetector(block.shape[1:])
+    start = 0
+    if meta is not None:
+        processed = meta["processed_days"]
+        compatible = (
+            meta["metrics"] == metrics and meta["regions"] == panel.regions and meta["params"] == params
+            and meta["start_date"] == str(panel.dates[0].date()) and processed <= len(panel.dates)
+            and np.isclose(np.nansum(block[:processed]), meta["checksum"])
+        )
+        if compatible:
+            detector.load_state(state)
+            start = processed
+    if start == 0 or anomalies is None:
+        anomalies = pd.DataFrame({"date": pd.Series(dtype="datetime64[ns]"), "region": pd.Series(dtype=str),
+                                  "type": pd.Series(dtype=str), "count": pd.Series(dtype=float),
+                                  "z": pd.Series(dtype=float)})
+
+    type_names = ["전체" if m == ALERT_METRIC else m[len(ALERT_TYPE_PREFIX):] for m in metrics]
+    found = []
+    for day in range(start, len(panel.dates)):
+        flags, z = detector.update(block[day])
+        region_idx, metric_idx = np.nonzero(flags)
+        if len(region_idx):
+            found.append(pd.DataFrame({
+                "date": panel.dates[day],
+                "region": np.asarray(panel.regions)[region_idx],
+                "type": np.asarray(type_names)[metric_idx],
+                "count": block[day][region_idx, metric_idx],
+                "z": z[region_idx, metric_idx],
+            }))
+
+    if start < len(panel.dates) or meta is None:
+        anomalies = pd.concat([anomalies] + found, ignore_index=True)
+        meta = {
+            "metrics": metrics, "regions": panel.regions, "params": params,
+            "start_date": str(panel.dates[0].date()), "processed_days": len(panel.dates),
+            "checksum": float(np.nansum(block)),
+        }
+        _save(state_dir, meta, detector, anomalies)
+    return anomalies
+
+
+@budgeted_cache(max_entries=2, show_spinner="재난문자 급증 감지 중...")
+def get_alert_anomalies(version, _panel):
+    """ 데이터 버전당 한 번 이상 목록을 갱신해 공유합니다. (반환된 DataFrame은 수정하지 않고 사용) """
+    return update_alert_anomalies(_panel)
+
+
+def anomalies_for(anomalies, region=None, disaster_type="전체", start=None, end=None):
+    """ 지역/유형/기간으로 이상 목록을 거릅니다. """
+    selected = anomalies[anomalies["type"] == disaster_type]
+    if region is not None:
+        selected = selected[selected["region"] == region]
+    if start is not None:
+        selected = selected[selected["date"] >= pd.Timestamp(start)]
+    if end is not None:
+        selected = selected[selected["date"] <= pd.Timestamp(end)]
+    return selected
@@ -0,0 +1,266 @@
+# utils/cache.py
+"""
+메모리 예산이 있는 공용 캐시 계층입니다. (데이터를 담는 st.cache_data / st.cache_resource 대신 사용)
+
+- 키: 함수 인자 중 밑줄로 시작하지 않는 것(st.cache_data와 같은 규칙) 또는 key= 함수의 반환값을 그대로 씁니다.
+  DataFrame을 해시하지 않으므로, 큰 입력은 _인자로 넘기고 데이터 버전 같은 가벼운 값을 키로 둡니다.
+  키 값은 hash 가능해야 합니다.
+- 캐시마다 max_entries / max_bytes 한도가 있고, 모든 캐시의 합계는 CACHE_MEMORY_LIMIT를 넘지 않습니다.
+  한도를 넘으면 해당 캐시(전체 한도일 때는 모든 캐시)에서 가장 오래 쓰지 않은 항목부터 내보냅니다.
+- 캐시별 적중/미스/내보냄 횟수와 사용량은 cache_stats()와 사이드바 "🗄 캐시" 패널에서 확인합니다.
+- 반환값은 복사하지 않고 모든 세션이 공유합니다. 호출한 쪽에서 수정하지 않고 사용합니다.
+- 같은 키를 여러 세션이 동시에 요청하면 한 번만 계산하고 나머지는 그 결과를 기다립니다.
+"""
+import os
+import sys
+import time
+import inspect
+import threading
+import functools
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+CACHE_MEMORY_LIMIT = int(os.environ.get("BDAP_CACHE_MAX_MB", "1024")) * 1024 * 1024 # 모든 캐시 합계 한도
+DEFAULT_MAX_ENTRIES = 32
+
+_MISSING = object()
+
+
+def estimate_size(value, _seen=None):
+    """ 캐시 항목의 대략적인 메모리 크기(bytes). 같은 객체(배열 버퍼 포함)는 한 번만 셉니다. """
+    seen = set() if _seen is None else _seen
+    if isinstance(value, np.ndarray) and isinstance(value.base, np.ndarray):
+        value = value.base # 뷰는 원본 버퍼 기준으로 셈
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            estimate_size(k, seen) + estimate_size(v, seen) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(estimate_size(v, seen) for v in value)
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + estimate_size(vars(value), seen)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ("value", "size", "expires_at", "last_used")
+
+    def __init__(self, value, size, expires_at, last_used):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.last_used = last_used
+
+
+class BudgetedCache:
+    """ 이름 하나에 해당하는 LRU 캐시. 잠금과 전체 한도는 CacheManager가 관리합니다. """
+
+    def __init__(self, name, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=None, ttl=None):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0 # 항목 하나가 한도보다 커서 저장하지 않은 횟수
+
+    def stats(self):
+        requests = self.hits + self.misses
+        return {
+            "cache": self.name,
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "MiB": round(self.bytes / 1024 / 1024, 2),
+            "max_MiB": None if self.max_bytes is None else round(self.max_bytes / 1024 / 1024, 2),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / requests, 3) if requests else None,
+            "evictions": self.evictions,
+            "rejected": self.rejected,
+        }
+
+
+class CacheManager:
+    """ 프로세스 전체의 BudgetedCache 목록과 전체 메모리 한도를 관리합니다. """
+
+    def __init__(self, limit=CACHE_MEMORY_LIMIT):
+        self.limit = limit
+        self.caches = {}
+        self.bytes = 0
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._tick = 0
+
+    def register(self, name, **options):
+        """ 캐시를 등록합니다. 같은 이름이 있으면(모듈을 다시 불러온 경우) 비우고 새로 만듭니다. """
+        with self._lock:
+            old = self.caches.get(name)
+            if old is not None:
+                self.bytes -= old.bytes
+            cache = self.caches[name] = BudgetedCache(name, **options)
+        return cache
+
+    def _lookup(self, cache, key):
+        entry = cache.entries.get(key)
+        if entry is None:
+            return _MISSING
+        if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+            self._remove(cache, key)
+            return _MISSING
+        cache.entries.move_to_end(key)
+        self._tick += 1
+        entry.last_used = self._tick
+        cache.hits += 1
+        return entry.value
+
+    def _remove(self, cache, key):
+        entry = cache.entries.pop(key)
+        cache.bytes -= entry.size
+        self.bytes -= entry.size
+
+    def _evict(self, cache):
+        cache.evictions += 1
+        self._remove(cache, next(iter(cache.entries)))
+
+    def _store(self, cache, key, value, size):
+        cache.misses += 1
+        limit = min(b for b in (cache.max_bytes, self.limit) if b is not None)
+        if size > limit:
+            cache.rejected += 1
+            return
+        if key in cache.entries:
+            self._remove(cache, key)
+        self._tick += 1
+        expires_at = None if cache.ttl is None else time.monotonic() + cache.ttl
+        cache.entries[key] = _Entry(value, size, expires_at, self._tick)
+        cache.bytes += size
+        self.bytes += size
+
+        # 캐시별 한도 -> 전체 한도 순으로, 가장 오래 쓰지 않은 항목부터 내보냄
+        while len(cache.entries) > cache.max_entries or (cache.max_bytes is not None and cache.bytes > cache.max_bytes):
+            self._evict(cache)
+        while self.bytes > self.limit:
+            victim = min(
+                (c for c in self.caches.values() if c.entries),
+                key=lambda c: next(iter(c.entries.values())).last_used
+            )
+            self._evict(victim)
+
+    def get_or_compute(self, cache, key, compute):
+        with self._lock:
+            value = self._lookup(cache, key)
+            if value is not _MISSING:
+                return value
+            key_lock = self._key_locks.setdefault((cache.name, key), threading.Lock())
+
+        with key_lock:
+            # 기다리는 동안 다른 세션이 계산을 마쳤으면 그 결과를 사용
+            with self._lock:
+                value = self._lookup(cache, key)
+            if value is not _MISSING:
+                return value
+            try:
+                value = compute()
+                size = estimate_size(value)
+                with self._lock:
+                    self._store(cache, key, value, size)
+            finally:
+                with self._lock:
+                    self._key_locks.pop((cache.name, key), None)
+        return value
+
+    def clear(self, cache=None):
+        with self._lock:
+            for c in [cache] if cache is not None else list(self.caches.values()):
+                self.bytes -= c.bytes
+                c.entries.clear()
+                c.bytes = 0
+
+    def stats(self):
+        with self._lock:
+            rows = [c.stats() for c in self.caches.values()]
+        return pd.DataFrame(rows, columns=[
+            "cache", "entries", "max_entries", "MiB", "max_MiB", "hits", "misses", "hit_rate", "evictions", "rejected"
+        ])
+
+
+_manager = CacheManager()
+
+
+def get_cache_manager():
+    return _manager
+
+
+def budgeted_cache(name=None, key=None, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=None, ttl=None, show_spinner=False):
+    """
+    함수 결과를 예산이 있는 공용 캐시에 저장하는 데코레이터입니다.
+    key: 인자를 받아 캐시 키를 반환하는 함수 (없으면 밑줄로 시작하지 않는 인자들의 튜플)
+    max_bytes: 이 캐시의 메모리 한도(bytes), ttl: 항목 유지 시간(초)
+    show_spinner: 문자열이면 계산할 때(미스)만 그 메시지로 스피너를 표시
+    장식된 함수에는 clear()가 붙습니다.
+    """
+    def decorator(func):
+        cache = _manager.register(
+            name or f"{func.__module__}.{func.__qualname__}",
+            max_entries=max_entries, max_bytes=max_bytes, ttl=ttl
+        )
+        signature = inspect.signature(func)
+        key_params = [p for p in signature.parameters if not p.startswith("_")]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if key is not None:
+                cache_key = key(*args, **kwargs)
+            else:
+                bound = signature.bind(*args, **kwargs)
+                bound.apply_defaults()
+                cache_key = tuple(bound.arguments[p] for p in key_params)
+
+            def compute():
+                if show_spinner:
+                    with st.spinner(show_spinner):
+                        return func(*args, **kwargs)
+                return func(*args, **kwargs)
+
+            return _manager.get_or_compute(cache, cache_key, compute)
+
+        wrapper.clear = lambda: _manager.clear(cache)
+        wrapper.cache = cache
+        return wrapper
+    return decorator
+
+
+def clear_caches():
+    """ 모든 공용 캐시를 비웁니다. (벤치마크 등에서 첫 실행 시간을 잴 때 사용) """
+    _manager.clear()
+
+
+def cache_stats():
+    """ 캐시별 항목 수, 사용량(MiB), 적중/미스/내보냄 횟수를 DataFrame으로 반환합니다. """
+    return _manager.stats()
+
+
+def render_cache_panel():
+    """ 사이드바에 캐시별 사용량과 적중률을 표시합니다. """
+    with st.sidebar.expander("🗄 캐시", expanded=False):
+        st.caption(f"전체 {_manager.bytes / 1024 / 1024:.1f} / {_manager.limit / 1024 / 1024:.0f} MiB")
+        stats = cache_stats()
+        stats["cache"] = stats["cache"].str.rsplit(".", n=1).str[-1]
+        st.dataframe(stats[["cache", "entries", "MiB", "hit_rate", "evictions"]], hide_index=True)
@@ -1,24 +1,278 @@
 # utils/download_model.py
+"""
+모델 파일 다운로드 (이어받기, 병렬 구간 다운로드, SHA-256 검증, 원자적 저장)
+
+- 받는 중인 데이터는 <save_path>.part 에 쓰고, 완료된 구간 목록은 <save_path>.part.json 에 기록합니다.
+  중단 후 다시 실행하면 완료되지 않은 구간만 HTTP Range 요청으로 이어서 받습니다.
+- 검증이 끝난 파일만 os.replace로 최종 경로에 옮기므로, 최종 경로의 파일은 항상 완전한 파일입니다.
+  (검증 결과는 <save_path>.sha256 에 기록되어 다음 실행 때 네트워크 없이 확인합니다.)
+- <save_path>.lock 으로 여러 프로세스가 동시에 같은 파일을 받지 않도록 합니다.
+- 기대 해시는 인자로 주거나, Hugging Face의 X-Linked-Etag(LFS 파일의 SHA-256) 헤더에서 가져옵니다.
+"""
 
 import os
+import re
+import json
+import time
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 import requests
 from tqdm import tqdm
 
-def download_model_from_huggingface(model_url, save_path):
-    if not os.path.exists(save_path):
-        print(f"Downloading model from {model_url}")
-        response = requests.get(model_url, stream=True)
-        total = int(response.headers.get('content-length', 0))
-
-        with open(save_path, 'wb') as file, tqdm(
-            desc="Downloading",
-            total=total,
-            unit='iB',
-            unit_scale=True,
-            unit_divisor=1024,
+CHUNK_SIZE = 16 * 1024 * 1024      # Range 요청 하나가 받는 구간 크기
+BUFFER_SIZE = 1024 * 1024          # 스트리밍 읽기/쓰기 버퍼
+MAX_WORKERS = 4                    # 동시 Range 요청 수
+REQUEST_TIMEOUT = (10, 60)         # (연결, 읽기) 타임아웃 초
+MAX_RETRIES = 3                    # 구간별 재시도 횟수
+LOCK_TIMEOUT = 60 * 60             # 다른 프로세스의 다운로드를 기다리는 최대 시간
+LOCK_STALE_SECONDS = 2 * 60 * 60   # 이보다 오래된 lock 파일은 비정상 종료로 보고 무시
+
+_SHA256_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+class DownloadError(Exception):
+    pass
+
+
+def sha256_of(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(BUFFER_SIZE), b""):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _read_json(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class _FileLock:
+    """ O_EXCL로 만든 lock 파일 기반의 프로세스 간 잠금 """
+
+    def __init__(self, path, timeout=LOCK_TIMEOUT, stale_seconds=LOCK_STALE_SECONDS):
+        self.path = path
+        self.timeout = timeout
+        self.stale_seconds = stale_seconds
+
+    def __enter__(self):
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                with os.fdopen(fd, "w") as f:
+                    f.write(f"{os.getpid()} {time.time()}")
+                return self
+            except FileExistsError:
+                try:
+                    if time.time() - os.path.getmtime(self.path) > self.stale_seconds:
+                        os.remove(self.path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise DownloadError(f"lock 파일을 얻지 못했습니다: {self.path}")
+                time.sleep(1)
+
+    def __exit__(self, *exc):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def probe(url, session=None, timeout=REQUEST_TIMEOUT):
+    """
+    HEAD 요청으로 (파일 크기, Range 지원 여부, 기대 SHA-256 또는 None)을 반환합니다.
+    리다이렉트 이전 응답의 X-Linked-Size / X-Linked-Etag(Hugging Face LFS)도 확인합니다.
+    """
+    session = session or requests
+    response = session.head(url, allow_redirects=True, timeout=timeout)
+    response.raise_for_status()
+    headers = [r.headers for r in response.history] + [response.headers]
+
+    size = None
+    expected = None
+    for h in headers:
+        if size is None and h.get("X-Linked-Size"):
+            size = int(h["X-Linked-Size"])
+        etag = h.get("X-Linked-Etag", "").strip('"').lower()
+        if expected is None and _SHA256_PATTERN.match(etag):
+            expected = etag
+    if size is None and response.headers.get("Content-Length"):
+        size = int(response.headers["Content-Length"])
+    accepts_ranges = response.headers.get("Accept-Ranges", "").lower() == "bytes"
+    return size, accepts_ranges, expected
+
+
+def _fetch_range(session, url, part_path, start, end, bar, bar_lock):
+    """ [start, end] 구간을 받아 .part 파일의 같은 위치에 씁니다. 실패하면 재시도합니다. """
+    for attempt in range(1, MAX_RETRIES + 1):
+        written = 0
+        try:
+            headers = {"Range": f"bytes={start}-{end}"}
+            with session.get(url, headers=headers, stream=True, timeout=REQUEST_TIMEOUT) as response:
+                if response.status_code != 206:
+                    raise DownloadError(f"Range 요청이 거부되었습니다 (HTTP {response.status_code})")
+                with open(part_path, "r+b") as f:
+                    f.seek(start)
+                    for data in response.iter_content(chunk_size=BUFFER_SIZE):
+                        f.write(data)
+                        written += len(data)
+                        with bar_lock:
+                            bar.update(len(data))
+            if written != end - start + 1:
+                raise DownloadError(f"구간 크기가 다릅니다: {written} != {end - start + 1}")
+            return
+        except (requests.RequestException, DownloadError):
+            with bar_lock:
+                bar.update(-written)
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(attempt)
+
+
+def _download_ranges(session, url, part_path, size, max_workers):
+    """ 파일을 CHUNK_SIZE 구간으로 나눠 병렬로 받고, 완료된 구간은 진행 파일에 기록합니다. """
+    progress_path = f"{part_path}.json"
+    progress = _read_json(progress_path)
+    if not progress or progress.get("size") != size or progress.get("chunk_size") != CHUNK_SIZE \
+            or not os.path.exists(part_path) or os.path.getsize(part_path) != size:
+        progress = {"size": size, "chunk_size": CHUNK_SIZE, "done": []}
+        with open(part_path, "wb") as f:
+            f.truncate(size)
+        _write_json(progress_path, progress)
+
+    done = set(progress["done"])
+    chunks = [
+        (index, start, min(start + CHUNK_SIZE, size) - 1)
+        for index, start in enumerate(range(0, size, CHUNK_SIZE))
+    ]
+    already = sum(end - start + 1 for index, start, end in chunks if index in done)
+    progress_lock = threading.Lock()
+    bar_lock = threading.Lock()
+
+    with tqdm(desc="Downloading", total=size, initial=already, unit="iB", unit_scale=True, unit_divisor=1024) as bar:
+        def work(chunk):
+            index, start, end = chunk
+            _fetch_range(session, url, part_path, start, end, bar, bar_lock)
+            with progress_lock:
+                done.add(index)
+                _write_json(progress_path, {"size": size, "chunk_size": CHUNK_SIZE, "done": sorted(done)})
+
+        pending = [chunk for chunk in chunks if chunk[0] not in done]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for _ in executor.map(work, pending):
+                pass
+
+
+def _download_stream(session, url, part_path):
+    """ Range를 지원하지 않는 서버: 처음부터 한 번에 받습니다. """
+    with session.get(url, stream=True, timeout=REQUEST_TIMEOUT) as response:
+        response.raise_for_status()
+        total = int(response.headers.get("content-length", 0))
+        with open(part_path, "wb") as f, tqdm(
+            desc="Downloading", total=total, unit="iB", unit_scale=True, unit_divisor=1024,
         ) as bar:
-            for data in response.iter_content(chunk_size=1024):
-                size = file.write(data)
-                bar.update(size)
-    else:
+            for data in response.iter_content(chunk_size=BUFFER_SIZE):
+                bar.update(f.write(data))
+
+
+def _is_verified(save_path, expected_sha256):
+    """ 최종 파일이 이미 검증된 완전한 파일인지 확인합니다. (기록된 해시/크기 비교, 네트워크 없음) """
+    if not os.path.exists(save_path):
+        return False
+    record = _read_json(f"{save_path}.sha256")
+    if record is None:
+        return False
+    if record.get("size") != os.path.getsize(save_path):
+        return False
+    return expected_sha256 is None or record.get("sha256") == expected_sha256
+
+
+def download_file(url, save_path, expected_sha256=None, max_workers=MAX_WORKERS, session=None):
+    """
+    url의 파일을 save_path로 받습니다. 검증된 파일이 이미 있으면 받지 않습니다.
+    expected_sha256이 없으면 서버가 알려 주는 해시(X-Linked-Etag)를 사용하고, 그것도 없으면 크기만 확인합니다.
+    성공하면 save_path를, 실패하면 DownloadError를 발생시킵니다.
+    """
+    expected_sha256 = expected_sha256.lower() if expected_sha256 else None
+    if _is_verified(save_path, expected_sha256):
+        return save_path
+
+    directory = os.path.dirname(os.path.abspath(save_path))
+    os.makedirs(directory, exist_ok=True)
+    part_path = f"{save_path}.part"
+    session = session or requests.Session()
+
+    with _FileLock(f"{save_path}.lock"):
+        # 기다리는 동안 다른 프로세스가 받았을 수 있음
+        if _is_verified(save_path, expected_sha256):
+            return save_path
+
+        size, accepts_ranges, server_sha256 = probe(url, session)
+        expected = expected_sha256 or server_sha256
+
+        # 검증 기록이 없는 기존 파일(이전 버전의 다운로드)은 해시나 크기가 맞으면 그대로 사용
+        if os.path.exists(save_path):
+            actual_size = os.path.getsize(save_path)
+            if (expected and sha256_of(save_path) == expected) or (not expected and size == actual_size):
+                _write_json(f"{save_path}.sha256", {"sha256": expected or sha256_of(save_path), "size": actual_size})
+                return save_path
+            # 손상된 파일은 옆으로 치워, 다시 받기에 실패해도 이 파일을 쓰지 않게 함
+            os.replace(save_path, f"{save_path}.corrupt")
+            print(f"Existing file at {save_path} is incomplete or corrupted (moved to {save_path}.corrupt), downloading again")
+
+        print(f"Downloading model from {url}")
+        if size and accepts_ranges:
+            _download_ranges(session, url, part_path, size, max_workers)
+        else:
+            _download_stream(session, url, part_path)
+
+        actual_size = os.path.getsize(part_path)
+        if size and actual_size != size:
+            raise DownloadError(f"파일 크기가 다릅니다: {actual_size} != {size}")
+        actual = sha256_of(part_path)
+        if expected and actual != expected:
+            for path in (part_path, f"{part_path}.json"):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise DownloadError(f"SHA-256이 일치하지 않습니다: {actual} != {expected}")
+
+        os.replace(part_path, save_path)
+        if os.path.exists(f"{part_path}.json"):
+            os.remove(f"{part_path}.json")
+        _write_json(f"{save_path}.sha256", {"sha256": actual, "size": actual_size})
+    return save_path
+
+
+def download_model_from_huggingface(model_url, save_path, expected_sha256=None, max_workers=MAX_WORKERS):
+    """
+    앱 시작 시 모델 파일을 준비합니다. 실패해도 앱은 계속 실행되도록 오류를 출력하고 None을 반환합니다.
+    (중단된 다운로드는 다음 실행 때 이어서 받습니다.)
+    """
+    expected_sha256 = expected_sha256.lower() if expected_sha256 else None
+    if _is_verified(save_path, expected_sha256):
         print(f"Model already exists at {save_path}")
+        return save_path
+    try:
+        return download_file(model_url, save_path, expected_sha256=expected_sha256, max_workers=max_workers)
+    except (requests.RequestException, DownloadError, OSError) as e:
+        print(f"Model download failed: {e}")
+        if os.path.exists(save_path):
+            # 확인하기 전에 실패한 기존 파일만 남아 있음: 그대로 사용 (다음 실행 때 다시 확인)
+            # (확인해서 손상된 파일은 download_file이 .corrupt로 옮겨 두므로 여기 오지 않음)
+            print(f"Using unverified model at {save_path}")
+            return save_path
+        return None
@@ -0,0 +1,132 @@
+# utils/downsample.py
+"""
+긴 시계열 차트용 다운샘플링입니다.
+
+차트 폭(px)에 맞춘 목표 점 개수로 시계열을 줄여서, 기간이 길어져도
+브라우저로 보내는 데이터 크기와 직렬화 시간이 일정하게 유지되도록 합니다.
+- lttb: Largest-Triangle-Three-Buckets, 모양(피크/골)을 잘 보존
+- minmax: 구간별 최솟값/최댓값만 남기는 단순 decimation
+확대해서 볼 때는 date_window_slider로 구간을 고르고, 그 구간만 다시 다운샘플링합니다.
+(구간 안의 점이 목표 개수 이하이면 원본 해상도 그대로 사용)
+"""
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+DEFAULT_CHART_WIDTH_PX = 1200
+POINTS_PER_PIXEL = 1.0
+
+
+def target_points(width_px=DEFAULT_CHART_WIDTH_PX, points_per_px=POINTS_PER_PIXEL):
+    """ 차트 폭(px)에 맞는 목표 점 개수를 반환합니다. """
+    return max(int(width_px * points_per_px), 3)
+
+
+def _as_float(x):
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        return x.astype("datetime64[ns]").astype(np.int64).astype(float)
+    return x.astype(float)
+
+
+def lttb_indices(x, y, n_out):
+    """
+    LTTB로 남길 점의 인덱스(오름차순)를 반환합니다. 결측값(NaN)은 제외하고 계산합니다.
+    첫 점과 마지막 점은 항상 포함됩니다.
+    """
+    xs = _as_float(x)
+    ys = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(ys))
+    if len(valid) <= n_out:
+        return valid
+    xs, ys = xs[valid], ys[valid]
+    n = len(ys)
+
+    # 첫 점과 마지막 점을 제외한 나머지를 n_out - 2개 구간으로 나눔
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        # 다음 구간의 평균점 (마지막 구간이면 마지막 점)
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], edges[i + 2]
+            avg_x, avg_y = xs[next_start:next_end].mean(), ys[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = xs[-1], ys[-1]
+        # 이전 선택점, 다음 구간 평균점과 만드는 삼각형 넓이가 가장 큰 점 선택
+        area = np.abs(
+            (xs[prev] - avg_x) * (ys[start:end] - ys[prev])
+            - (xs[prev] - xs[start:end]) * (avg_y - ys[prev])
+        )
+        prev = start + int(np.argmax(area))
+        selected[i + 1] = prev
+    return valid[selected]
+
+
+def minmax_indices(y, n_out):
+    """ 구간마다 최솟값과 최댓값 위치를 남기는 decimation 인덱스(오름차순)를 반환합니다. """
+    ys = np.asarray(y, dtype=float)
+    valid = np.flatnonzero(~np.isnan(ys))
+    if len(valid) <= n_out:
+        return valid
+    ys = ys[valid]
+    n_buckets = max(n_out // 2, 1)
+    edges = np.linspace(0, len(ys), n_buckets + 1).astype(int)
+    starts = edges[:-1]
+    lows = np.minimum.reduceat(ys, starts)
+    highs = np.maximum.reduceat(ys, starts)
+    bucket = np.repeat(np.arange(n_buckets), np.diff(edges))
+    is_low = ys == lows[bucket]
+    is_high = ys == highs[bucket]
+    # 구간별 첫 번째 최솟값/최댓값 위치
+    low_pos = np.unique(bucket[is_low], return_index=True)[1]
+    high_pos = np.unique(bucket[is_high], return_index=True)[1]
+    picked = np.union1d(np.flatnonzero(is_low)[low_pos], np.flatnonzero(is_high)[high_pos])
+    return valid[picked]
+
+
+def downsample_indices(x, y, n_out, method="lttb"):
+    if method == "minmax":
+        return minmax_indices(y, n_out)
+    return lttb_indices(x, y, n_out)
+
+
+def downsample_series(x, y, n_out=None, method="lttb"):
+    """ (x, y) 시계열을 n_out개 이하의 점으로 줄여 (x, y)로 반환합니다. """
+    n_out = n_out or target_points()
+    idx = downsample_indices(x, y, n_out, method)
+    return np.asarray(x)[idx], np.asarray(y)[idx]
+
+
+def downsample_long(df, x_col, y_cols, n_out=None, method="lttb", var_name="variable", value_name="value"):
+    """
+    넓은 형태의 DataFrame에서 컬럼(시리즈)별로 따로 다운샘플링한 뒤 긴 형태(x, variable, value)로 반환합니다.
+    Plotly의 px.line(color=variable)에 바로 넘길 수 있는 형태입니다.
+    """
+    n_out = n_out or target_points()
+    x = df[x_col].to_numpy()
+    pieces = []
+    for col in y_cols:
+        y = pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float)
+        idx = downsample_indices(x, y, n_out, method)
+        pieces.append(pd.DataFrame({x_col: x[idx], var_name: col, value_name: y[idx]}))
+    if not pieces:
+        return pd.DataFrame(columns=[x_col, var_name, value_name])
+    return pd.concat(pieces, ignore_index=True)
+
+
+def date_window_slider(dates, key, label="표시 기간"):
+    """
+    차트 확대용 기간 슬라이더를 그리고 선택된 (시작, 끝) 날짜를 반환합니다.
+    선택한 구간만 원본에서 다시 잘라 다운샘플링하므로, 좁은 구간일수록 원본 해상도에 가까워집니다.
+    """
+    dates = pd.DatetimeIndex(dates).dropna()
+    if dates.empty:
+        return None, None
+    start, end = dates.min().to_pydatetime(), dates.max().to_pydatetime()
+    if start == end:
+        return start, end
+    return st.slider(label, min_value=start, max_value=end, value=(start, end), format="YYYY-MM-DD", key=key)
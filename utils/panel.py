@@ -0,0 +1,209 @@
+# utils/panel.py
+"""
+[날짜, 지역, 지표] 3차원 패널 배열입니다.
+
+기상(최고/최저/평균기온, 강수량), 재난문자 건수(전체 및 재난 유형별), 감정 점수를
+일 단위 전체 날짜 x REGIONS(지역 코드 순서) 격자에 한 번만 정렬해 두고,
+각 페이지는 병합 없이 슬라이스(복사 없는 view)만 사용합니다.
+값이 없는 칸은 NaN이며, mask[날짜, 지역, 지표]로 명시적으로 구분합니다.
+"""
+import re
+import numpy as np
+import pandas as pd
+from utils.regions import REGIONS, encode_regions, region_code
+from utils.tracing import traced
+from utils.cache import budgeted_cache
+
+WEATHER_METRICS = ["최고기온", "최저기온", "평균기온", "강수량"]
+ALERT_METRIC = "재난문자_건수"
+ALERT_TYPE_PREFIX = "재난문자_건수:" # 재난 유형별 건수 지표 이름 = 접두어 + 유형
+EMOTION_METRICS = ["negative_emotion", "neutral_emotion", "positive_emotion"]
+
+_TYPE_TOKEN = re.compile(r"[가-힣A-Za-z0-9]+")
+
+
+def alert_type_metric(disaster_type):
+    return f"{ALERT_TYPE_PREFIX}{disaster_type}"
+
+
+def parse_type_list(value):
+    """ 재난유형_리스트 값("['호우', '산사태']", 따옴표 없는 목록, 이미 파싱된 리스트 모두 허용)을 유형 목록으로 바꿉니다. """
+    if isinstance(value, (list, tuple)):
+        # 다른 페이지에서 문자열을 ','로만 나눈 경우("['호우'" 등)도 있으므로 원소마다 다시 추출
+        value = " ".join(str(v) for v in value)
+    if not isinstance(value, str):
+        return []
+    return _TYPE_TOKEN.findall(value)
+
+
+class Panel:
+    """
+    values[d, r, m]: 날짜 d, 지역 r(지역 코드), 지표 m의 값 (결측은 NaN)
+    mask[d, r, m]: 값이 실제로 존재하는지 여부
+    배열은 여러 세션이 공유하므로 읽기 전용으로 고정합니다.
+    """
+
+    def __init__(self, dates, metrics, values, mask):
+        self.dates = dates
+        self.regions = list(REGIONS)
+        self.metrics = list(metrics)
+        self._metric_index = {name: i for i, name in enumerate(self.metrics)}
+        self.values = values
+        self.mask = mask
+        self.values.flags.writeable = False
+        self.mask.flags.writeable = False
+
+    def has_metric(self, metric):
+        return metric in self._metric_index
+
+    def metric_index(self, metric):
+        return self._metric_index[metric]
+
+    def date_slice(self, start=None, end=None):
+        """ [start, end] 날짜 구간(양 끝 포함)에 해당하는 slice를 반환합니다. """
+        lo = 0 if start is None else self.dates.searchsorted(pd.Timestamp(start), side="left")
+        hi = len(self.dates) if end is None else self.dates.searchsorted(pd.Timestamp(end), side="right")
+        return slice(lo, hi)
+
+    def year_slice(self, year):
+        return self.date_slice(f"{year}-01-01", f"{year}-12-31")
+
+    def region_slice(self, region=None):
+        """ 지역 하나(이름/별칭) 또는 전체(None)에 해당하는 slice를 반환합니다. (차원 유지) """
+        if region is None:
+            return slice(None)
+        code = region_code(region)
+        if code < 0:
+            raise KeyError(f"알 수 없는 지역입니다: {region}")
+        return slice(code, code + 1)
+
+    def view(self, metric, dates=slice(None), regions=slice(None)):
+        """ 지표 하나의 [날짜, 지역] 2차원 view를 반환합니다. (복사 없음) """
+        return self.values[dates, regions, self._metric_index[metric]]
+
+    def mask_view(self, metric, dates=slice(None), regions=slice(None)):
+        return self.mask[dates, regions, self._metric_index[metric]]
+
+
+def _scatter(values, mask, dates, frame, columns, metric_offset):
+    """ (date, region) 행 단위 DataFrame의 columns 값을 패널의 지정된 지표 위치에 채웁니다. """
+    date_idx = dates.get_indexer(frame["date"])
+    region_idx = frame["region"].cat.codes.to_numpy()
+    valid = (date_idx >= 0) & (region_idx >= 0)
+    block = frame.loc[valid, columns].to_numpy(dtype=float)
+    values[date_idx[valid], region_idx[valid], metric_offset:metric_offset + len(columns)] = block
+    mask[date_idx[valid], region_idx[valid], metric_offset:metric_offset + len(columns)] = ~np.isnan(block)
+
+
+@traced(rows=lambda panel: len(panel.dates))
+def build_panel(weather, alerts, emotion=None):
+    """
+    weather(날짜, 지역, 기상 컬럼), alerts(날짜, 지역, 재난문자_건수, 재난유형_리스트),
+    emotion(date, region, *_emotion)으로 Panel을 만듭니다. 지역명은 공통 지역 코드로 해석합니다.
+    재난문자 건수는 알림 데이터 기간 안에서 행이 없으면 0건(발송 없음)으로 보고 mask를 True로 둡니다.
+    """
+    weather = pd.DataFrame({
+        "date": pd.to_datetime(weather["날짜"]), "region": encode_regions(weather["지역"]),
+        **{col: weather[col] for col in WEATHER_METRICS}
+    })
+    alert_types = alerts["재난유형_리스트"].map(parse_type_list)
+    alerts = pd.DataFrame({
+        "date": pd.to_datetime(alerts["날짜"]), "region": encode_regions(alerts["지역"]),
+        ALERT_METRIC: pd.to_numeric(alerts["재난문자_건수"], errors="coerce"), "types": alert_types,
+    })
+    type_names = sorted({t for types in alert_types for t in types})
+    frames = [weather["date"], alerts["date"]]
+    if emotion is not None and not emotion.empty:
+        emotion = pd.DataFrame({
+            "date": pd.to_datetime(emotion["date"]), "region": encode_regions(emotion["region"]),
+            **{col: emotion[col] for col in EMOTION_METRICS}
+        })
+        frames.append(emotion["date"])
+    else:
+        emotion = None
+
+    all_dates = pd.concat(frames).dropna()
+    dates = pd.date_range(all_dates.min().normalize(), all_dates.max().normalize(), freq="D")
+    metrics = WEATHER_METRICS + [ALERT_METRIC] + [alert_type_metric(t) for t in type_names] + EMOTION_METRICS
+    values = np.full((len(dates), len(REGIONS), len(metrics)), np.nan)
+    mask = np.zeros(values.shape, dtype=bool)
+
+    _scatter(values, mask, dates, weather, WEATHER_METRICS, 0)
+
+    # 재난문자: 같은 (날짜, 지역)으로 해석된 행은 합산, 유형별 건수는 해당 유형이 포함된 행의 건수 합
+    alert_offset = len(WEATHER_METRICS)
+    alert_range = dates.slice_indexer(alerts["date"].min(), alerts["date"].max())
+    values[alert_range, :, alert_offset:alert_offset + 1 + len(type_names)] = 0.0
+    mask[alert_range, :, alert_offset:alert_offset + 1 + len(type_names)] = True
+    exploded = alerts.explode("types")
+    type_codes = pd.Categorical(exploded["types"], categories=type_names).codes
+    date_idx = dates.get_indexer(alerts["date"])
+    region_idx = alerts["region"].cat.codes.to_numpy()
+    counts = alerts[ALERT_METRIC].fillna(0).to_numpy()
+    valid = (date_idx >= 0) & (region_idx >= 0)
+    np.add.at(values[:, :, alert_offset], (date_idx[valid], region_idx[valid]), counts[valid])
+    ex_date_idx = dates.get_indexer(exploded["date"])
+    ex_region_idx = exploded["region"].cat.codes.to_numpy()
+    ex_valid = (ex_date_idx >= 0) & (ex_region_idx >= 0) & (type_codes >= 0)
+    np.add.at(
+        values,
+        (ex_date_idx[ex_valid], ex_region_idx[ex_valid], alert_offset + 1 + type_codes[ex_valid]),
+        exploded[ALERT_METRIC].fillna(0).to_numpy()[ex_valid]
+    )
+
+    if emotion is not None:
+        _scatter(values, mask, dates, emotion, EMOTION_METRICS, len(metrics) - len(EMOTION_METRICS))
+
+    return Panel(dates, metrics, values, mask)
+
+
+def panel_version():
+    """ 패널 캐시 키: data 폴더 버전 + KOTE 일별 감정 테이블 버전 """
+    from util import data_version
+    from SNS.emotion_series import emotion_table_version
+    return f"{data_version()}:{emotion_table_version()}"
+
+
+def load_emotion_source(total_df):
+    """ KOTE 일별 지역 감정 테이블이 있으면 그것을, 없으면 emotion_sample을 반환합니다. """
+    from SNS.emotion_series import emotion_table_version, load_emotion_table
+    emotion_version = emotion_table_version()
+    if emotion_version is not None:
+        return load_emotion_table(version=emotion_version)
+    return total_df.get("emotion_sample")
+
+
+@budgeted_cache(max_entries=2, show_spinner="분석용 패널 구성 중...")
+def get_panel(version, _total_df):
+    """ 데이터 버전당 한 번만 Panel을 만들어 모든 세션이 공유합니다. """
+    return build_panel(_total_df["weather"], _total_df["alerts"], load_emotion_source(_total_df))
+
+
+def store_panel_version():
+    """ 구간 패널 캐시 키: 파티션 저장소 버전 + KOTE 일별 감정 테이블 버전. 저장소가 없으면 None """
+    from utils.store import current_store_version
+    from SNS.emotion_series import emotion_table_version
+    version = current_store_version()
+    return None if version is None else f"{version}:{emotion_table_version()}"
+
+
+@budgeted_cache(max_entries=4, show_spinner="분석용 패널 구성 중...")
+def get_window_panel(version, start, end):
+    """
+    파티션 저장소(utils.store)에서 [start, end] 구간의 파티션과 패널에 필요한 컬럼만 읽어 Panel을 만듭니다.
+    구간에 기상 또는 재난문자 데이터가 없으면 None을 반환합니다.
+    """
+    from utils.store import read_window
+    from SNS.emotion_series import emotion_table_version, load_emotion_table
+    weather = read_window("weather", start, end, columns=["날짜", "지역", *WEATHER_METRICS])
+    alerts = read_window("alerts", start, end, columns=["날짜", "지역", "재난문자_건수", "재난유형_리스트"])
+    if weather.empty or alerts.empty:
+        return None
+    emotion_version = emotion_table_version()
+    if emotion_version is not None:
+        emotion = load_emotion_table(version=emotion_version)
+        dates = pd.to_datetime(emotion["date"])
+        emotion = emotion[(dates >= pd.Timestamp(start)) & (dates <= pd.Timestamp(end))]
+    else:
+        emotion = read_window("emotion_sample", start, end, columns=["date", "region", *EMOTION_METRICS])
+    return build_panel(weather, alerts, emotion)
@@ -0,0 +1,198 @@
+# utils/profiling.py
+"""
+현재 페이지의 다음 rerun 한 번만 cProfile + tracemalloc으로 프로파일링합니다.
+운영자 설정으로만 켜집니다. (환경 변수 BDAP_PROFILING=1, 기본은 꺼짐)
+
+요청 방법 (둘 중 하나)
+- URL 쿼리 파라미터 ?profile=1 (한 번 프로파일링한 뒤 파라미터는 제거됩니다)
+- 사이드바 "🧪 프로파일링" 패널의 버튼
+
+결과는 PROFILE_DIR/<시각>_<페이지>/ 에 저장되고, 요청한 세션의 패널에서만 내려받을 수 있습니다.
+(최근 PROFILE_KEEP개 디렉터리만 남기고 오래된 것은 지움)
+- rerun.prof: pstats 형식 (snakeviz, python -m pstats 등으로 열기)
+- collapsed.txt: 샘플링한 호출 스택 (flamegraph.pl, speedscope 등에서 사용하는 collapsed 형식)
+- allocations.txt: tracemalloc 기준 메모리 할당 상위 위치
+- summary.txt: 누적 시간 기준 상위 함수
+"""
+import io
+import os
+import sys
+import time
+import pstats
+import cProfile
+import shutil
+import threading
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+import streamlit as st
+
+PROFILING_ENABLED = os.environ.get("BDAP_PROFILING", "0") == "1"
+PROFILE_DIR = "logs/profiles"
+PROFILE_KEEP = int(os.environ.get("BDAP_PROFILE_KEEP", "20")) # 남겨 둘 최근 프로파일 디렉터리 수
+PROFILE_QUERY_PARAM = "profile"
+SAMPLE_INTERVAL = 0.005 # 호출 스택 샘플링 간격 (초)
+TRACEMALLOC_FRAMES = 10
+TOP_ALLOCATIONS = 30
+TOP_FUNCTIONS = 40
+PANEL_MAX_PROFILES = 5
+
+_SESSION_KEY = "_profile_next_rerun"
+_SESSION_PROFILES_KEY = "_profile_dirs" # 이 세션이 만든 프로파일 디렉터리 이름
+# cProfile/tracemalloc은 프로세스 전역이므로 한 번에 한 세션만 프로파일링
+_profile_lock = threading.Lock()
+_FILES = ["rerun.prof", "collapsed.txt", "allocations.txt", "summary.txt"]
+
+
+class _StackSampler(threading.Thread):
+    """ 대상 스레드의 호출 스택을 주기적으로 샘플링해 collapsed 스택 빈도를 셉니다. """
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        super().__init__(daemon=True, name="rerun-stack-sampler")
+        self.thread_id = thread_id
+        self.interval = interval
+        self.counts = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def request_profile():
+    """ 현재 세션의 다음 rerun을 프로파일링하도록 표시합니다. (버튼 on_click 콜백) """
+    st.session_state[_SESSION_KEY] = True
+
+
+def _take_request():
+    """ 이번 rerun이 프로파일링 대상인지 확인하고 요청 표시를 지웁니다. """
+    requested = st.session_state.pop(_SESSION_KEY, False)
+    if st.query_params.get(PROFILE_QUERY_PARAM) == "1":
+        del st.query_params[PROFILE_QUERY_PARAM]
+        requested = True
+    return requested
+
+
+def _write_results(out_dir, profiler, sampler, snapshot, peak_bytes, elapsed):
+    os.makedirs(out_dir, exist_ok=True)
+    profiler.dump_stats(os.path.join(out_dir, "rerun.prof"))
+
+    with open(os.path.join(out_dir, "collapsed.txt"), "w", encoding="utf-8") as f:
+        for stack, count in sampler.counts.most_common():
+            f.write(f"{stack} {count}\n")
+
+    with open(os.path.join(out_dir, "allocations.txt"), "w", encoding="utf-8") as f:
+        f.write(f"peak traced memory: {peak_bytes / 1024 / 1024:.1f} MiB\n\n")
+        for stat in snapshot.statistics("lineno")[:TOP_ALLOCATIONS]:
+            f.write(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {stat.traceback[0]}\n")
+
+    buffer = io.StringIO()
+    stats = pstats.Stats(profiler, stream=buffer)
+    stats.sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    with open(os.path.join(out_dir, "summary.txt"), "w", encoding="utf-8") as f:
+        f.write(f"rerun wall time: {elapsed:.3f}s, samples: {sum(sampler.counts.values())}\n")
+        f.write(buffer.getvalue())
+
+
+def _prune_profiles(keep=PROFILE_KEEP):
+    """ 최근 keep개를 남기고 오래된 프로파일 디렉터리를 지웁니다. """
+    for path in list_profiles()[keep:]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+@contextmanager
+def profile_rerun(page):
+    """ 프로파일링이 요청된 rerun이면 감싼 구간을 cProfile, tracemalloc, 스택 샘플링으로 기록합니다. """
+    if not PROFILING_ENABLED or not _take_request():
+        yield
+        return
+    if not _profile_lock.acquire(blocking=False):
+        st.toast("다른 세션이 프로파일링 중이라 이번 실행은 프로파일링하지 않습니다.")
+        yield
+        return
+
+    try:
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # 디버거 등 다른 프로파일링 도구가 이미 사용 중이면 프로파일링하지 않고 실행
+            st.toast("다른 프로파일링 도구가 사용 중이라 이번 실행은 프로파일링하지 않습니다.")
+            yield
+            return
+
+        already_tracing = tracemalloc.is_tracing()
+        if not already_tracing:
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+        tracemalloc.reset_peak()
+        sampler = _StackSampler(threading.get_ident())
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            sampler.stop()
+            elapsed = time.perf_counter() - started
+            snapshot = tracemalloc.take_snapshot()
+            _, peak_bytes = tracemalloc.get_traced_memory()
+            if not already_tracing:
+                tracemalloc.stop()
+            safe_page = "".join(c if c.isalnum() else "_" for c in page)
+            out_dir = os.path.join(PROFILE_DIR, f"{datetime.now():%Y%m%d_%H%M%S}_{safe_page}")
+            try:
+                _write_results(out_dir, profiler, sampler, snapshot, peak_bytes, elapsed)
+                st.session_state.setdefault(_SESSION_PROFILES_KEY, []).append(os.path.basename(out_dir))
+                _prune_profiles()
+            except OSError:
+                pass # 결과 저장 실패가 페이지 실행을 막지 않도록 함
+    finally:
+        _profile_lock.release()
+
+
+def list_profiles(page=None):
+    """ 저장된 프로파일 디렉터리를 최신순으로 반환합니다. """
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    names = sorted(os.listdir(PROFILE_DIR), reverse=True)
+    if page is not None:
+        safe_page = "".join(c if c.isalnum() else "_" for c in page)
+        names = [n for n in names if n.endswith(f"_{safe_page}")]
+    return [os.path.join(PROFILE_DIR, n) for n in names]
+
+
+def render_profile_panel(page):
+    """ 사이드바에 프로파일링 요청 버튼과, 이 세션이 이 페이지에서 만든 최근 프로파일의 다운로드 버튼을 표시합니다. """
+    if not PROFILING_ENABLED:
+        return
+    own_profiles = set(st.session_state.get(_SESSION_PROFILES_KEY, []))
+    with st.sidebar.expander("🧪 프로파일링", expanded=False):
+        st.button("다음 실행 프로파일링", on_click=request_profile, key="profile_next_rerun",
+                  help=f"버튼을 누르면 바로 이어지는 rerun 한 번을 프로파일링합니다. (URL에 ?{PROFILE_QUERY_PARAM}=1 도 가능)")
+        profiles = [path for path in list_profiles(page) if os.path.basename(path) in own_profiles]
+        for path in profiles[:PANEL_MAX_PROFILES]:
+            name = os.path.basename(path)
+            st.caption(name)
+            summary_path = os.path.join(path, "summary.txt")
+            if os.path.exists(summary_path):
+                with open(summary_path, encoding="utf-8") as f:
+                    st.caption(f.readline().strip())
+            columns = st.columns(len(_FILES))
+            for column, file_name in zip(columns, _FILES):
+                file_path = os.path.join(path, file_name)
+                if os.path.exists(file_path):
+                    with open(file_path, "rb") as f:
+                        column.download_button(file_name.split(".")[0], f.read(), file_name=f"{name}_{file_name}",
+                                               key=f"download_{name}_{file_name}")
@@ -0,0 +1,295 @@
+# utils/query_db.py
+"""
+분석용 ad-hoc SQL 질의를 위한 SQLite 데이터베이스입니다. ("SQL 질의" 페이지에서 사용)
+
+    python -m utils.query_db            # 원본이 바뀌었으면 DB를 다시 만듦
+    python -m utils.query_db --rebuild  # 항상 다시 만듦
+
+테이블 (지역은 표준 지역명, 날짜는 'YYYY-MM-DD' 문자열)
+- alerts(date, region, alert_count): alerts.csv
+- alert_types(date, region, type, day_alert_count): 재난유형_리스트를 유형별 행으로 펼친 것
+  (day_alert_count는 그날 그 지역의 전체 재난문자 건수이며 유형별 건수가 아님 - 유형별로 합하면 중복 집계됨,
+   유형별로는 COUNT(*)로 발생 일수를 셈)
+- weather(date, region, max_temp, min_temp, avg_temp, precipitation): weather.csv
+- emotion(date, region, negative_emotion, neutral_emotion, positive_emotion, comment_count):
+  KOTE 일별 감정 테이블이 있으면 그것을, 없으면 emotion_sample.csv
+- alerts_hourly(hour, region, type, alert_count): 시간 단위 재난문자 테이블이 있을 때만 (message.ingest)
+- comments(snapshot, comment_id, video_id, video_title, published_at, text, like_count),
+  comment_labels(snapshot, comment_id, kind, label): 저장된 SNS 분석 스냅샷의 댓글과 재난 유형/감정 라벨
+
+DB는 원본 버전(source_version())이 바뀔 때 임시 파일에 새로 만든 뒤 교체하며, 질의는 읽기 전용 연결로 실행합니다.
+질의 결과는 (DB 버전, SQL, 행 제한)별로 공용 캐시에 저장되므로 세션마다 DataFrame을 읽지 않습니다.
+"""
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import argparse
+from contextlib import closing
+import pandas as pd
+from utils.regions import encode_regions
+from utils.cache import budgeted_cache
+
+QUERY_DB_PATH = os.environ.get("BDAP_QUERY_DB", "data/query.sqlite")
+QUERY_MAX_ROWS = 50_000 # 페이지에서 한 번에 가져올 수 있는 최대 행 수
+QUERY_TIMEOUT = float(os.environ.get("BDAP_QUERY_TIMEOUT", "10")) # 질의 하나의 최대 실행 시간 (초)
+CSV_CHUNK_ROWS = 200_000
+QUERY_DB_SCHEMA_VERSION = 2 # 테이블 구조를 바꾸면 올림 (원본이 그대로여도 DB를 다시 만들도록)
+WEATHER_COLUMNS = {"날짜": "date", "지역": "region", "최고기온": "max_temp", "최저기온": "min_temp",
+                   "평균기온": "avg_temp", "강수량": "precipitation"}
+EMOTION_COLUMNS = ["date", "region", "negative_emotion", "neutral_emotion", "positive_emotion", "comment_count"]
+COMMENT_COLUMNS = ["comment_id", "video_id", "video_title", "published_at", "text", "like_count"]
+# 사용자 질의에 허용하는 SQLite 권한 동작 (그 외 ATTACH, PRAGMA, VACUUM, 쓰기 등은 모두 거부)
+# SQLITE_RECURSIVE는 WITH RECURSIVE 조회에 필요하며 읽기만 합니다.
+ALLOWED_QUERY_ACTIONS = frozenset({
+    sqlite3.SQLITE_SELECT, sqlite3.SQLITE_READ, sqlite3.SQLITE_FUNCTION, sqlite3.SQLITE_RECURSIVE,
+})
+
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE alerts (date TEXT, region TEXT, alert_count INTEGER);
+CREATE TABLE alert_types (date TEXT, region TEXT, type TEXT, day_alert_count INTEGER);
+CREATE TABLE weather (date TEXT, region TEXT, max_temp REAL, min_temp REAL, avg_temp REAL, precipitation REAL);
+CREATE TABLE emotion (date TEXT, region TEXT, negative_emotion REAL, neutral_emotion REAL, positive_emotion REAL,
+                      comment_count INTEGER);
+CREATE TABLE alerts_hourly (hour TEXT, region TEXT, type TEXT, alert_count INTEGER);
+CREATE TABLE comments (snapshot TEXT, comment_id TEXT, video_id TEXT, video_title TEXT, published_at TEXT,
+                       text TEXT, like_count INTEGER);
+CREATE TABLE comment_labels (snapshot TEXT, comment_id TEXT, kind TEXT, label TEXT);
+"""
+
+# 날짜 / 지역 / 재난 유형 조건과 조인에 쓰는 인덱스 (적재가 끝난 뒤 만듦)
+INDEXES = """
+CREATE INDEX alerts_date ON alerts(date, region);
+CREATE INDEX alerts_region ON alerts(region, date);
+CREATE INDEX alert_types_date ON alert_types(date, region);
+CREATE INDEX alert_types_region ON alert_types(region, date);
+CREATE INDEX alert_types_type ON alert_types(type, date);
+CREATE INDEX weather_date ON weather(date, region);
+CREATE INDEX weather_region ON weather(region, date);
+CREATE INDEX emotion_date ON emotion(date, region);
+CREATE INDEX emotion_region ON emotion(region, date);
+CREATE INDEX alerts_hourly_hour ON alerts_hourly(hour, region);
+CREATE INDEX alerts_hourly_region ON alerts_hourly(region, hour);
+CREATE INDEX alerts_hourly_type ON alerts_hourly(type, hour);
+CREATE INDEX comments_id ON comments(snapshot, comment_id);
+CREATE INDEX comments_published ON comments(published_at);
+CREATE INDEX comment_labels_label ON comment_labels(kind, label);
+CREATE INDEX comment_labels_id ON comment_labels(snapshot, comment_id);
+"""
+
+
+def source_version():
+    """ DB 원본(data CSV, 감정/시간 단위 테이블, 스냅샷 목록)과 테이블 구조의 버전 문자열 """
+    from util import data_version
+    from SNS.emotion_series import emotion_table_version
+    from SNS.snapshot import list_snapshots
+    from message.ingest import hourly_table_version
+    snapshots = [f"{m['name']}@{m.get('created_at', '')}" for m in list_snapshots()]
+    hasher = hashlib.sha1()
+    hasher.update(f"schema={QUERY_DB_SCHEMA_VERSION}\n".encode("utf-8"))
+    hasher.update(f"{data_version()}:{emotion_table_version()}:{hourly_table_version()}\n".encode("utf-8"))
+    hasher.update("\n".join(sorted(snapshots)).encode("utf-8"))
+    return hasher.hexdigest()[:12]
+
+
+def _regions(values):
+    """ 표준 지역명 (알 수 없는 지역은 NULL) """
+    return encode_regions(values).astype(object).where(lambda s: s.notna(), None)
+
+
+def _dates(values, fmt="%Y-%m-%d"):
+    return pd.to_datetime(values, errors="coerce").dt.strftime(fmt)
+
+
+def _load_alerts(conn, path):
+    from utils.panel import parse_type_list
+    for chunk in pd.read_csv(path, chunksize=CSV_CHUNK_ROWS):
+        alerts = pd.DataFrame({
+            "date": _dates(chunk["날짜"]), "region": _regions(chunk["지역"]),
+            "alert_count": pd.to_numeric(chunk["재난문자_건수"], errors="coerce"),
+        })
+        alerts.to_sql("alerts", conn, if_exists="append", index=False)
+        # 원본에는 유형별 건수가 없으므로 그날의 전체 건수를 day_alert_count로 따로 둠 (유형별 합계로 쓰지 않도록)
+        types = alerts.rename(columns={"alert_count": "day_alert_count"})
+        types = types.assign(type=chunk["재난유형_리스트"].map(parse_type_list)).explode("type").dropna(subset=["type"])
+        types[["date", "region", "type", "day_alert_count"]].to_sql("alert_types", conn, if_exists="append", index=False)
+
+
+def _load_weather(conn, path):
+    for chunk in pd.read_csv(path, usecols=list(WEATHER_COLUMNS), chunksize=CSV_CHUNK_ROWS):
+        weather = chunk.rename(columns=WEATHER_COLUMNS)
+        weather["date"] = _dates(weather["date"])
+        weather["region"] = _regions(weather["region"])
+        weather[list(WEATHER_COLUMNS.values())].to_sql("weather", conn, if_exists="append", index=False)
+
+
+def _load_emotion(conn, data_dir):
+    from SNS.emotion_series import emotion_table_version, load_emotion_table
+    emotion_version = emotion_table_version()
+    if emotion_version is not None:
+        chunks = [load_emotion_table(version=emotion_version)]
+    elif os.path.exists(os.path.join(data_dir, "emotion_sample.csv")):
+        chunks = pd.read_csv(os.path.join(data_dir, "emotion_sample.csv"), chunksize=CSV_CHUNK_ROWS)
+    else:
+        return
+    for chunk in chunks:
+        emotion = chunk.reindex(columns=EMOTION_COLUMNS)
+        emotion["date"] = _dates(emotion["date"])
+        emotion["region"] = _regions(emotion["region"])
+        emotion.to_sql("emotion", conn, if_exists="append", index=False)
+
+
+def _load_hourly(conn):
+    from message.ingest import hourly_table_version, load_hourly_alerts
+    version = hourly_table_version()
+    if version is None:
+        return
+    hourly = load_hourly_alerts(version=version)
+    pd.DataFrame({
+        "hour": hourly["hour"].dt.strftime("%Y-%m-%d %H:%M:%S"), "region": _regions(hourly["region"]),
+        "type": hourly["type"].astype(str), "alert_count": hourly["count"],
+    }).to_sql("alerts_hourly", conn, if_exists="append", index=False)
+
+
+def _load_comments(conn):
+    from SNS import snapshot
+    from SNS.config import SNAPSHOT_DIR
+    from SNS.result_store import decode_comments
+    for manifest in snapshot.list_snapshots():
+        try:
+            snap = snapshot.Snapshot(os.path.join(SNAPSHOT_DIR, manifest["name"]))
+        except ValueError:
+            continue # 현재 레이블과 호환되지 않는 스냅샷은 건너뜀
+        comments = decode_comments(snap.comments())
+        if "comment_id" not in comments.columns:
+            continue
+        rows = comments.reindex(columns=COMMENT_COLUMNS)
+        rows = rows.astype({col: object for col in ["comment_id", "video_id", "video_title", "text"]})
+        rows["published_at"] = _dates(rows["published_at"], "%Y-%m-%d %H:%M:%S")
+        rows.insert(0, "snapshot", manifest["name"])
+        rows.to_sql("comments", conn, if_exists="append", index=False)
+
+        for kind, list_col in [("disaster", "disaster_labels"), ("sentiment", "sentiment_labels")]:
+            if list_col not in comments.columns:
+                continue
+            labels = comments[["comment_id", list_col]].explode(list_col).dropna(subset=[list_col])
+            pd.DataFrame({
+                "snapshot": manifest["name"], "comment_id": labels["comment_id"].astype(object),
+                "kind": kind, "label": labels[list_col],
+            }).to_sql("comment_labels", conn, if_exists="append", index=False)
+
+
+def build_query_db(db_path=QUERY_DB_PATH, data_dir="data"):
+    """ 원본 전체를 읽어 DB를 새로 만들고(임시 파일에 쓴 뒤 교체) 원본 버전을 반환합니다. """
+    version = source_version()
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    tmp_path = f"{db_path}.{os.getpid()}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(SCHEMA)
+        if os.path.exists(os.path.join(data_dir, "alerts.csv")):
+            _load_alerts(conn, os.path.join(data_dir, "alerts.csv"))
+        if os.path.exists(os.path.join(data_dir, "weather.csv")):
+            _load_weather(conn, os.path.join(data_dir, "weather.csv"))
+        _load_emotion(conn, data_dir)
+        _load_hourly(conn)
+        _load_comments(conn)
+        conn.executescript(INDEXES)
+        conn.execute("INSERT INTO meta VALUES ('source_version', ?)", (version,))
+        conn.commit()
+        conn.execute("ANALYZE") # 인덱스 선택용 통계
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return version
+
+
+def db_version(db_path=QUERY_DB_PATH):
+    """ DB에 기록된 원본 버전. DB가 없으면 None을 반환합니다. """
+    if not os.path.exists(db_path):
+        return None
+    try:
+        with closing(_connect(db_path)) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'source_version'").fetchone()
+    except sqlite3.Error:
+        return None
+    return row[0] if row else None
+
+
+@budgeted_cache(max_entries=1, show_spinner="질의용 DB 구성 중...")
+def ensure_query_db(version, db_path=QUERY_DB_PATH):
+    """
+    DB가 원본 버전 version으로 만들어져 있는지 확인하고, 아니면 다시 만듭니다. (버전당 한 번, 동시 요청은 기다림)
+    version에는 source_version()의 값을 전달합니다.
+    """
+    if db_version(db_path) != version:
+        build_query_db(db_path)
+    return version
+
+
+def _connect(db_path):
+    """ 읽기 전용 연결 (질의로 DB를 바꿀 수 없음) """
+    conn = sqlite3.connect(f"file:{os.path.abspath(db_path)}?mode=ro", uri=True)
+    conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def _authorize_query(action, *_):
+    """ 사용자 질의용 권한 검사 (mode=ro, query_only로도 막히지 않는 ATTACH / VACUUM INTO 등을 거부) """
+    return sqlite3.SQLITE_OK if action in ALLOWED_QUERY_ACTIONS else sqlite3.SQLITE_DENY
+
+
+def list_tables(db_path=QUERY_DB_PATH):
+    """ {테이블 이름: [(컬럼, 타입), ...]} (meta 제외) """
+    with closing(_connect(db_path)) as conn:
+        names = [row[0] for row in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT IN ('meta', 'sqlite_stat1') ORDER BY name"
+        )]
+        return {name: [(row[1], row[2]) for row in conn.execute(f"PRAGMA table_info('{name}')")] for name in names}
+
+
+@budgeted_cache(max_entries=128, max_bytes=64 * 1024 * 1024)
+def run_sql(version, sql, limit, db_path=QUERY_DB_PATH):
+    """
+    SQL 한 문장을 읽기 전용으로 실행하고 (결과 DataFrame, 잘렸는지 여부, 실행 시간 ms)를 반환합니다.
+    결과는 limit행까지만 가져오며, QUERY_TIMEOUT을 넘기면 sqlite3.OperationalError(interrupted)가 발생합니다.
+    조회(SELECT) 외의 문장은 sqlite3.DatabaseError(not authorized)로 거부됩니다.
+    version은 캐시 키로, ensure_query_db()의 반환값을 전달합니다.
+    """
+    started = time.perf_counter()
+    deadline = started + QUERY_TIMEOUT
+    conn = _connect(db_path)
+    try:
+        conn.set_authorizer(_authorize_query)
+        conn.set_progress_handler(lambda: time.perf_counter() > deadline, 10_000) # 0이 아닌 값을 반환하면 중단
+        cursor = conn.execute(sql)
+        rows = cursor.fetchmany(limit + 1) if cursor.description else []
+        columns = [col[0] for col in cursor.description or []]
+    finally:
+        conn.close()
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return pd.DataFrame(rows[:limit], columns=columns), len(rows) > limit, elapsed_ms
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="분석용 SQLite 질의 DB를 만듭니다.")
+    parser.add_argument("--db", default=QUERY_DB_PATH)
+    parser.add_argument("--rebuild", action="store_true", help="원본이 바뀌지 않았어도 다시 만듦")
+    args = parser.parse_args(argv)
+
+    if not args.rebuild and db_version(args.db) == source_version():
+        print(f"{args.db}: 최신 상태입니다.")
+        return 0
+    started = time.perf_counter()
+    version = build_query_db(args.db)
+    print(f"{args.db}: 버전 {version} 생성 ({time.perf_counter() - started:.1f}초)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
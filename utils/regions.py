@@ -0,0 +1,83 @@
+# utils/regions.py
+"""
+시도 단위 지역 차원 테이블입니다.
+
+모든 데이터의 지역 컬럼은 로드 시 한 번만 REGION_DTYPE(범주형)으로 변환하고,
+조인과 필터는 정수 코드 기준으로 수행합니다. 코드는 REGIONS 목록의 순서이므로
+새 지역은 반드시 목록 끝에 추가해야 합니다. (기존 코드 유지)
+"""
+
+import warnings
+import numpy as np
+import pandas as pd
+
+# 표준 지역명 (weather.csv 기준), 목록 순서 = 지역 코드
+REGIONS = [
+    "서울특별시", "부산광역시", "대구광역시", "인천광역시", "광주광역시", "대전광역시",
+    "울산광역시", "세종특별자치시", "경기도", "강원도", "충청북도", "충청남도",
+    "전라북도", "전라남도", "경상북도", "경상남도", "제주특별자치도",
+]
+
+# 별칭 -> 표준 지역명 (개편된 행정구역명, 약칭, 시군 단위로 들어온 값 등)
+# GeoJSON의 CTP_KOR_NM 값도 이 표로 표준 지역명에 대응시킵니다.
+REGION_ALIASES = {
+    "강원특별자치도": "강원도",
+    "전북특별자치도": "전라북도",
+    "제주도": "제주특별자치도",
+    "세종시": "세종특별자치시",
+    "서울": "서울특별시", "서울시": "서울특별시",
+    "부산": "부산광역시", "대구": "대구광역시", "인천": "인천광역시", "광주": "광주광역시",
+    "대전": "대전광역시", "울산": "울산광역시", "세종": "세종특별자치시", "경기": "경기도",
+    "강원": "강원도", "충북": "충청북도", "충남": "충청남도", "전북": "전라북도",
+    "전남": "전라남도", "경북": "경상북도", "경남": "경상남도", "제주": "제주특별자치도",
+    # alerts.csv에 시군/수계 단위로 들어온 값
+    "부천시": "경기도",
+    "임진강 수계지역(경기도": "경기도",
+}
+
+REGION_DTYPE = pd.CategoricalDtype(REGIONS)
+REGION_CODES = {name: code for code, name in enumerate(REGIONS)}
+
+_LOOKUP = {**{name: name for name in REGIONS}, **REGION_ALIASES}
+
+
+def resolve_region(name):
+    """ 지역명(별칭 포함)을 표준 지역명으로 바꿉니다. 알 수 없는 값이면 None을 반환합니다. """
+    if not isinstance(name, str):
+        return None
+    return _LOOKUP.get(name.strip())
+
+
+def region_code(name):
+    """ 지역명(별칭 포함)의 정수 코드를 반환합니다. 알 수 없는 값이면 -1을 반환합니다. """
+    return REGION_CODES.get(resolve_region(name), -1)
+
+
+def encode_regions(values, source=""):
+    """
+    지역명 시리즈를 REGION_DTYPE 범주형으로 변환합니다.
+    고유값 단위로만 별칭을 해석하므로 행 수와 무관하게 빠르며,
+    해석할 수 없는 지역명은 경고로 알리고 결측값(NaN)으로 둡니다.
+    """
+    values = pd.Series(values)
+    if isinstance(values.dtype, pd.CategoricalDtype) and values.dtype == REGION_DTYPE:
+        return values
+    uniques = pd.unique(values.dropna())
+    mapping = {value: resolve_region(value) for value in uniques}
+    unknown = sorted(str(value) for value, resolved in mapping.items() if resolved is None)
+    if unknown:
+        warnings.warn(f"{source} 알 수 없는 지역명 {len(unknown)}개: {unknown[:10]}", stacklevel=2)
+    return values.map(mapping).astype(REGION_DTYPE)
+
+
+def encode_region_columns(df, columns=("지역", "region", "지역명"), source=""):
+    """ DataFrame의 지역 컬럼들을 제자리에서 범주형으로 변환하고 df를 반환합니다. """
+    for col in columns:
+        if col in df.columns:
+            df[col] = encode_regions(df[col], source=source or col)
+    return df
+
+
+def region_table():
+    """ 지역 차원 테이블(code, region)을 반환합니다. """
+    return pd.DataFrame({"code": np.arange(len(REGIONS), dtype=np.int8), "region": REGIONS})
@@ -0,0 +1,216 @@
+# utils/store.py
+"""
+alerts / weather / emotion_sample 테이블을 연/월 파티션 Parquet으로 보관하는 추가 전용 저장소입니다.
+
+    python -m utils.store            # data/*.csv에서 아직 없는 날짜만 파티션에 추가
+    python -m utils.store --rebuild  # 저장소를 지우고 처음부터 다시 만듦
+
+- 구성: STORE_DIR/<테이블>/year=YYYY/month=MM/part-<시각>.parquet (hive 파티션)
+- 추가는 테이블별로 저장된 마지막 날짜 이후의 행만 새 파트 파일로 씁니다. 기존 파트는 다시 쓰지 않으므로,
+  이미 저장된 날짜의 값이 CSV에서 바뀐 경우에는 --rebuild로 다시 만들어야 합니다.
+- read_window는 연/월 파티션과 날짜 조건, 필요한 컬럼만 pyarrow.dataset에 넘겨 해당 파티션 파일만 읽습니다.
+  반환 DataFrame은 load_data()와 같은 형태입니다. (CSV 컬럼 그대로, 지역 컬럼은 범주형)
+- 페이지는 current_store_version()으로 저장소를 확인합니다. data 폴더 버전이 바뀌면(서버 실행 중 CSV 갱신 포함)
+  읽기 전에 새 날짜를 한 번 반영하므로, 저장소를 읽는 페이지와 CSV를 읽는 페이지가 같은 데이터를 봅니다.
+- 저장소가 없으면(None) 페이지는 기존처럼 load_data() 전체 데이터를 사용합니다.
+"""
+import os
+import sys
+import json
+import shutil
+import argparse
+from datetime import datetime
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pyarrow.dataset as ds
+from utils.regions import encode_region_columns
+from utils.cache import budgeted_cache
+
+STORE_DIR = "data/store"
+DATA_DIR = "data"
+STATE_FILE = "_state.json"
+TABLE_DATE_COLUMNS = {"alerts": "날짜", "weather": "날짜", "emotion_sample": "date"}
+CSV_CHUNK_ROWS = 500_000 # 동기화 시 CSV를 한 번에 읽을 행 수
+PARTITION_COLUMNS = ["year", "month"]
+
+
+def _load_state(store_dir):
+    path = os.path.join(store_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {"tables": {}}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _save_state(store_dir, state):
+    path = os.path.join(store_dir, STATE_FILE)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _table_schema(store_dir, name):
+    """ 이미 저장된 파트의 스키마 (새 파트도 같은 스키마로 맞춰 씀). 없으면 None """
+    for root, _, files in os.walk(os.path.join(store_dir, name)):
+        for file_name in sorted(files):
+            if file_name.endswith(".parquet") and not file_name.startswith("."):
+                return pq.read_schema(os.path.join(root, file_name))
+    return None
+
+
+def _append(state, store_dir, name, df):
+    date_col = TABLE_DATE_COLUMNS[name]
+    dates = pd.to_datetime(df[date_col], errors="coerce")
+    df, dates = df[dates.notna()], dates[dates.notna()]
+    if df.empty:
+        return 0
+    table_state = state["tables"].setdefault(name, {"max_date": None, "rows": 0, "partitions": {}})
+    schema = _table_schema(store_dir, name)
+    stamp = datetime.now().strftime("%Y%m%d%H%M%S%f")
+
+    for (year, month), part in df.groupby([dates.dt.year, dates.dt.month]):
+        table = pa.Table.from_pandas(part, preserve_index=False)
+        if schema is None:
+            schema = table.schema
+        table = table.select(schema.names).cast(schema)
+        part_dir = os.path.join(store_dir, name, f"year={year}", f"month={month:02d}")
+        os.makedirs(part_dir, exist_ok=True)
+        # "."으로 시작하는 임시 파일은 pyarrow.dataset이 읽지 않음
+        tmp_path = os.path.join(part_dir, f".part-{stamp}.parquet.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, os.path.join(part_dir, f"part-{stamp}.parquet"))
+        key = f"{year}-{month:02d}"
+        table_state["partitions"][key] = table_state["partitions"].get(key, 0) + len(part)
+
+    max_date = dates.max().strftime("%Y-%m-%d")
+    table_state["max_date"] = max(filter(None, [table_state["max_date"], max_date]))
+    table_state["rows"] += len(df)
+    return len(df)
+
+
+def append_days(name, df, store_dir=STORE_DIR):
+    """ df의 행을 날짜의 (연, 월) 파티션에 새 파트로 추가하고 추가한 행 수를 반환합니다. (기존 파트는 그대로) """
+    os.makedirs(store_dir, exist_ok=True)
+    state = _load_state(store_dir)
+    rows = _append(state, store_dir, name, df)
+    _save_state(store_dir, state)
+    return rows
+
+
+def sync_from_csv(data_dir=DATA_DIR, store_dir=STORE_DIR):
+    """
+    data_dir의 테이블 CSV에서 저장소의 마지막 날짜 이후 행만 골라 파티션에 추가합니다.
+    CSV가 바뀌지 않은 테이블은 읽지 않습니다. 테이블별 추가 행 수를 반환합니다.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    state = _load_state(store_dir)
+    added = {}
+    for name, date_col in TABLE_DATE_COLUMNS.items():
+        path = os.path.join(data_dir, f"{name}.csv")
+        if not os.path.exists(path):
+            continue
+        signature = f"{os.path.getsize(path)}:{os.path.getmtime(path)}"
+        table_state = state["tables"].get(name, {})
+        if table_state.get("source") == signature:
+            continue
+
+        max_date = table_state.get("max_date")
+        added[name] = 0
+        for chunk in pd.read_csv(path, chunksize=CSV_CHUNK_ROWS):
+            if max_date is not None:
+                chunk = chunk[pd.to_datetime(chunk[date_col], errors="coerce") > pd.Timestamp(max_date)]
+            added[name] += _append(state, store_dir, name, chunk)
+        state["tables"].setdefault(name, {"max_date": None, "rows": 0, "partitions": {}})["source"] = signature
+        _save_state(store_dir, state)
+    return added
+
+
+def store_version(store_dir=STORE_DIR):
+    """ 저장소 버전(상태 파일 수정 시각)을 반환합니다. 저장소가 없으면 None을 반환합니다. """
+    path = os.path.join(store_dir, STATE_FILE)
+    if not os.path.exists(path) or not _load_state(store_dir)["tables"]:
+        return None
+    return os.stat(path).st_mtime_ns
+
+
+@budgeted_cache(max_entries=1)
+def _sync_for_data_version(data_version):
+    """ data 폴더 버전마다 한 번(동시 요청은 기다림) CSV의 새 날짜를 저장소에 반영합니다. """
+    sync_from_csv()
+
+
+def current_store_version():
+    """
+    저장소가 있으면 data 폴더의 새 날짜를 반영한 뒤 저장소 버전을, 없으면 None을 반환합니다.
+    저장소를 읽는 페이지는 store_version() 대신 이 함수로 버전(캐시 키)을 얻습니다.
+    """
+    if store_version() is None:
+        return None
+    from util import data_version
+    _sync_for_data_version(data_version())
+    return store_version()
+
+
+def store_years(name, store_dir=STORE_DIR):
+    """ 테이블에 저장된 연도 목록 (파티션 목록에서 읽으므로 데이터 파일은 열지 않음) """
+    partitions = _load_state(store_dir)["tables"].get(name, {}).get("partitions", {})
+    return sorted({int(key[:4]) for key in partitions})
+
+
+def _window_filter(dataset, date_col, start, end):
+    """ 연/월 파티션 조건(파일 단위로 건너뜀)과 날짜 조건을 합친 필터 """
+    bound_type = dataset.schema.field(date_col).type
+    as_bound = (lambda t: t.strftime("%Y-%m-%d")) if pa.types.is_string(bound_type) or pa.types.is_large_string(bound_type) \
+        else (lambda t: t.to_pydatetime())
+    year, month = ds.field("year"), ds.field("month")
+    conditions = []
+    if start is not None:
+        start = pd.Timestamp(start)
+        conditions += [(year > start.year) | ((year == start.year) & (month >= start.month)),
+                       ds.field(date_col) >= as_bound(start)]
+    if end is not None:
+        end = pd.Timestamp(end)
+        conditions += [(year < end.year) | ((year == end.year) & (month <= end.month)),
+                       ds.field(date_col) <= as_bound(end)]
+    row_filter = None
+    for condition in conditions:
+        row_filter = condition if row_filter is None else row_filter & condition
+    return row_filter
+
+
+def read_window(name, start=None, end=None, columns=None, store_dir=STORE_DIR):
+    """
+    [start, end] 날짜 구간(양 끝 포함)의 행 중 columns만 읽습니다. (None이면 전체)
+    구간에 해당하지 않는 연/월 파티션 파일은 열지 않습니다.
+    """
+    root = os.path.join(store_dir, name)
+    if not os.path.isdir(root):
+        return pd.DataFrame(columns=columns or [])
+    dataset = ds.dataset(root, format="parquet", partitioning="hive")
+    if columns is None:
+        columns = [col for col in dataset.schema.names if col not in PARTITION_COLUMNS]
+    df = dataset.to_table(columns=columns, filter=_window_filter(dataset, TABLE_DATE_COLUMNS[name], start, end)).to_pandas()
+    return encode_region_columns(df, source=f"{name}.csv")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="data/*.csv의 새 날짜를 연/월 파티션 저장소에 추가합니다.")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--store-dir", default=STORE_DIR)
+    parser.add_argument("--rebuild", action="store_true", help="저장소를 지우고 처음부터 다시 만듦")
+    args = parser.parse_args(argv)
+
+    if args.rebuild:
+        shutil.rmtree(args.store_dir, ignore_errors=True)
+    added = sync_from_csv(args.data_dir, args.store_dir)
+    for name, rows in added.items():
+        print(f"{name}: {rows:,}행 추가")
+    if not added:
+        print("추가할 새 날짜가 없습니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,203 @@
+# utils/tracing.py
+"""
+페이지 실행(rerun) 단위의 가벼운 span 추적입니다.
+
+- app.py가 rerun마다 trace_rerun(페이지)으로 최상위 trace를 열고,
+  그 안에서 span(...) / @traced 로 감싼 구간이 중첩 span(소요 시간, 행 수)으로 기록됩니다.
+- trace가 열려 있지 않으면(배치 CLI, 백그라운드 스레드 등) span은 아무것도 하지 않습니다.
+- 끝난 rerun은 JSONL 파일(TRACE_LOG_PATH)에 한 줄씩 추가되고,
+  페이지별 최근 TRACE_HISTORY개는 메모리에 보관되어 사이드바 성능 패널에 표시됩니다.
+"""
+import os
+import json
+import time
+import uuid
+import threading
+import functools
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+import pandas as pd
+import streamlit as st
+
+TRACING_ENABLED = os.environ.get("BDAP_TRACING", "1") != "0"
+TRACE_LOG_PATH = os.environ.get("BDAP_TRACE_LOG", "logs/traces.jsonl")
+TRACE_LOG_MAX_BYTES = 20 * 1024 * 1024 # 넘으면 .1 파일로 넘기고 새로 씁니다.
+TRACE_HISTORY = 20 # 페이지별로 패널에 보관할 최근 rerun 수
+
+_current_trace = ContextVar("trace", default=None)
+_current_span = ContextVar("span", default=None)
+_sink_lock = threading.Lock()
+
+
+class _Trace:
+    def __init__(self, page):
+        self.id = uuid.uuid4().hex[:12]
+        self.page = page
+        self.started_at = datetime.now().isoformat(timespec="milliseconds")
+        self.start = time.perf_counter()
+        self.spans = []
+        self._next_id = 0
+
+    def new_span_id(self):
+        self._next_id += 1
+        return self._next_id
+
+
+class SpanHandle:
+    """ 진행 중인 span. set(rows=..., 기타 속성)으로 결과 정보를 덧붙입니다. """
+
+    def __init__(self, record=None):
+        self.record = record
+
+    def set(self, rows=None, **attrs):
+        if self.record is None:
+            return
+        if rows is not None:
+            self.record["rows"] = int(rows)
+        self.record["attrs"].update({k: _jsonable(v) for k, v in attrs.items()})
+
+
+def _jsonable(value):
+    return value if isinstance(value, (str, int, float, bool, type(None))) else str(value)
+
+
+def _row_count(result):
+    """ 결과의 행 수 (DataFrame, 리스트, 배열 등 길이가 있는 값만) """
+    if isinstance(result, tuple):
+        result = result[0] if result else None
+    if isinstance(result, (str, bytes, dict)) or result is None:
+        return None
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+@contextmanager
+def span(name, **attrs):
+    """ 현재 rerun trace 안에 중첩 span을 기록합니다. trace가 없으면 아무것도 하지 않습니다. """
+    trace = _current_trace.get()
+    if trace is None:
+        yield SpanHandle()
+        return
+    parent = _current_span.get()
+    record = {
+        "id": trace.new_span_id(),
+        "parent": parent["id"] if parent else None,
+        "depth": parent["depth"] + 1 if parent else 0,
+        "name": name,
+        "start_ms": round((time.perf_counter() - trace.start) * 1000, 2),
+        "duration_ms": None,
+        "rows": None,
+        "attrs": {k: _jsonable(v) for k, v in attrs.items()},
+    }
+    trace.spans.append(record)
+    token = _current_span.set(record)
+    started = time.perf_counter()
+    try:
+        yield SpanHandle(record)
+    except Exception as e:
+        record["attrs"]["error"] = type(e).__name__
+        raise
+    finally:
+        record["duration_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        _current_span.reset(token)
+
+
+def traced(name=None, rows=_row_count):
+    """
+    함수 호출을 span으로 기록하는 데코레이터입니다. rows(결과) -> 행 수 함수로 행 수를 기록합니다.
+    st.cache_data/cache_resource 위에 붙이면 캐시 적중 시간도 함께 기록됩니다.
+    """
+    def decorator(func):
+        span_name = name or f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name) as handle:
+                result = func(*args, **kwargs)
+                if rows is not None:
+                    handle.set(rows=rows(result))
+                return result
+        return wrapper
+    return decorator
+
+
+def _write_sink(entry, path=TRACE_LOG_PATH):
+    if not path:
+        return
+    line = json.dumps(entry, ensure_ascii=False) + "\n"
+    with _sink_lock:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        if os.path.exists(path) and os.path.getsize(path) > TRACE_LOG_MAX_BYTES:
+            os.replace(path, f"{path}.1")
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+@st.cache_resource(show_spinner=False)
+def get_trace_history():
+    """ 페이지 -> 최근 rerun trace(deque) 공유 보관소 """
+    return {"lock": threading.Lock(), "pages": {}}
+
+
+@contextmanager
+def trace_rerun(page):
+    """ 페이지 rerun 하나를 최상위 trace로 기록합니다. (app.py에서 사용) """
+    if not TRACING_ENABLED or _current_trace.get() is not None:
+        yield
+        return
+    trace = _Trace(page)
+    token = _current_trace.set(trace)
+    try:
+        with span(f"rerun:{page}"):
+            yield
+    finally:
+        _current_trace.reset(token)
+        entry = {
+            "trace_id": trace.id, "page": page, "started_at": trace.started_at,
+            "duration_ms": trace.spans[0]["duration_ms"] if trace.spans else None,
+            "spans": trace.spans,
+        }
+        history = get_trace_history()
+        with history["lock"]:
+            history["pages"].setdefault(page, deque(maxlen=TRACE_HISTORY)).append(entry)
+        try:
+            _write_sink(entry)
+        except OSError:
+            pass # 추적 기록 실패가 페이지 실행을 막지 않도록 함
+
+
+def recent_traces(page):
+    history = get_trace_history()
+    with history["lock"]:
+        return list(history["pages"].get(page, ()))
+
+
+def render_trace_panel(page):
+    """ 사이드바에 현재 페이지의 최근 rerun 소요 시간과 마지막 rerun의 span 트리를 표시합니다. """
+    if not TRACING_ENABLED:
+        return
+    traces = recent_traces(page)
+    if not traces:
+        return
+    with st.sidebar.expander(f"⏱ 성능 추적 (최근 {len(traces)}회)", expanded=False):
+        summary = pd.DataFrame([
+            {"시각": t["started_at"][11:], "전체(ms)": t["duration_ms"], "span 수": len(t["spans"])}
+            for t in reversed(traces)
+        ])
+        st.dataframe(summary, hide_index=True)
+        latest = traces[-1]
+        st.caption(f"마지막 실행 span ({latest['trace_id']})")
+        tree = pd.DataFrame([
+            {"span": "　" * s["depth"] + s["name"], "시작(ms)": s["start_ms"], "소요(ms)": s["duration_ms"],
+             "행 수": s["rows"]}
+            for s in latest["spans"]
+        ])
+        st.dataframe(tree, hide_index=True)
@@ -0,0 +1,337 @@
+# utils/warmup.py
+"""
+서버 시작 시 백그라운드 스레드에서 각 페이지가 처음 쓰는 캐시를 미리 채웁니다.
+
+채우는 순서 (WARMUP_STEPS)
+- store: 파티션 저장소가 있으면 CSV의 새 날짜를 추가 (utils.store)
+- data: CSV 로드(load_data)
+- panel: 공유 패널, 재난문자 급증 감지 목록
+- message / relationship / move / hitmap: 페이지별 집계, 시차 상관계수, 시간 흐름 조합, 지도 렌더링
+  (파티션 저장소가 있으면 페이지와 같은 분기를 따라 연도별 패널과 연도별 재난문자를 채우고,
+   전체 CSV를 읽는 data / panel / message / relationship 단계는 건너뜀)
+- sns: Okt(JVM 시작), KOTE 모델, 분석 결과 저장소
+- query: SQL 질의용 SQLite DB (원본이 바뀌었을 때만 다시 만듦)
+
+진행 상황과 준비 여부는 WARMUP_STATUS_PATH(JSON)에 기록되며,
+BDAP_WARMUP_PORT를 지정하면 HTTP로도 제공합니다. (준비되면 200, 아니면 503)
+로드밸런서/오케스트레이터는 둘 중 하나로 준비된 복제본에만 트래픽을 보낼 수 있습니다.
+
+실행 방법
+- python -m utils.warmup serve [streamlit run 옵션...]: 서버가 뜨자마자 워밍업을 시작 (권장)
+- streamlit run app.py: 첫 세션이 app.py를 실행할 때 워밍업이 시작됩니다.
+- python -m utils.warmup check [--wait 초]: 준비 여부 확인 (준비되면 종료 코드 0)
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import streamlit as st
+
+WARMUP_ENABLED = os.environ.get("BDAP_WARMUP", "1") != "0"
+WARMUP_STATUS_PATH = os.environ.get("BDAP_WARMUP_STATUS", "logs/warmup.json")
+WARMUP_PORT = int(os.environ.get("BDAP_WARMUP_PORT", "0")) # 0이면 HTTP 준비 상태 엔드포인트를 열지 않음
+RUNTIME_WAIT_TIMEOUT = 120 # serve 실행 시 Streamlit 런타임이 뜨기를 기다리는 최대 시간 (초)
+
+
+class SkipStep(Exception):
+    """ 현재 설정에서 필요 없는 단계. 상태에는 skipped로 기록됩니다. """
+
+
+def _full_data_only(ctx):
+    if ctx.get("store_version") is not None:
+        raise SkipStep("파티션 저장소 사용 중 (전체 CSV는 페이지가 처음 요청할 때 읽음)")
+
+
+def _warm_store(ctx):
+    from util import LazyTables
+    from utils.store import current_store_version
+    ctx["store_version"] = current_store_version()
+    ctx["total_df"] = LazyTables() # 저장소 분기에서 전체 데이터가 필요한 경우에만 읽음
+
+
+def _warm_data(ctx):
+    from util import load_data, data_version
+    from utils.panel import panel_version
+    _full_data_only(ctx)
+    ctx["total_df"] = load_data()
+    ctx["data_version"] = data_version()
+    ctx["version"] = panel_version()
+
+
+def _warm_panel(ctx):
+    _full_data_only(ctx)
+    from utils.panel import get_panel
+    from utils.anomaly import get_alert_anomalies
+    ctx["panel"] = get_panel(ctx["version"], ctx["total_df"])
+    get_alert_anomalies(ctx["version"], ctx["panel"])
+
+
+def _warm_message(ctx):
+    from message.message_home import message_counts
+    _full_data_only(ctx)
+    message_counts(ctx["data_version"], ctx["total_df"]["alerts"])
+
+
+def _warm_relationship(ctx):
+    from relationship.lag_correlation import compute_lag_correlations
+    _full_data_only(ctx)
+    compute_lag_correlations(ctx["version"], ctx["panel"])
+
+
+def _warm_move(ctx):
+    from move.main import FLOW_YEARS, FLOW_DISASTER_TYPES, FLOW_REGIONS, FLOW_PRECOMPUTE, flow_panel
+    from move.processor import start_flow_precompute
+    from move.preprocessing import prepare_dataset
+    regions = tuple(None if r == "전체" else r for r in FLOW_REGIONS)
+    if ctx.get("store_version") is None:
+        prepare_dataset(ctx["total_df"])
+        if FLOW_PRECOMPUTE:
+            start_flow_precompute(ctx["version"], ctx["panel"], FLOW_YEARS, FLOW_DISASTER_TYPES, regions).join()
+        return
+    # 저장소 분기: 페이지와 같은 키(f"{저장소 버전}:{연도}")로 연도별 패널과 조합을 채움
+    for year in FLOW_YEARS:
+        version, panel, years = flow_panel(ctx["total_df"], year)
+        if FLOW_PRECOMPUTE:
+            start_flow_precompute(version, panel, years, FLOW_DISASTER_TYPES, regions).join()
+
+
+def _warm_hitmap(ctx):
+    from functools import partial
+    from hitmap.hitmap_home import (
+        load, load_year, store_source, default_year, prerender_counts, HITMAP_CMAP, HITMAP_PRERENDER
+    )
+    from hitmap.geometry import load_region_paths
+    from hitmap.render_cache import start_prerender
+    region_names, region_paths, map_bounds = load_region_paths()
+    from util import data_version
+    version, years = store_source() if ctx.get("store_version") is not None else (None, [])
+    if version is None:
+        version = data_version()
+        counts_fn = partial(prerender_counts, region_names, all_df=load(version, ctx["total_df"]))
+    else:
+        # 저장소 분기: 첫 화면(기본 연도)의 연도별 재난문자를 페이지와 같은 키로 채움
+        load_year(version, default_year(years))
+        counts_fn = partial(prerender_counts, region_names, years=tuple(years))
+    if HITMAP_PRERENDER:
+        start_prerender(version, counts_fn, region_paths, map_bounds, cmap_names=(HITMAP_CMAP,)).join()
+
+
+def _warm_sns(ctx):
+    from SNS.kote_module import load_trained_kote_model
+    from SNS.text_analysis_module import get_analyzer
+    from SNS.result_store import get_result_store
+    get_analyzer()
+    load_trained_kote_model() # run_sns와 같은 인자로 호출해야 같은 캐시 항목을 채움
+    get_result_store()
+
+
+def _warm_query(ctx):
+    from utils.query_db import source_version, ensure_query_db
+    ensure_query_db(source_version())
+
+
+WARMUP_STEPS = [
+    ("store", _warm_store),
+    ("data", _warm_data),
+    ("panel", _warm_panel),
+    ("message", _warm_message),
+    ("relationship", _warm_relationship),
+    ("move", _warm_move),
+    ("hitmap", _warm_hitmap),
+    ("sns", _warm_sns),
+    ("query", _warm_query),
+]
+
+
+class WarmupStatus:
+    """ 단계별 진행 상황. 바뀔 때마다 상태 파일을 다시 씁니다. (여러 스레드에서 읽음) """
+
+    def __init__(self, steps, path=WARMUP_STATUS_PATH):
+        self.path = path
+        self.pid = os.getpid()
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.finished_at = None
+        self.steps = {name: {"state": "pending", "seconds": None, "error": None} for name in steps}
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self):
+        return self.finished_at is not None
+
+    def update(self, name, state, seconds=None, error=None):
+        with self._lock:
+            self.steps[name] = {"state": state, "seconds": seconds, "error": error}
+        self.write()
+
+    def finish(self):
+        self.finished_at = datetime.now().isoformat(timespec="seconds")
+        self.write()
+
+    def to_dict(self):
+        with self._lock:
+            steps = {name: dict(step) for name, step in self.steps.items()}
+        done = sum(step["state"] in ("done", "failed", "skipped") for step in steps.values())
+        return {
+            "ready": self.ready,
+            "progress": round(done / max(len(steps), 1), 3),
+            "pid": self.pid,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "steps": steps,
+        }
+
+    def write(self):
+        if not self.path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp_path = f"{self.path}.{self.pid}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError:
+            pass # 상태 파일 기록 실패가 워밍업을 막지 않도록 함
+
+
+def run_warmup(status, steps=WARMUP_STEPS):
+    """
+    단계를 차례로 실행합니다. 실패한 단계는 오류만 기록하고 다음 단계로 넘어갑니다.
+    (해당 페이지는 기존처럼 첫 요청 때 계산하게 됨)
+    """
+    ctx = {}
+    for name, step in steps:
+        status.update(name, "running")
+        started = time.perf_counter()
+        try:
+            step(ctx)
+        except SkipStep as e:
+            status.update(name, "skipped", round(time.perf_counter() - started, 3), str(e))
+        except Exception as e:
+            status.update(name, "failed", round(time.perf_counter() - started, 3), f"{type(e).__name__}: {e}")
+        else:
+            status.update(name, "done", round(time.perf_counter() - started, 3))
+    status.finish()
+    print(f"워밍업 완료: {json.dumps(status.to_dict()['steps'], ensure_ascii=False)}")
+
+
+class _ReadinessHandler(BaseHTTPRequestHandler):
+    status = None
+
+    def do_GET(self):
+        body = json.dumps(self.status.to_dict(), ensure_ascii=False).encode("utf-8")
+        self.send_response(200 if self.status.ready else 503)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass # 헬스 체크 요청마다 로그를 남기지 않음
+
+
+_readiness_server = None
+_readiness_lock = threading.Lock()
+
+
+def _serve_readiness(status, port):
+    """
+    준비 상태 HTTP 서버를 프로세스당 하나만 엽니다. 이미 열려 있으면 응답할 status만 바꿉니다.
+    포트를 열 수 없으면 경고만 출력하고 None을 반환합니다. (세션 실행을 막지 않음)
+    """
+    global _readiness_server
+    with _readiness_lock:
+        if _readiness_server is not None:
+            _readiness_server.RequestHandlerClass.status = status
+            return _readiness_server
+        handler = type("ReadinessHandler", (_ReadinessHandler,), {"status": status})
+        try:
+            server = ThreadingHTTPServer(("0.0.0.0", port), handler)
+        except OSError as e:
+            print(f"준비 상태 엔드포인트를 열지 못했습니다 (포트 {port}): {e}")
+            return None
+        threading.Thread(target=server.serve_forever, daemon=True, name="warmup-readiness").start()
+        _readiness_server = server
+        return server
+
+
+@st.cache_resource(show_spinner=False)
+def start_warmup():
+    """
+    프로세스당 한 번 워밍업 스레드를 시작하고 진행 상황(WarmupStatus)을 반환합니다.
+    세션 스크립트 밖(serve의 대기 스레드)에서 호출해도 같은 캐시 항목을 쓰므로 두 번 시작되지 않습니다.
+    """
+    status = WarmupStatus([name for name, _ in WARMUP_STEPS])
+    status.write()
+    if WARMUP_PORT:
+        _serve_readiness(status, WARMUP_PORT)
+    if WARMUP_ENABLED:
+        threading.Thread(target=run_warmup, args=(status,), daemon=True, name="cache-warmup").start()
+    else:
+        status.finish()
+    return status
+
+
+def render_warmup_status():
+    """ 워밍업이 끝나지 않았으면 사이드바에 진행률을 표시합니다. """
+    status = start_warmup()
+    if not status.ready:
+        st.sidebar.caption(f"⏳ 캐시 준비 중... {status.to_dict()['progress']:.0%} (처음 여는 페이지는 느릴 수 있습니다)")
+
+
+def read_status(path=WARMUP_STATUS_PATH):
+    """ 상태 파일을 읽습니다. 파일이 없거나 기록한 서버 프로세스가 이미 종료됐으면 None을 반환합니다. """
+    try:
+        with open(path, encoding="utf-8") as f:
+            status = json.load(f)
+        os.kill(status["pid"], 0)
+    except (OSError, ValueError, KeyError):
+        return None
+    return status
+
+
+def _start_when_runtime_exists():
+    from streamlit.runtime import Runtime
+    deadline = time.monotonic() + RUNTIME_WAIT_TIMEOUT
+    while not Runtime.exists():
+        if time.monotonic() > deadline:
+            print("워밍업 취소: Streamlit 런타임이 시작되지 않았습니다.")
+            return
+        time.sleep(0.2)
+    # serve는 이 파일을 __main__으로 실행하므로, app.py가 쓰는 utils.warmup 모듈의 함수를 호출해야
+    # 같은 cache_resource 항목을 공유합니다. (__main__.start_warmup은 별도 항목이라 워밍업이 두 번 실행됨)
+    importlib.import_module("utils.warmup").start_warmup()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="서버 시작 시 캐시 워밍업 실행 및 준비 상태 확인")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="streamlit run app.py를 실행하고 서버가 뜨자마자 워밍업을 시작")
+    serve.add_argument("streamlit_args", nargs=argparse.REMAINDER, help="streamlit run에 그대로 넘길 옵션")
+    check = sub.add_parser("check", help="준비 여부 확인 (준비되면 종료 코드 0, 아니면 1)")
+    check.add_argument("--status-file", default=WARMUP_STATUS_PATH)
+    check.add_argument("--wait", type=float, default=0, help="준비될 때까지 최대 이 시간(초)만큼 기다림")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        from streamlit.web import cli as stcli
+        threading.Thread(target=_start_when_runtime_exists, daemon=True, name="warmup-launcher").start()
+        sys.argv = ["streamlit", "run", "app.py", *args.streamlit_args]
+        return stcli.main()
+
+    deadline = time.monotonic() + args.wait
+    while True:
+        status = read_status(args.status_file)
+        if (status and status["ready"]) or time.monotonic() >= deadline:
+            break
+        time.sleep(1)
+    print(json.dumps(status, ensure_ascii=False, indent=2) if status else "워밍업 상태 없음 (서버가 실행 중이 아님)")
+    return 0 if status and status["ready"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())